@@ -0,0 +1,48 @@
+"""
+Сравнение генерации номеров карт по одному и блоками, в том числе номеров с контрольной цифрой Луна:
+номеров в секунду.
+
+Запуск: python -m benchmarks.bench_card_numbers [количество номеров]
+"""
+
+import os
+import sys
+import time
+
+from src.generators import card_number_generator, is_luhn_valid, write_card_numbers
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    start = 4000_0000_0000_0000
+
+    with open(os.devnull, "w", encoding="ascii") as text_file:
+        begin = time.perf_counter()
+        for card_number in card_number_generator(start, start + count - 1):
+            text_file.write(card_number + "\n")
+        per_item = count / (time.perf_counter() - begin)
+    print(f"card_number_generator:  {per_item / 1e6:8.2f} млн номеров/с")
+
+    with open(os.devnull, "wb") as binary_file:
+        begin = time.perf_counter()
+        write_card_numbers(start, start + count - 1, binary_file)
+        blocks = count / (time.perf_counter() - begin)
+    print(f"write_card_numbers:     {blocks / 1e6:8.2f} млн номеров/с (x{blocks / per_item:.0f})")
+
+    # Номера, проходящие проверку Луна: фильтр построчного генератора и блочный режим luhn
+    sample = count // 10
+    begin = time.perf_counter()
+    valid = sum(1 for number in card_number_generator(start, start + sample - 1) if is_luhn_valid(number))
+    filtered = valid / (time.perf_counter() - begin)
+    print(f"генератор + is_luhn_valid: {filtered / 1e6:5.2f} млн номеров Луна/с")
+
+    for workers in (1, None):
+        with open(os.devnull, "wb") as binary_file:
+            begin = time.perf_counter()
+            written = write_card_numbers(start, start + count * 10 - 1, binary_file, luhn=True, workers=workers)
+            luhn = written / (time.perf_counter() - begin)
+        print(f"write_card_numbers(luhn=True, workers={workers}): {luhn / 1e6:6.2f} млн номеров Луна/с")
+
+
+if __name__ == "__main__":
+    main()
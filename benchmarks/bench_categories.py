@@ -0,0 +1,50 @@
+"""
+Подсчет операций по категориям: вложенный цикл по категориям и автомат CategoryMatcher.
+
+Запуск: python -m benchmarks.bench_categories [количество транзакций] [количество категорий]
+"""
+
+import sys
+from collections import Counter
+from typing import Any, Dict, List
+
+from benchmarks.bench_file_reader import measure
+from benchmarks.bench_transaction_table import make_operations
+from src.utils import CategoryMatcher, process_bank_operations
+
+# Количество различных получателей в описаниях
+MERCHANTS = 200_000
+
+
+def count_nested(data: List[Dict[str, Any]], categories: List[str]) -> Dict[str, int]:
+    """Прежний подсчет: для каждого описания категории проверяются по очереди."""
+    categories_lower = [category.lower() for category in categories]
+    counter: Counter = Counter()
+    for transaction in data:
+        description = transaction.get("description", "").lower()
+        for category in categories_lower:
+            if description and category in description:
+                counter[category] += 1
+                break
+    return {category: counter.get(category.lower(), 0) for category in categories}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = make_operations(count)
+    for i, operation in enumerate(operations):
+        operation["description"] = f"{operation['description']} Магазин{i % MERCHANTS}"
+    print(f"Транзакций: {count}, различных описаний: {len({op['description'] for op in operations})}")
+
+    sizes = [int(sys.argv[2])] if len(sys.argv) > 2 else [5, 100, 500]
+    for size in sizes:
+        print(f"Категорий: {size}")
+        # Большинство категорий не встречается, поэтому вложенный цикл проверяет почти все
+        categories = [f"магазин{i}9" for i in range(size - 2)] + ["вклад", "перевод"]
+        measure(f"CategoryMatcher ({size}, построение)", lambda: CategoryMatcher(categories))
+        measure(f"вложенный цикл ({size})", lambda: count_nested(operations, categories))
+        measure(f"process_bank_operations ({size})", lambda: process_bank_operations(operations, categories))
+
+
+if __name__ == "__main__":
+    main()
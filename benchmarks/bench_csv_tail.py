@@ -0,0 +1,70 @@
+"""
+Замер дочитывания CSV-файла, в который дописываются транзакции.
+
+Запуск: python -m benchmarks.bench_csv_tail [количество строк] [количество дописанных строк]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_file_reader import make_csv
+from src.csv_tail import CsvTail, tail_path_for
+from src.ingest_cache import load_transactions
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    appended = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.csv")
+        make_csv(path, rows + appended)
+        with open(path, "rb") as file:
+            lines = file.readlines()
+        with open(path, "wb") as file:
+            file.writelines(lines[: rows + 1])
+
+        start = time.perf_counter()
+        CsvTail(path, state="EXECUTED", reverse=True).refresh()
+        print(f"Первое чтение {rows} строк: {time.perf_counter() - start:.2f} с")
+
+        with open(path, "ab") as file:
+            file.writelines(lines[rows + 1:])
+
+        start = time.perf_counter()
+        table = load_transactions(path, use_cache=False)
+        print(f"Полное перечитывание {len(table)} строк: {time.perf_counter() - start:.2f} с")
+
+        start = time.perf_counter()
+        tail = CsvTail(path, state="EXECUTED", reverse=True)
+        loaded = time.perf_counter() - start
+        delta = tail.refresh()
+        total = time.perf_counter() - start
+        print(
+            f"Повторный запуск: загрузка контрольной точки {loaded:.2f} с, "
+            f"дочитывание {appended} строк {total - loaded:.3f} с, новых транзакций: {len(delta)}"
+        )
+        print(f"Размер {tail_path_for(path)}: {os.path.getsize(tail_path_for(path)) / 2**20:.1f} МБ")
+
+        # Режим follow: много мелких дописываний; части объединяются только при обращении к table
+        batches = [lines[rows + 1 + i: rows + 1 + i + 10] for i in range(0, appended, 10)]
+        with open(path, "wb") as file:
+            file.writelines(lines[: rows + 1])
+        tail = CsvTail(path, state="EXECUTED", reverse=True, persist=False)
+        tail.refresh()
+        start = time.perf_counter()
+        for batch in batches:
+            with open(path, "ab") as file:
+                file.writelines(batch)
+            tail.refresh()
+        elapsed = time.perf_counter() - start
+        print(f"Дочитывание {len(batches)} раз по 10 строк: {elapsed / len(batches) * 1000:.2f} мс на обновление")
+        start = time.perf_counter()
+        table = tail.table
+        print(f"Сборка результата из частей ({len(table)} записей): {time.perf_counter() - start:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Сравнение сортировки в памяти и внешней сортировки по дате: время и пиковый объем памяти.
+
+Запуск: python -m benchmarks.bench_external_sort [количество транзакций] [бюджет памяти, МБ]
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator
+
+from benchmarks.bench_transaction_table import make_operations
+from src.external_sort import external_sort_by_date
+from src.processing import sort_by_date
+
+
+def iter_operations(count: int) -> Iterator[Dict[str, Any]]:
+    """Отдает транзакции потоком, блоками по 10000 (как при чтении большого архива)."""
+    for start in range(0, count, 10000):
+        for operation in make_operations(min(10000, count - start)):
+            operation["id"] += start
+            yield operation
+
+
+def measure_peak(name: str, func: Callable[[], int]) -> None:
+    """Замеряет время (без трассировки) и пиковый объем памяти (отдельным запуском под tracemalloc)."""
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<40} {elapsed:7.2f} с, пик памяти {peak / 2**20:7.1f} МБ, операций {count}")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    budget = int(sys.argv[2]) * 2**20 if len(sys.argv) > 2 else 32 * 2**20
+
+    measure_peak("sort_by_date (список в памяти)", lambda: len(sort_by_date(list(iter_operations(count)))))
+    measure_peak(
+        f"external_sort_by_date ({budget // 2**20} МБ)",
+        lambda: sum(1 for _ in external_sort_by_date(iter_operations(count), memory_budget=budget)),
+    )
+
+
+if __name__ == "__main__":
+    main()
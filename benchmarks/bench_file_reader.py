@@ -0,0 +1,86 @@
+"""
+Замеры производительности чтения файлов с транзакциями.
+
+Запуск: python -m benchmarks.bench_file_reader [количество строк]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from src.file_reader import apply_transaction_dtypes, format_records, transaction_dtypes
+
+STATES = ["EXECUTED", "canceled", "Pending"]
+
+
+def make_csv(path: str, rows: int) -> None:
+    """Создает CSV-файл в формате банковской выгрузки."""
+    df = pd.DataFrame(
+        {
+            "id": range(rows),
+            "State": [STATES[i % 3] for i in range(rows)],
+            "date": "2023-10-05T12:30:45.123456",
+            "amount": "1000.50",
+            "currency_name": "руб.",
+            "currency_code": "RUB",
+            "from": "Visa Classic 6831982476737658",
+            "to": "Счет 75651667383060284188",
+            "description": "Перевод с карты на карту",
+        }
+    )
+    df.to_csv(path, sep=";", index=False)
+
+
+def legacy_format_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Построчная нормализация в том виде, в котором она была до векторизации."""
+    df = df.where(pd.notna(df), None)
+    formatted_transactions = []
+    for transaction in df.to_dict("records"):
+        formatted_transaction = {}
+        for key, value in transaction.items():
+            key_lower = str(key).lower().strip()
+            if key_lower == "state" and value:
+                formatted_transaction[key_lower] = str(value).upper()
+            else:
+                formatted_transaction[key_lower] = value
+        formatted_transactions.append(formatted_transaction)
+    return formatted_transactions
+
+
+def measure(label: str, func: Callable[[], Any]) -> float:
+    """Выполняет функцию и выводит время выполнения."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f} с")
+    return elapsed
+
+
+def main() -> None:
+    """Сравнивает построчную и векторную нормализацию CSV, чтение без схемы и со схемой типов."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "transactions.csv")
+        make_csv(path, rows)
+        df = pd.read_csv(path, sep=";")
+
+        print(f"Строк: {rows}")
+        legacy = measure("Построчная нормализация", lambda: legacy_format_records(df))
+        vectorized = measure("Векторная нормализация", lambda: format_records(df))
+        print(f"Ускорение: {legacy / vectorized:.1f}x")
+
+        inferred = pd.read_csv(path, sep=";")
+        dtypes = transaction_dtypes(inferred.columns)
+        typed = apply_transaction_dtypes(pd.read_csv(path, sep=";", dtype=dtypes))
+        measure("read_csv с выводом типов", lambda: pd.read_csv(path, sep=";"))
+        measure("read_csv со схемой типов", lambda: pd.read_csv(path, sep=";", dtype=dtypes))
+        print(f"Память без схемы: {inferred.memory_usage(deep=True).sum() / 2**20:8.1f} МБ")
+        print(f"Память со схемой: {typed.memory_usage(deep=True).sum() / 2**20:8.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
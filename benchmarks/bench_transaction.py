@@ -0,0 +1,42 @@
+"""
+Замер памяти на одну транзакцию: словарь из JSON против записи Transaction.
+
+Запуск: python -m benchmarks.bench_transaction [количество транзакций]
+"""
+
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.bench_transaction_table import make_operations
+from src.transaction import to_transactions
+
+
+def allocated_bytes(build: Callable[[], Any]) -> int:
+    """Возвращает объем памяти, занятой результатом build()."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    """Сравнивает объем памяти для словарей и записей Transaction."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payload = json.dumps(make_operations(count), ensure_ascii=False)
+
+    dict_bytes = allocated_bytes(lambda: json.loads(payload))
+    # Словари освобождаются по мере преобразования, в памяти остаются только записи
+    slots_bytes = allocated_bytes(lambda: list(to_transactions(json.loads(payload))))
+
+    print(f"Транзакций: {count}")
+    print(f"Словарь из JSON:    {dict_bytes / count:8.0f} байт на транзакцию")
+    print(f"Transaction:        {slots_bytes / count:8.0f} байт на транзакцию")
+    print(f"Сокращение:         {dict_bytes / slots_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
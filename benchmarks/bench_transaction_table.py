@@ -0,0 +1,103 @@
+"""
+Сравнение списка словарей и TransactionTable на фильтрации и сортировке.
+
+Запуск: python -m benchmarks.bench_transaction_table [количество транзакций]
+"""
+
+import json
+import random
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.bench_file_reader import measure
+from src.generators import filter_by_currency
+from src.processing import StateIndex, filter_by_date_range, filter_by_state, page_by_date, sort_by_date
+from src.query import TransactionQuery
+from src.transaction_table import TransactionTable
+from src.utils import process_bank_search
+
+
+def make_operations(count: int) -> List[Dict[str, Any]]:
+    """Размножает operations.json до нужного количества транзакций со случайными датами."""
+    with open("data/operations.json", encoding="utf-8") as file:
+        sample = json.load(file)
+    random.seed(0)
+    operations = []
+    for i in range(count):
+        operation = dict(sample[i % len(sample)])
+        operation["id"] = i
+        year, month, day = random.randint(2010, 2023), random.randint(1, 12), random.randint(1, 28)
+        operation["date"] = f"{year}-{month:02d}-{day:02d}T10:00:00"
+        operations.append(operation)
+    return operations
+
+
+def main() -> None:
+    """Выводит время операций для обоих представлений."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = make_operations(count)
+    print(f"Транзакций: {count}")
+
+    table = TransactionTable.from_records(operations)
+    measure("TransactionTable.from_records", lambda: TransactionTable.from_records(operations))
+
+    measure("filter_by_state (список)", lambda: filter_by_state(operations, "EXECUTED"))
+    measure("filter_by_state (таблица)", lambda: filter_by_state(table, "EXECUTED"))
+
+    # Повторная фильтрация одного набора данных по разным статусам
+    states = ["EXECUTED", "CANCELED", "PENDING"]
+    measure("3 x filter_by_state (список)", lambda: [filter_by_state(operations, state) for state in states])
+    measure("StateIndex (построение)", lambda: StateIndex(operations))
+    index = StateIndex(operations)
+    measure(
+        "3 x filter_by_state (список, индекс)",
+        lambda: [filter_by_state(operations, state, index=index) for state in states],
+    )
+    measure("3 x filter_by_state (таблица)", lambda: [filter_by_state(table, state) for state in states])
+    measure("sort_by_date (список)", lambda: sort_by_date(operations))
+    measure("sort_by_date (таблица)", lambda: sort_by_date(table))
+    sorted_table = sort_by_date(table)
+    measure("sort_by_date (таблица, повторно)", lambda: sort_by_date(sorted_table))
+    measure("sort_by_date (таблица, обратный порядок)", lambda: sort_by_date(sorted_table, False))
+    # Выписка за месяц из многолетней истории
+    month = ("2023-03-01", "2023-04-01")
+    measure("filter_by_date_range (список)", lambda: filter_by_date_range(operations, *month))
+    measure("filter_by_date_range (таблица)", lambda: filter_by_date_range(table, *month))
+    measure("filter_by_date_range (табл., сорт.)", lambda: filter_by_date_range(sorted_table, *month))
+
+    # Последние 20 операций: полная сортировка и частичная выборка, затем вторая страница по курсору
+    measure("sort_by_date + [:20] (список)", lambda: sort_by_date(operations)[:20])
+    measure("page_by_date 20 (список)", lambda: page_by_date(operations, 20))
+    measure("sort_by_date + [:20] (таблица)", lambda: sort_by_date(table).take(np.arange(20)))
+    measure("page_by_date 20 (таблица)", lambda: page_by_date(table, 20))
+    _, cursor = page_by_date(table, 20)
+    measure("page_by_date 20, стр. 2 (таблица)", lambda: page_by_date(table, 20, cursor))
+
+    measure("filter_by_currency (список)", lambda: list(filter_by_currency(operations, "RUB")))
+    measure("filter_by_currency (таблица)", lambda: filter_by_currency(table, "RUB"))
+    # Отчет "USD или EUR": два прохода по одной валюте и один проход по набору
+    measure(
+        "USD + EUR, 2 прохода (список)",
+        lambda: [op for code in ("USD", "EUR") for op in filter_by_currency(operations, code)],
+    )
+    measure("{USD, EUR} (список)", lambda: list(filter_by_currency(operations, {"USD", "EUR"})))
+    measure("{USD, EUR} (таблица)", lambda: filter_by_currency(table, {"USD", "EUR"}))
+    measure("кроме RUB (таблица)", lambda: filter_by_currency(table, "RUB", exclude=True))
+
+    # Все условия меню main.py: цепочка функций и запрос за один проход
+    def chain(data: Any) -> Any:
+        result = sort_by_date(filter_by_state(data, "EXECUTED"))
+        result = filter_by_currency(result, "RUB")
+        return process_bank_search(result if isinstance(result, TransactionTable) else list(result), "Visa")
+
+    query = TransactionQuery().filter_by_state("EXECUTED").filter_by_currency("RUB").search("Visa").sort_by_date()
+    measure("цепочка функций (список)", lambda: chain(operations))
+    measure("TransactionQuery (список)", lambda: query.execute(operations))
+    measure("цепочка функций (таблица)", lambda: chain(table))
+    measure("TransactionQuery (таблица)", lambda: query.execute(table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Поиск подстроки в описании: просмотр (process_bank_search) и триграммный индекс TrigramIndex.
+
+Запуск: python -m benchmarks.bench_trigram_index [количество транзакций] [количество различных описаний]
+"""
+
+import sys
+
+from benchmarks.bench_file_reader import measure
+from benchmarks.bench_transaction_table import make_operations
+from benchmarks.bench_word_index import measure_query
+from src.transaction_table import TransactionTable
+from src.trigram_index import TrigramIndex
+from src.utils import process_bank_search
+
+QUERIES = ["газин12345", "Магазин777 ", "вод орг", "открытие вклада", "ин"]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    merchants = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    operations = make_operations(count)
+    for i, operation in enumerate(operations):
+        operation["description"] = f"{operation['description']} Магазин{i % merchants} "
+    table = TransactionTable.from_records(operations)
+    print(f"Транзакций: {count}")
+
+    index = TrigramIndex()
+    measure("TrigramIndex (построение, таблица)", lambda: index.add(table))
+    print(f"Различных описаний: {index.texts}, триграмм: {len(index._postings)}")
+
+    for query in QUERIES:
+        candidates = len(index.candidates(query))
+        found = len(index.positions(query))
+        print(f"'{query}': кандидатов {candidates / index.texts:.2%} описаний, найдено {found}")
+        measure_query(f"'{query}': просмотр", lambda: process_bank_search(table, query), repeat=1)
+        measure_query(f"'{query}': индекс", lambda: process_bank_search(table, query, index=index), repeat=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Замер задержки между появлением файла выписки в папке и доступностью его транзакций.
+
+Запуск: python -m benchmarks.bench_watcher [количество файлов] [операций в файле]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_transaction_table import make_operations
+from src.watcher import INOTIFY_AVAILABLE, DirectoryWatcher
+
+
+def measure(use_inotify: bool, files: int, operations_per_file: int) -> None:
+    operations = make_operations(operations_per_file)
+    with tempfile.TemporaryDirectory() as directory:
+        with DirectoryWatcher(directory, use_inotify=use_inotify) as watcher:
+            latencies = []
+            for i in range(files):
+                path = os.path.join(directory, f"statement_{i}.json")
+                with open(path + ".part", "w", encoding="utf-8") as file:
+                    json.dump(operations, file)
+                start = time.perf_counter()
+                os.replace(path + ".part", path)
+                while path not in watcher.store.files:
+                    time.sleep(0.001)
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        mode = "inotify" if use_inotify else "опрос"
+        print(
+            f"{mode}: {files} файлов по {operations_per_file} операций, задержка "
+            f"медиана {latencies[len(latencies) // 2]:.3f} с, максимум {latencies[-1]:.3f} с"
+        )
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    operations_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    if INOTIFY_AVAILABLE:
+        measure(True, files, operations_per_file)
+    measure(False, min(files, 10), operations_per_file)
+
+
+if __name__ == "__main__":
+    main()
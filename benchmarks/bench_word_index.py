@@ -0,0 +1,58 @@
+"""
+Поиск по описанию: просмотр (process_bank_search) и индекс слов WordIndex.
+
+Запуск: python -m benchmarks.bench_word_index [количество транзакций]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from benchmarks.bench_file_reader import measure
+from benchmarks.bench_transaction_table import make_operations
+from src.transaction_table import TransactionTable
+from src.utils import process_bank_search
+from src.word_index import WordIndex, index_path_for, open_word_index
+
+# Количество различных получателей в описаниях (редкие слова)
+MERCHANTS = 50_000
+
+QUERIES = ["перевод орг", "магазин12345", "открытие вклада", "маг"]
+
+
+def measure_query(label: str, func: Callable[[], Any], repeat: int = 20) -> None:
+    """Выводит среднее время запроса в миллисекундах."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    print(f"{label:<40} {(time.perf_counter() - start) / repeat * 1000:8.3f} мс")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = make_operations(count)
+    for i, operation in enumerate(operations):
+        operation["description"] = f"{operation['description']} магазин{i % MERCHANTS}"
+    table = TransactionTable.from_records(operations)
+    print(f"Транзакций: {count}")
+
+    index = WordIndex()
+    measure("WordIndex (построение, список)", lambda: WordIndex().add(operations))
+    measure("WordIndex (построение, таблица)", lambda: index.add(table))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "operations.json")
+        measure("open_word_index (создание)", lambda: open_word_index(file_path, operations))
+        measure("open_word_index (загрузка)", lambda: open_word_index(file_path, operations))
+        print(f"Размер файла индекса: {os.path.getsize(index_path_for(file_path)) / 2**20:.1f} МБ")
+
+    for query in QUERIES:
+        found = len(index.positions(query))
+        measure_query(f"'{query}' ({found}): просмотр", lambda: process_bank_search(table, query), repeat=1)
+        measure_query(f"'{query}' ({found}): индекс", lambda: index.positions(query))
+
+
+if __name__ == "__main__":
+    main()
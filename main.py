@@ -1,28 +1,29 @@
 import os
-from typing import List, Dict, Any
+import time
+from datetime import datetime, timedelta
+from typing import Optional
 
-from src.file_reader import detect_file_type_and_read
-from src.processing import filter_by_state, sort_by_date
+from src.batch_reader import read_statements
+from src.csv_tail import CsvTail
+from src.ingest_cache import load_transactions
 from src.widget import display_transactions
-from src.generators import filter_by_currency, transaction_descriptions
-from src.utils import process_bank_search, process_bank_operations
+from src.generators import transaction_descriptions
+from src.processing import page_by_date
+from src.query import TransactionQuery
+from src.utils import process_bank_operations
+from src.transaction_table import TransactionTable
+from src.watcher import watch_directory
 
 
-def debug_transactions_info(transactions: List[Dict[str, Any]], source: str):
+def debug_transactions_info(transactions: TransactionTable, source: str):
     """Выводит отладочную информацию о транзакциях."""
-    if transactions:
+    if len(transactions):
+        first_transactions = transactions.to_records(limit=2)
         print(f"\n[DEBUG] {source}: прочитано {len(transactions)} транзакций")
-        print(f"[DEBUG] Ключи первой транзакции: {list(transactions[0].keys())}")
-
-        # Проверяем наличие поля state
-        states = set()
-        for t in transactions:
-            if 'state' in t:
-                states.add(str(t['state']).upper())
-            elif 'State' in t:
-                states.add(str(t['State']).upper())
-            elif 'STATE' in t:
-                states.add(str(t['STATE']).upper())
+        print(f"[DEBUG] Ключи первой транзакции: {list(first_transactions[0].keys())}")
+
+        # Статусы уже нормализованы при загрузке
+        states = set(transactions.frame["state"].dropna().unique())
 
         if states:
             print(f"[DEBUG] Уникальные статусы в данных: {states}")
@@ -31,9 +32,9 @@ def debug_transactions_info(transactions: List[Dict[str, Any]], source: str):
 
         # Показываем первые 2 транзакции для отладки
         print(f"[DEBUG] Первые 2 транзакции:")
-        for i in range(min(2, len(transactions))):
+        for i, transaction in enumerate(first_transactions):
             print(f"  Транзакция {i + 1}:")
-            for key, value in transactions[i].items():
+            for key, value in transaction.items():
                 print(f"    {key}: {value}")
             print()
     else:
@@ -47,12 +48,14 @@ def get_file_choice() -> str:
     print("1. Получить информацию о транзакциях из JSON-файла")
     print("2. Получить информацию о транзакциях из CSV-файла")
     print("3. Получить информацию о транзакциях из XLSX-файла")
+    print("4. Получить информацию о транзакциях из всех файлов папки data/")
+    print("5. Следить за папкой data/ и загружать новые выписки по мере появления")
 
     while True:
-        choice = input("Введите номер пункта (1-3): ").strip()
-        if choice in ["1", "2", "3"]:
+        choice = input("Введите номер пункта (1-5): ").strip()
+        if choice in ["1", "2", "3", "4", "5"]:
             return choice
-        print("Неверный ввод. Пожалуйста, введите 1, 2 или 3.")
+        print("Неверный ввод. Пожалуйста, введите 1, 2, 3, 4 или 5.")
 
 
 def get_file_path(choice: str) -> str:
@@ -60,12 +63,35 @@ def get_file_path(choice: str) -> str:
     file_paths = {
         "1": "data/operations.json",  # Путь к JSON файлу
         "2": "data/transactions.csv",  # Путь к CSV файлу
-        "3": "data/transactions.xlsx"  # Путь к XLSX файлу
+        "3": "data/transactions.xlsx",  # Путь к XLSX файлу
+        "4": "data/",  # Папка с выписками
+        "5": "data/",  # Папка, за которой ведется наблюдение
     }
 
     return file_paths[choice]
 
 
+def watch_statements(directory: str) -> TransactionTable:
+    """Загружает выписки из папки по мере появления, пока пользователь не нажмет Ctrl+C."""
+    watcher = watch_directory(directory)
+    print(f"\nНаблюдение за папкой {directory}. Нажмите Ctrl+C, чтобы перейти к обработке транзакций.")
+    try:
+        reported = -1
+        while True:
+            time.sleep(2)
+            if len(watcher.store) != reported:
+                reported = len(watcher.store)
+                print(f"Файлов: {len(watcher.store.files)}, транзакций: {reported}")
+    except KeyboardInterrupt:
+        print("\nНаблюдение остановлено")
+    finally:
+        watcher.stop()
+
+    for error_path, error in watcher.store.errors.items():
+        print(f"Ошибка чтения {error_path}: {error}")
+    return watcher.store.table()
+
+
 def get_filter_state() -> str:
     """Получает статус для фильтрации."""
     print("\nВведите статус для фильтрации (EXECUTED, CANCELED, PENDING):")
@@ -77,6 +103,29 @@ def get_filter_state() -> str:
         print("Неверный статус.")
 
 
+def get_period_date(prompt: str) -> Optional[datetime]:
+    """Получает дату в формате ДД.ММ.ГГГГ (пустой ввод - без ограничения)."""
+    while True:
+        value = input(prompt).strip()
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%d.%m.%Y")
+        except ValueError:
+            print("Неверная дата. Введите дату в формате ДД.ММ.ГГГГ, например 01.03.2023")
+
+
+def get_page_size() -> Optional[int]:
+    """Получает количество операций на странице (пустой ввод - выводить все)."""
+    while True:
+        value = input("Сколько операций выводить на странице (пусто - все)? ").strip()
+        if not value:
+            return None
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+        print("Введите положительное число или оставьте строку пустой")
+
+
 def get_yes_no_input(prompt: str) -> bool:
     """Получает ответ Да/Нет."""
     while True:
@@ -95,71 +144,96 @@ def main():
         choice = get_file_choice()
         file_path = get_file_path(choice)
 
-        file_types = {"1": "JSON", "2": "CSV", "3": "XLSX"}
+        file_types = {"1": "JSON", "2": "CSV", "3": "XLSX", "4": "DIR", "5": "WATCH"}
         file_type = file_types[choice]
-        print(f"\nОбработка {file_type}-файла...")
-        print(f"Путь к файлу: {file_path}")
 
-        # Чтение транзакций из файла
-        transactions = detect_file_type_and_read(file_path)
+        if choice == "5":
+            transactions = watch_statements(file_path)
+        elif choice == "4":
+            print(f"\nОбработка всех файлов папки {file_path}...")
+            # Файлы читаются параллельно, ошибки выводятся по каждому файлу
+            transactions, errors = read_statements(file_path, as_table=True)
+            for error_path, error in errors.items():
+                print(f"Ошибка чтения {error_path}: {error}")
+        else:
+            print(f"\nОбработка {file_type}-файла...")
+            print(f"Путь к файлу: {file_path}")
+
+            if choice == "2":
+                # В CSV-выписку транзакции дописываются: при повторном запуске разбираются только новые строки
+                tail = CsvTail(file_path)
+                tail.refresh()
+                transactions = tail.table
+            else:
+                # Чтение транзакций из файла (повторные запуски используют кэш рядом с файлом)
+                transactions = load_transactions(file_path)
 
         # Отладочная информация
         debug_transactions_info(transactions, file_type)
 
-        if not transactions:
+        if not len(transactions):
             print(f"Не удалось прочитать транзакции из файла {file_path}")
             return
 
         print(f"\nПрочитано {len(transactions)} транзакций")
 
-        # Фильтрация по статусу
+        # Сначала собираются все условия, затем запрос выполняется за один проход по транзакциям
+        query = TransactionQuery()
         state = get_filter_state()
-        filtered_transactions = filter_by_state(transactions, state)
-        print(f"Операции отфильтрованы по статусу '{state}'")
-
-        if not filtered_transactions:
-            print(f"Нет транзакций со статусом '{state}'")
-            return
+        query.filter_by_state(state)
 
-        print(f"После фильтрации осталось {len(filtered_transactions)} транзакций")
-
-        # Сортировка по дате
+        page_size = None
         if get_yes_no_input("Отсортировать операции по дате? Да/Нет: "):
             reverse = get_yes_no_input("Сортировать по убыванию (новые сначала)? Да/Нет: ")
-            filtered_transactions = sort_by_date(filtered_transactions, reverse)
-            print("Операции отсортированы по дате")
+            page_size = get_page_size()
+            if page_size is None:
+                query.sort_by_date(reverse)
+
+        if get_yes_no_input("Выбрать операции за период? Да/Нет: "):
+            start = get_period_date("Начало периода (ДД.ММ.ГГГГ, пусто - без ограничения): ")
+            end = get_period_date("Конец периода включительно (ДД.ММ.ГГГГ, пусто - без ограничения): ")
+            query.filter_by_date_range(start, end + timedelta(days=1) if end else None)
 
-        # Фильтрация рублевых транзакций
         if get_yes_no_input("Выводить только рублевые транзакции? Да/Нет: "):
-            rub_transactions = list(filter_by_currency(filtered_transactions, "RUB"))
-            filtered_transactions = rub_transactions
-            print("Выводятся только рублевые транзакции")
-            print(f"Осталось {len(filtered_transactions)} рублевых транзакций")
+            query.filter_by_currency("RUB")
 
-        # Поиск по описанию
+        search_term = ""
         if get_yes_no_input("Выполнить поиск по описанию транзакций? Да/Нет: "):
             search_term = input("Введите слово для поиска: ").strip()
-            if search_term:
-                filtered_transactions = process_bank_search(filtered_transactions, search_term)
-                print(f"Выполнен поиск по слову '{search_term}'")
-                print(f"Найдено {len(filtered_transactions)} транзакций")
+            query.search(search_term)
 
-        # Статистика по категориям (опционально)
+        categories = []
         if get_yes_no_input("Показать статистику по категориям операций? Да/Нет: "):
             categories_input = input("Введите категории через запятую (например: перевод, оплата, вклад): ").strip()
-            if categories_input:
-                categories = [cat.strip() for cat in categories_input.split(",")]
-                operations_stats = process_bank_operations(filtered_transactions, categories)
-                print("\nСтатистика по операциям:")
-                for category, count in operations_stats.items():
-                    print(f"  {category}: {count} операций")
+            categories = [cat.strip() for cat in categories_input.split(",") if cat.strip()]
+
+        filtered_transactions = query.execute(transactions)
+        print(f"\nОперации отфильтрованы по статусу '{state}'")
+        if search_term:
+            print(f"Выполнен поиск по слову '{search_term}'")
+        print(f"После фильтрации осталось {len(filtered_transactions)} транзакций")
+
+        # Статистика по категориям (опционально)
+        if categories and len(filtered_transactions):
+            operations_stats = process_bank_operations(filtered_transactions, categories)
+            print("\nСтатистика по операциям:")
+            for category, count in operations_stats.items():
+                print(f"  {category}: {count} операций")
 
         # Вывод транзакций
         print("\n" + "=" * 60)
         print("РЕЗУЛЬТАТ ОБРАБОТКИ ТРАНЗАКЦИЙ:")
         print("=" * 60)
 
-        if filtered_transactions:
+        if len(filtered_transactions) and page_size is not None:
+            # Постраничный вывод: каждая страница выбирается без сортировки всех операций
+            cursor = None
+            while True:
+                page, cursor = page_by_date(filtered_transactions, page_size, cursor, reverse)
+                display_transactions(page, total=len(filtered_transactions))
+                if cursor is None or not get_yes_no_input("Показать следующую страницу? Да/Нет: "):
+                    break
+        elif len(filtered_transactions):
             display_transactions(filtered_transactions)
         else:
             print("Нет транзакций, подходящих под все условия фильтрации")
@@ -0,0 +1,162 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .file_reader import (
+    COMPRESSION_EXTENSIONS,
+    FILE_TYPES,
+    detect_file_type,
+    detect_file_type_and_read,
+    open_binary,
+    open_text,
+    read_csv_frame,
+)
+from .logger_config import setup_logger
+from .transaction_table import TransactionTable
+
+logger = setup_logger("batch_reader", "batch_reader.log")
+
+# Расширения файлов, которые читает detect_file_type_and_read, в том числе сжатых (.json.gz, .csv.xz)
+SUPPORTED_EXTENSIONS = tuple(
+    extension + suffix for extension in FILE_TYPES for suffix in ("", *COMPRESSION_EXTENSIONS)
+)
+
+
+def find_statement_files(source: str) -> List[str]:
+    """
+    Находит файлы выписок в папке или по шаблону glob.
+
+    Args:
+        source: Путь к папке (берутся все файлы поддерживаемых форматов) или шаблон, например "data/*.csv"
+
+    Returns:
+        Отсортированный список путей к файлам
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(os.path.join(source, name))
+        ]
+    else:
+        paths = [path for path in glob.glob(source, recursive=True) if os.path.isfile(path)]
+    return sorted(paths)
+
+
+def _empty_statement_error(file_path: str) -> Optional[str]:
+    """
+    Проверяет файл, из которого не прочитано ни одной транзакции.
+
+    detect_file_type_and_read возвращает пустой список и для пустой выписки,
+    и при ошибке чтения, поэтому такой файл разбирается повторно, уже без
+    перехвата ошибок разбора.
+
+    Args:
+        file_path: Путь к файлу выписки
+
+    Returns:
+        None для корректной пустой выписки (пустой файл, [] в JSON, CSV только
+        с заголовком, лист без строк), иначе текст ошибки
+
+    Raises:
+        Exception: Ошибка чтения или разбора файла
+    """
+    if os.path.getsize(file_path) == 0:
+        return None
+
+    file_type = detect_file_type(file_path)
+    if file_type == "json":
+        with open_text(file_path) as file:
+            if not isinstance(json.load(file), list):
+                return f"Файл {file_path} не содержит список транзакций"
+    elif file_type == "csv":
+        try:
+            read_csv_frame(file_path)
+        except pd.errors.EmptyDataError:
+            return None
+    elif file_type in ("xlsx", "xls"):
+        with open_binary(file_path) as file:
+            pd.read_excel(file)
+    else:
+        return f"Не удалось определить формат файла {file_path}"
+    return None
+
+
+def read_statement(file_path: str, as_table: bool) -> Tuple[Any, Optional[str]]:
+    """
+    Читает один файл выписки (в рабочем процессе read_statements или в watcher).
+
+    Args:
+        file_path: Путь к файлу JSON, CSV или XLSX
+        as_table: Вернуть TransactionTable вместо списка словарей
+
+    Returns:
+        Кортеж (транзакции или таблица, текст ошибки или None); для пустой
+        выписки - пустой результат без ошибки
+    """
+    try:
+        if not file_path.lower().endswith(SUPPORTED_EXTENSIONS):
+            return [], f"Неподдерживаемый формат файла: {file_path}"
+
+        transactions = detect_file_type_and_read(file_path)
+        if not transactions:
+            # Пустая выписка - не ошибка; ошибкой считается только файл, который не удалось разобрать
+            error = _empty_statement_error(file_path)
+            if error:
+                return [], error
+
+        if as_table:
+            # Таблица передается между процессами быстрее, чем список словарей
+            return TransactionTable.from_records(transactions), None
+        return transactions, None
+
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def read_statements(
+    source: Union[str, List[str]], max_workers: Optional[int] = None, as_table: bool = False
+) -> Tuple[Union[List[Dict[str, Any]], TransactionTable], Dict[str, str]]:
+    """
+    Параллельно читает файлы выписок и объединяет транзакции.
+
+    Файлы разбираются в пуле процессов, результаты объединяются в порядке
+    отсортированных путей, поэтому итог не зависит от порядка завершения задач.
+
+    Args:
+        source: Папка, шаблон glob или список путей к файлам
+        max_workers: Количество процессов (по умолчанию - по числу ядер)
+        as_table: Если True, результат возвращается в виде TransactionTable
+
+    Returns:
+        Кортеж (транзакции из всех файлов, словарь ошибок {путь: описание})
+    """
+    paths = sorted(source) if isinstance(source, list) else find_statement_files(source)
+    logger.debug(f"Чтение {len(paths)} файлов выписок из {source}")
+
+    if len(paths) <= 1 or max_workers == 1:
+        results = [read_statement(path, as_table) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(read_statement, paths, [as_table] * len(paths)))
+
+    errors = {}
+    parts = []
+    for path, (transactions, error) in zip(paths, results):
+        if error:
+            logger.error(f"Ошибка чтения {path}: {error}")
+            errors[path] = error
+        else:
+            parts.append(transactions)
+
+    if as_table:
+        merged: Union[List[Dict[str, Any]], TransactionTable] = TransactionTable.concat(parts)
+    else:
+        merged = [transaction for part in parts for transaction in part]
+
+    logger.info(f"Прочитано {len(merged)} транзакций из {len(parts)} файлов, ошибок: {len(errors)}")
+    return merged, errors
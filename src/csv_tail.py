@@ -0,0 +1,324 @@
+import io
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .file_reader import apply_transaction_dtypes, format_records, sniff_csv_dialect
+from .logger_config import setup_logger
+from .record_file import frame_from_arrays, frame_to_arrays, read_records, write_record
+from .transaction_table import TransactionTable
+
+logger = setup_logger("csv_tail", "csv_tail.log")
+
+# Расширение файла с контрольной точкой и уже прочитанными транзакциями
+TAIL_SUFFIX = ".tail.dat"
+
+# Версия формата файла контрольной точки
+TAIL_VERSION = 3
+
+# Интервал проверки файла в режиме follow, секунды
+FOLLOW_INTERVAL = 1.0
+
+
+def tail_path_for(file_path: str) -> str:
+    """Возвращает путь к файлу контрольной точки для CSV-файла."""
+    return file_path + TAIL_SUFFIX
+
+
+def _parse_lines(header: bytes, lines: bytes, dialect: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Разбирает строки CSV вместе с сохраненным заголовком так же, как read_csv_file."""
+    df = pd.read_csv(io.BytesIO(header + lines), sep=dialect["sep"], encoding=dialect["encoding"])
+    return format_records(apply_transaction_dtypes(df))
+
+
+def read_appended(file_path: str, checkpoint: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Читает строки, дописанные в CSV-файл после контрольной точки.
+
+    Разбираются только полные строки: недописанная последняя строка останется
+    для следующего чтения. Читается только часть файла после checkpoint["offset"].
+
+    Args:
+        file_path: Путь к CSV-файлу
+        checkpoint: Контрольная точка (offset, header, dialect, last_line, last_id)
+
+    Returns:
+        Кортеж (новые транзакции, новая контрольная точка)
+    """
+    offset = checkpoint["offset"]
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+
+    data = data[: data.rfind(b"\n") + 1]
+    if not data.strip():
+        return [], checkpoint
+
+    records = _parse_lines(checkpoint["header"], data, checkpoint["dialect"])
+    body = data.rstrip(b"\r\n")
+    new_checkpoint = {
+        **checkpoint,
+        "offset": offset + len(data),
+        "last_line": offset + body.rfind(b"\n") + 1,
+        "last_id": records[-1].get("id") if records else checkpoint["last_id"],
+    }
+    return records, new_checkpoint
+
+
+def start_checkpoint(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Создает контрольную точку начала файла (сразу после строки заголовка).
+
+    Args:
+        file_path: Путь к CSV-файлу
+
+    Returns:
+        Контрольная точка или None, если файл сжат или в нем нет полной строки заголовка
+    """
+    dialect = sniff_csv_dialect(file_path)
+    if dialect["compression"]:
+        logger.warning(f"Файл {file_path} сжат ({dialect['compression']}), дочитывание по смещению невозможно")
+        return None
+
+    with open(file_path, "rb") as file:
+        header = file.readline()
+    if not header.endswith(b"\n"):
+        return None
+    return {"offset": len(header), "header": header, "dialect": dialect, "last_line": None, "last_id": None}
+
+
+def checkpoint_is_valid(file_path: str, checkpoint: Dict[str, Any]) -> bool:
+    """
+    Проверяет, что файл только дописывался с момента контрольной точки.
+
+    Файл не должен стать короче, заголовок должен совпадать, а последняя
+    прочитанная строка - по-прежнему содержать транзакцию с last_id.
+    """
+    offset = checkpoint["offset"]
+    if os.path.getsize(file_path) < offset:
+        return False
+
+    header = checkpoint["header"]
+    with open(file_path, "rb") as file:
+        if file.read(len(header)) != header:
+            return False
+        if checkpoint["last_line"] is None:
+            return True
+        file.seek(checkpoint["last_line"])
+        line = file.read(offset - checkpoint["last_line"])
+
+    records = _parse_lines(header, line, checkpoint["dialect"])
+    return bool(records) and records[-1].get("id") == checkpoint["last_id"]
+
+
+class CsvTail:
+    """
+    Инкрементальное чтение CSV-файла, в который дописываются транзакции.
+
+    Хранит контрольную точку (смещение в байтах и id последней транзакции)
+    и при обновлении разбирает только строки, дописанные после нее. Новые
+    транзакции фильтруются по статусу и вливаются в уже отсортированный
+    результат. Контрольная точка и результат сохраняются рядом с файлом
+    (<файл>.tail.dat), поэтому повторный запуск тоже читает только новые строки.
+    Если файл был перезаписан или обрезан, он читается заново.
+    """
+
+    def __init__(
+        self, file_path: str, state: Optional[str] = None, reverse: Optional[bool] = None, persist: bool = True
+    ) -> None:
+        """
+        Args:
+            file_path: Путь к CSV-файлу
+            state: Статус для фильтрации (None - без фильтрации)
+            reverse: Порядок сортировки по дате, как в sort_by_date (None - порядок файла)
+            persist: Сохранять ли контрольную точку и результат на диск
+        """
+        self.file_path = file_path
+        self.state = state.upper().strip() if state else None
+        self.reverse = reverse
+        self.persist = persist
+        self._checkpoint: Optional[Dict[str, Any]] = None
+        # Прочитанные части в порядке результата; общая таблица собирается при обращении к table
+        self._parts: List[TransactionTable] = []
+        self._table: Optional[TransactionTable] = None
+        if persist:
+            self._load()
+
+    @property
+    def table(self) -> TransactionTable:
+        """
+        Все прочитанные транзакции с учетом фильтра и сортировки.
+
+        Части, добавленные после предыдущего обращения, объединяются здесь
+        (копирование O(n) один раз на обращение, а не на каждое обновление).
+        """
+        if self._table is None:
+            if len(self._parts) == 1:
+                self._table = self._parts[0]
+            elif not self._parts:
+                self._table = TransactionTable.from_records([])
+            else:
+                # Части уже упорядочены между собой, поэтому объединение сохраняет сортировку
+                self._table = TransactionTable(TransactionTable.concat(self._parts).frame, self.reverse)
+                self._parts = [self._table]
+        return self._table
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    @property
+    def checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Текущая контрольная точка (None - файл еще не читался)."""
+        return self._checkpoint
+
+    def _settings(self) -> Dict[str, Any]:
+        return {"version": TAIL_VERSION, "state": self.state, "reverse": self.reverse}
+
+    def _prepare(self, records: List[Dict[str, Any]]) -> TransactionTable:
+        """Фильтрует и сортирует новые транзакции."""
+        table = TransactionTable.from_records(records)
+        if self.state:
+            table = table.filter_by_state(self.state)
+        if self.reverse is not None:
+            table = table.sort_by_date(self.reverse)
+        return table
+
+    def _add(self, delta: TransactionTable) -> None:
+        """
+        Добавляет отсортированную часть к результату.
+
+        Если новые строки по дате целиком идут после уже прочитанных (или
+        перед ними), часть дописывается в конец (или начало) списка частей
+        без сортировки. Иначе все части сливаются устойчивой сортировкой
+        NumPy (timsort находит уже упорядоченные участки, поэтому слияние
+        линейно), и порядок совпадает с сортировкой всего файла.
+        """
+        if not len(delta):
+            return
+        self._table = None
+        parts = self._parts
+        if self.reverse is None or not parts:
+            parts.append(delta)
+            return
+
+        keys = delta.date_keys()
+        first, last = parts[0].date_keys()[0], parts[-1].date_keys()[-1]
+        # Строки с равными датами идут в порядке файла, поэтому новые строки с той же датой - после прочитанных
+        if self.reverse:
+            after, before = keys[0] <= last, keys[-1] > first
+        else:
+            after, before = keys[0] >= last, keys[-1] < first
+        if after:
+            parts.append(delta)
+        elif before:
+            parts.insert(0, delta)
+        else:
+            logger.debug(f"Новые строки {self.file_path} не по порядку дат, части сливаются")
+            self._parts = [TransactionTable.concat(parts + [delta]).sort_by_date(self.reverse)]
+
+    def _load(self) -> None:
+        """Загружает сохраненный результат, если он соответствует настройкам и файлу."""
+        parts = []
+        checkpoint = None
+        try:
+            with open(tail_path_for(self.file_path), "rb") as file:
+                records = read_records(file)
+                settings, _ = next(records, ({}, {}))
+                if settings != self._settings():
+                    return
+                # Каждая следующая запись - контрольная точка и транзакции, прочитанные до нее
+                for segment, arrays in records:
+                    checkpoint = {**segment["checkpoint"], "header": arrays.pop("checkpoint.header").tobytes()}
+                    parts.append(TransactionTable(frame_from_arrays(segment["columns"], arrays)))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать контрольную точку {tail_path_for(self.file_path)}: {e}")
+            return
+
+        if checkpoint is None or not os.path.exists(self.file_path):
+            return
+        if checkpoint_is_valid(self.file_path, checkpoint):
+            self._checkpoint = checkpoint
+            for part in parts:
+                self._add(part)
+            logger.info(f"Загружена контрольная точка {self.file_path}: {len(self)} записей")
+
+    def _save(self, delta: TransactionTable, reset: bool) -> None:
+        """Дописывает новую часть в файл контрольной точки или перезаписывает его целиком."""
+        tail_path = tail_path_for(self.file_path)
+        try:
+            # Файл лежит рядом с выпиской и читается без pickle, поэтому байты заголовка CSV - отдельный массив
+            checkpoint = dict(self._checkpoint or {})
+            header = np.frombuffer(checkpoint.pop("header", b""), dtype=np.uint8)
+            columns, arrays = frame_to_arrays(delta.frame)
+            arrays["checkpoint.header"] = header
+            segment = {"checkpoint": checkpoint, "columns": columns}
+            if reset:
+                temp_path = f"{tail_path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as file:
+                    write_record(file, self._settings())
+                    write_record(file, segment, arrays)
+                os.replace(temp_path, tail_path)
+            else:
+                with open(tail_path, "ab") as file:
+                    write_record(file, segment, arrays)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Не удалось записать контрольную точку {tail_path}: {e}")
+
+    def refresh(self) -> TransactionTable:
+        """
+        Дочитывает новые строки файла и вливает их в результат.
+
+        Returns:
+            Таблица с новыми транзакциями (после фильтрации и сортировки)
+        """
+        try:
+            checkpoint = self._checkpoint
+            reset = checkpoint is None or not checkpoint_is_valid(self.file_path, checkpoint)
+            if checkpoint is None or reset:
+                if checkpoint is not None:
+                    logger.info(f"Файл {self.file_path} изменен не дописыванием, читается заново")
+                checkpoint = start_checkpoint(self.file_path)
+                if checkpoint is None:
+                    return TransactionTable.from_records([])
+                self._checkpoint = checkpoint
+                self._parts, self._table = [], None
+
+            records, self._checkpoint = read_appended(self.file_path, checkpoint)
+            delta = self._prepare(records)
+
+        except FileNotFoundError:
+            logger.error(f"CSV файл не найден: {self.file_path}")
+            return TransactionTable.from_records([])
+        except Exception as e:
+            logger.error(f"Ошибка при дочитывании CSV файла {self.file_path}: {e}")
+            return TransactionTable.from_records([])
+
+        if records or reset:
+            self._add(delta)
+            if self.persist:
+                self._save(delta, reset)
+
+        logger.info(f"Дочитано {len(records)} строк из {self.file_path}, всего {len(self)} записей")
+        return delta
+
+    def follow(self, interval: float = FOLLOW_INTERVAL) -> Iterator[TransactionTable]:
+        """
+        Следит за файлом и отдает новые транзакции по мере дописывания.
+
+        Args:
+            interval: Пауза между проверками файла, секунды
+
+        Yields:
+            Таблицы с новыми транзакциями
+        """
+        while True:
+            delta = self.refresh()
+            if len(delta):
+                yield delta
+            else:
+                time.sleep(interval)
@@ -0,0 +1,201 @@
+import heapq
+import json
+import operator
+import os
+import struct
+import sys
+import tempfile
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .logger_config import setup_logger
+from .transaction import Transaction, parse_date_key
+
+logger = setup_logger("external_sort", "external_sort.log")
+
+# Объем памяти под сортируемые записи по умолчанию, байты
+MEMORY_BUDGET = 64 * 2**20
+
+# Максимальное количество файлов, сливаемых за один проход (ограничивает открытые файлы и буферы)
+MERGE_FAN_IN = 64
+
+# Заголовок записи в файле: ключ даты и длина сериализованной операции
+RECORD_HEADER = struct.Struct("<qI")
+
+# Примерные накладные расходы на одну запись в памяти (кортеж, объект bytes), байты
+ENTRY_OVERHEAD = 96
+
+# Минимальный размер буфера чтения одного файла при слиянии, байты
+MIN_READ_BUFFER = 64 * 2**10
+
+# Вид операции в начале записи серии: словарь или Transaction
+DICT_KIND = b"d"
+TRANSACTION_KIND = b"t"
+
+# Поля Transaction, которые сохраняются в серии (в порядке аргументов конструктора)
+TRANSACTION_FIELDS = [name for name in Transaction.__slots__ if name != "date_key"]
+
+# Ключи объектов JSON, которыми кодируются даты (значения Excel)
+DATETIME_TAG = "$datetime"
+DATE_TAG = "$date"
+
+Entry = Tuple[int, bytes]
+
+
+def _date_key(operation: Dict[str, Any]) -> int:
+    """Ключ даты операции; даты разбираются так же, как в Transaction."""
+    if isinstance(operation, Transaction):
+        return operation.date_key
+    return parse_date_key(operation.get("date"))
+
+
+def _json_default(value: Any) -> Dict[str, str]:
+    """Кодирует даты, которые не представимы в JSON, объектом с ключом DATETIME_TAG или DATE_TAG."""
+    if isinstance(value, datetime):
+        return {DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {DATE_TAG: value.isoformat()}
+    raise TypeError(f"Значение типа {type(value).__name__} не представимо в JSON")
+
+
+def _json_object(value: Dict[str, Any]) -> Any:
+    """Восстанавливает даты, закодированные _json_default."""
+    if len(value) == 1:
+        if DATETIME_TAG in value:
+            return datetime.fromisoformat(value[DATETIME_TAG])
+        if DATE_TAG in value:
+            return date.fromisoformat(value[DATE_TAG])
+    return value
+
+
+def _encode(operation: Dict[str, Any]) -> bytes:
+    """
+    Сериализует операцию для серии: вид операции и JSON ее полей.
+
+    Серии записываются во временную папку, поэтому вместо pickle
+    используется JSON: чтение подмененного файла не может выполнить код.
+    """
+    if isinstance(operation, Transaction):
+        kind, value = TRANSACTION_KIND, [getattr(operation, name) for name in TRANSACTION_FIELDS]
+    else:
+        kind, value = DICT_KIND, operation
+    return kind + json.dumps(value, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _decode(blob: bytes) -> Any:
+    """Восстанавливает операцию (словарь или Transaction), сериализованную _encode."""
+    value = json.loads(blob[1:].decode("utf-8"), object_hook=_json_object)
+    if blob[:1] == TRANSACTION_KIND:
+        return Transaction(**dict(zip(TRANSACTION_FIELDS, value)))
+    return value
+
+
+def _write_run(entries: Iterable[Entry], directory: str, number: int) -> str:
+    """Записывает отсортированную серию в файл: заголовок RECORD_HEADER и операция, сериализованная _encode."""
+    path = os.path.join(directory, f"run-{number:06d}.bin")
+    with open(path, "wb") as file:
+        for key, blob in entries:
+            file.write(RECORD_HEADER.pack(key, len(blob)))
+            file.write(blob)
+    return path
+
+
+def _read_run(path: str, buffer_size: int) -> Iterator[Entry]:
+    """Читает записи серии по порядку, не разбирая сами операции."""
+    with open(path, "rb", buffering=buffer_size) as file:
+        yield from _read_entries(file)
+
+
+def _read_entries(file: BinaryIO) -> Iterator[Entry]:
+    """Читает записи (ключ даты, сериализованная операция) до конца файла."""
+    header_size = RECORD_HEADER.size
+    while True:
+        header = file.read(header_size)
+        if len(header) < header_size:
+            return
+        key, length = RECORD_HEADER.unpack(header)
+        yield key, file.read(length)
+
+
+def _merge_runs(paths: List[str], reverse: bool, buffer_size: int) -> Iterator[Entry]:
+    """Сливает серии; при равных датах раньше идет запись из более ранней серии (устойчивость)."""
+    return heapq.merge(
+        *(_read_run(path, buffer_size) for path in paths), key=operator.itemgetter(0), reverse=reverse
+    )
+
+
+def external_sort_by_date(
+    operations: Iterable[Dict[str, Any]],
+    reverse: bool = True,
+    memory_budget: int = MEMORY_BUDGET,
+    temp_dir: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Сортирует операции по дате, не загружая их в память целиком (внешняя сортировка слиянием).
+
+    Операции читаются потоком и сериализуются в JSON; когда их объем
+    достигает memory_budget, накопленная серия сортируется и записывается
+    во временный файл. Затем серии сливаются heapq.merge по ключу даты,
+    который хранится в заголовке записи, поэтому операции разбираются
+    только при выдаче. Если серий больше MERGE_FAN_IN, слияние выполняется
+    в несколько проходов. Сортировка устойчива и дает тот же порядок,
+    что и sort_by_date; если все операции уместились в бюджет, файлы не создаются.
+
+    Args:
+        operations: Итератор операций (например, detect_file_type_and_iter) или список
+        reverse: Если True - по убыванию, False - по возрастанию
+        memory_budget: Объем памяти под одну серию, байты
+        temp_dir: Папка для временных файлов (по умолчанию системная)
+
+    Yields:
+        Операции в порядке даты
+
+    Raises:
+        ValueError: Если memory_budget не положительный
+        TypeError: Если значение операции не представимо в JSON (кроме дат datetime и date)
+    """
+    if memory_budget <= 0:
+        raise ValueError("memory_budget должен быть положительным")
+
+    def sort_run(entries: List[Entry]) -> None:
+        entries.sort(key=operator.itemgetter(0), reverse=reverse)
+
+    with tempfile.TemporaryDirectory(prefix="external_sort-", dir=temp_dir) as directory:
+        runs: List[str] = []
+        entries: List[Entry] = []
+        used = 0
+        for operation in operations:
+            blob = _encode(operation)
+            entries.append((_date_key(operation), blob))
+            used += sys.getsizeof(blob) + ENTRY_OVERHEAD
+            if used >= memory_budget:
+                sort_run(entries)
+                runs.append(_write_run(entries, directory, len(runs)))
+                entries, used = [], 0
+
+        sort_run(entries)
+        if not runs:
+            for _, blob in entries:
+                yield _decode(blob)
+            return
+        if entries:
+            runs.append(_write_run(entries, directory, len(runs)))
+        del entries
+        logger.info(f"Внешняя сортировка: {len(runs)} серий в {directory}")
+
+        # Промежуточные проходы: группы по MERGE_FAN_IN серий сливаются в одну
+        number = len(runs)
+        buffer_size = max(memory_budget // MERGE_FAN_IN, MIN_READ_BUFFER)
+        while len(runs) > MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(runs), MERGE_FAN_IN):
+                group = runs[start: start + MERGE_FAN_IN]
+                merged.append(_write_run(_merge_runs(group, reverse, buffer_size), directory, number))
+                number += 1
+                for path in group:
+                    os.remove(path)
+            runs = merged
+            logger.debug(f"Промежуточное слияние: осталось {len(runs)} серий")
+
+        for _, blob in _merge_runs(runs, reverse, max(memory_budget // len(runs), MIN_READ_BUFFER)):
+            yield _decode(blob)
@@ -1,19 +1,407 @@
-from typing import Any, Dict, List
+import bz2
+import codecs
+import gzip
+import io
+import json
+import lzma
+import os
+from typing import IO, Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
 import pandas as pd
+from openpyxl import load_workbook
+
 from .logger_config import setup_logger
 
+try:
+    import pyarrow  # type: ignore[import-not-found]  # noqa: F401
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 logger = setup_logger("file_reader", "file_reader.log")
 
+# Размер блока, которым потоковый JSON-ридер читает файл
+JSON_BUFFER_SIZE = 65536
+
+# Количество строк CSV, обрабатываемых за один раз в потоковом режиме
+CSV_CHUNK_SIZE = 50000
+
+# Объем начала CSV-файла, по которому определяются разделитель и кодировка
+CSV_SNIFF_SIZE = 65536
+
+# Возможные разделители колонок в CSV-выписках
+CSV_DELIMITERS = (";", ",", "\t", "|")
+
+# Кодировка, которую используют выгрузки, не являющиеся UTF-8
+CSV_FALLBACK_ENCODING = "cp1251"
+
+# Сигнатуры сжатых файлов и названия алгоритмов сжатия (как в параметре compression у pandas)
+COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+# Расширения сжатых файлов (data.json.gz, transactions.csv.xz и т.п.)
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+
+# Расширения файлов с транзакциями и соответствующие им форматы
+FILE_TYPES = {".json": "json", ".csv": "csv", ".xlsx": "xlsx", ".xls": "xls"}
+
+# Сигнатуры форматов Excel: XLSX - zip-архив, XLS - составной документ OLE
+EXCEL_MAGIC = ((b"PK\x03\x04", "xlsx"), (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "xls"))
+
+# Объем начала файла, по которому определяется его формат
+SNIFF_SIZE = 4096
+
+# Схема транзакции: колонки с небольшим числом различных значений читаются как категориальные
+CATEGORY_COLUMNS = ("state", "status", "currency_name", "currency_code", "description")
+
+# Схема транзакции: числовые колонки и их типы
+NUMERIC_DTYPES = {"id": "Int64", "amount": "float64"}
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Определяет алгоритм сжатия файла по первым байтам (сигнатуре).
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        "gzip", "bz2", "xz", "zstd" или None для несжатого файла
+    """
+    with open(file_path, "rb") as file:
+        head = file.read(8)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_zstd(file_path: str) -> BinaryIO:
+    """Открывает файл zstd через compression.zstd (Python 3.14+) или пакет zstandard."""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+
+        stream: BinaryIO = zstd.open(file_path, "rb")
+        return stream
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ImportError("Для чтения файлов zstd нужен Python 3.14+ или пакет zstandard") from None
+    reader = zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return io.BufferedReader(reader)
+
+
+def open_binary(file_path: str) -> BinaryIO:
+    """
+    Открывает файл для чтения байтов, распаковывая его на лету.
+
+    Сжатие определяется по содержимому, а не по расширению, поэтому
+    временная распакованная копия на диске не создается.
+
+    Args:
+        file_path: Путь к файлу (несжатому или сжатому gzip, bz2, xz, zstd)
+
+    Returns:
+        Файловый объект с распакованным содержимым
+    """
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")  # type: ignore[return-value]
+    if compression == "bz2":
+        return bz2.open(file_path, "rb")  # type: ignore[return-value]
+    if compression == "xz":
+        return lzma.open(file_path, "rb")  # type: ignore[return-value]
+    if compression == "zstd":
+        return _open_zstd(file_path)
+    return open(file_path, "rb")
+
+
+def open_text(file_path: str, encoding: str = "utf-8") -> IO[str]:
+    """Открывает файл (в том числе сжатый) для чтения текста."""
+    return io.TextIOWrapper(open_binary(file_path), encoding=encoding)
+
+
+def sniff_file_type(file_path: str) -> Optional[str]:
+    """
+    Определяет формат файла с транзакциями по содержимому.
+
+    Сжатый файл предварительно распаковывается на лету. XLSX и XLS определяются
+    по сигнатуре, JSON - по первому непробельному символу ("[" или "{"),
+    остальные текстовые файлы считаются CSV.
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        "json", "csv", "xlsx", "xls" или None, если файл не удалось прочитать
+    """
+    try:
+        with open_binary(file_path) as file:
+            head = file.read(SNIFF_SIZE)
+    except (OSError, EOFError, ImportError, lzma.LZMAError) as e:
+        logger.error(f"Не удалось прочитать файл {file_path}: {e}")
+        return None
+
+    for magic, file_type in EXCEL_MAGIC:
+        if head.startswith(magic):
+            return file_type
+
+    text = head[len(codecs.BOM_UTF8):] if head.startswith(codecs.BOM_UTF8) else head
+    text = text.lstrip()
+    if text.startswith((b"[", b"{")):
+        return "json"
+    return "csv" if text else None
+
+
+def detect_file_type(file_path: str) -> Optional[str]:
+    """
+    Определяет формат файла с транзакциями.
+
+    Для файлов с известным расширением (.json, .csv, .xlsx, .xls) формат
+    берется из расширения. Для сжатых файлов (data.json.gz) учитывается
+    расширение под суффиксом сжатия, а при неизвестном расширении формат
+    определяется по содержимому.
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        "json", "csv", "xlsx", "xls" или None
+    """
+    base, extension = os.path.splitext(file_path.lower())
+    if extension in COMPRESSION_EXTENSIONS:
+        base, extension = os.path.splitext(base)
+    if extension in FILE_TYPES:
+        return FILE_TYPES[extension]
+    return sniff_file_type(file_path)
+
+
+def transaction_dtypes(columns: Iterable[Any]) -> Dict[Any, str]:
+    """
+    Возвращает словарь типов для read_csv/read_excel по заголовку файла.
+
+    Args:
+        columns: Названия колонок в том виде, в котором они записаны в файле
+
+    Returns:
+        Словарь {колонка: "category"} для категориальных колонок схемы
+    """
+    return {column: "category" for column in columns if str(column).lower().strip() in CATEGORY_COLUMNS}
+
+
+def _to_numeric(column: pd.Series, dtype: str) -> pd.Series:
+    """Приводит колонку к числовому типу, если все ее значения являются числами."""
+    converted = pd.to_numeric(column, errors="coerce")
+    if converted.notna().sum() != column.notna().sum():
+        # Нечисловые значения не теряем - оставляем колонку как есть
+        return column
+    try:
+        return converted.astype(dtype)
+    except (TypeError, ValueError):
+        return converted
+
+
+def apply_transaction_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит колонки DataFrame к типам схемы транзакции.
+
+    Args:
+        df: DataFrame, прочитанный из CSV или Excel
+
+    Returns:
+        DataFrame с категориальными и числовыми колонками
+    """
+    categories = {
+        column: dtype
+        for column, dtype in transaction_dtypes(df.columns).items()
+        if not isinstance(df[column].dtype, pd.CategoricalDtype)
+    }
+    if categories:
+        df = df.astype(categories)
+
+    for column in df.columns:
+        dtype = NUMERIC_DTYPES.get(str(column).lower().strip())
+        if dtype and str(df[column].dtype) != dtype:
+            df[column] = _to_numeric(df[column], dtype)
+    return df
+
+
+def sniff_csv_dialect(file_path: str) -> Dict[str, Optional[str]]:
+    """
+    Определяет разделитель и кодировку CSV-файла по его началу.
+
+    Кодировка: UTF-8 (с BOM или без), иначе cp1251. Разделитель - символ из
+    CSV_DELIMITERS, который чаще всего встречается в строке заголовка. Сжатый
+    файл pandas распаковывает на лету по найденному алгоритму сжатия.
+
+    Args:
+        file_path: Путь к CSV-файлу
+
+    Returns:
+        Словарь {"sep": разделитель, "encoding": кодировка, "compression": сжатие} для pd.read_csv
+    """
+    compression = detect_compression(file_path)
+    with open_binary(file_path) as file:
+        head = file.read(CSV_SNIFF_SIZE)
+
+    if head.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        try:
+            # Последний символ блока может быть обрезан, поэтому декодируем не окончательно
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = CSV_FALLBACK_ENCODING
+
+    lines = head.decode(encoding, errors="ignore").splitlines()
+    header = lines[0] if lines else ""
+    counts = {delimiter: header.count(delimiter) for delimiter in CSV_DELIMITERS}
+    sep = max(CSV_DELIMITERS, key=lambda delimiter: counts[delimiter])
+    if not counts[sep]:
+        sep = ";"
+
+    logger.debug(f"Формат CSV файла {file_path}: разделитель {sep!r}, кодировка {encoding}, сжатие {compression}")
+    return {"sep": sep, "encoding": encoding, "compression": compression}
+
+
+def _csv_dtypes(file_path: str, dialect: Dict[str, Optional[str]]) -> Dict[Any, str]:
+    """Читает только заголовок CSV и строит по нему словарь типов."""
+    header = pd.read_csv(file_path, nrows=0, **dialect)
+    return transaction_dtypes(header.columns)
+
+
+def _read_csv_pyarrow(file_path: str, dialect: Dict[str, Optional[str]]) -> pd.DataFrame:
+    """
+    Читает CSV-файл многопоточным парсером pyarrow.
+
+    pd.read_csv(engine="pyarrow") сам распознает даты и превращает их в Timestamp,
+    поэтому парсер вызывается напрямую: колонки с датами читаются строками,
+    пустые строки считаются пропусками - как у стандартного движка pandas.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv  # type: ignore[import-not-found]
+
+    header = pd.read_csv(file_path, nrows=0, **dialect).columns
+    convert_options = pa_csv.ConvertOptions(
+        column_types={column: pa.string() for column in header if "date" in str(column).lower()},
+        strings_can_be_null=True,
+    )
+    with open_binary(file_path) as file:
+        table = pa_csv.read_csv(
+            file,
+            read_options=pa_csv.ReadOptions(encoding=dialect["encoding"]),
+            parse_options=pa_csv.ParseOptions(delimiter=dialect["sep"]),
+            convert_options=convert_options,
+        )
+    return table.to_pandas().astype(transaction_dtypes(header))
+
+
+def read_csv_frame(file_path: str) -> pd.DataFrame:
+    """
+    Читает CSV-файл в DataFrame с определением формата и схемой типов.
+
+    Разделитель и кодировка определяются один раз по началу файла. Если
+    установлен pyarrow, используется многопоточный движок pyarrow, иначе
+    (или при ошибке pyarrow) - стандартный движок pandas.
+
+    Args:
+        file_path: Путь к CSV-файлу
+
+    Returns:
+        DataFrame с колонками файла
+    """
+    dialect = sniff_csv_dialect(file_path)
+
+    if PYARROW_AVAILABLE:
+        try:
+            return _read_csv_pyarrow(file_path, dialect)
+        except Exception as e:
+            logger.warning(f"Движок pyarrow не смог прочитать {file_path}, используется стандартный: {e}")
+
+    return pd.read_csv(file_path, dtype=_csv_dtypes(file_path, dialect), **dialect)
+
+
+def _resolve_state_columns(columns: List[str]) -> List[str]:
+    """
+    Определяет, из каких колонок берется статус операции.
+
+    Если есть колонка state, используется только она, иначе - все колонки,
+    в названии которых встречается state или status (в порядке следования).
+    """
+    if "state" in columns:
+        return ["state"]
+    return [column for column in columns if "state" in column or "status" in column]
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Нормализует DataFrame с транзакциями на уровне колонок.
+
+    Названия колонок приводятся к нижнему регистру один раз, статус переводится
+    в верхний регистр векторной операцией, а альтернативные колонки статуса
+    (status, operation_state и т.п.) определяются один раз по заголовку.
+    """
+    df = apply_transaction_dtypes(df)
+    columns = [str(column).lower().strip() for column in df.columns]
+    df = df.set_axis(columns, axis=1)
+    if len(set(columns)) != len(columns):
+        # При совпадении названий после нормализации остается последняя колонка
+        df = df.loc[:, ~df.columns.duplicated(keep="last")]
+        columns = list(df.columns)
+
+    state_columns = _resolve_state_columns(columns)
+    if state_columns:
+        state = df["state"].astype(object) if "state" in columns else pd.Series(None, index=df.index, dtype=object)
+        resolved = pd.Series(False, index=df.index)
+        for column in state_columns:
+            values = df[column]
+            text = values.astype(str)
+            # Берем первое непустое значение среди колонок статуса
+            present = values.notna() & (text != "") & ~resolved
+            state = state.where(~present, text.str.upper())
+            resolved |= present
+        df = df.assign(state=state.astype("category"))
+
+    return df
+
+
+def _column_values(column: pd.Series) -> List[Any]:
+    """Возвращает значения колонки списком, заменяя пропуски на None."""
+    values: List[Any] = (
+        column.to_numpy(dtype=object, na_value=None).tolist() if column.isna().any() else column.tolist()
+    )
+    return values
+
+
+def format_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Преобразует DataFrame из CSV/Excel в список транзакций с нормализованными ключами и статусом."""
+    df = _normalize_frame(df)
+    columns = list(df.columns)
+    values = [_column_values(df[column]) for column in columns]
+
+    # Построчно остается только сборка словарей
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
 
 def read_csv_file(file_path: str) -> List[Dict[str, Any]]:
     """
-    Читает CSV-файл с разделителем ";" и преобразует в нужный формат.
+    Читает CSV-файл и преобразует в нужный формат.
+
+    Разделитель (";", ",", табуляция, "|") и кодировка определяются по началу файла.
     """
     logger.debug(f"Попытка чтения CSV файла: {file_path}")
 
     try:
-        # Читаем CSV с разделителем ";" и кодировкой UTF-8
-        df = pd.read_csv(file_path, sep=";", encoding='utf-8')
+        # Формат определяем по началу файла, типы колонок задаем по схеме
+        df = read_csv_frame(file_path)
 
         # Логируем информацию о файле для отладки
         logger.debug(f"CSV файл прочитан. Колонки: {list(df.columns)}")
@@ -24,37 +412,7 @@ def read_csv_file(file_path: str) -> List[Dict[str, Any]]:
             logger.debug(
                 f"Уникальные статусы: {df['state'].unique() if 'state' in df.columns else 'Нет колонки state'}")
 
-        # Заменяем NaN на None для корректной конвертации
-        df = df.where(pd.notna(df), None)
-
-        # Конвертируем DataFrame в список словарей
-        transactions = df.to_dict("records")
-
-        # Проверяем и преобразуем структуру если нужно
-        formatted_transactions = []
-        for transaction in transactions:
-            # Приводим ключи к нижнему регистру для consistency
-            formatted_transaction = {}
-            for key, value in transaction.items():
-                key_lower = str(key).lower().strip()
-
-                # Особое внимание к полю state - приводим к верхнему регистру
-                if key_lower == 'state' and value:
-                    formatted_transaction[key_lower] = str(value).upper()
-                else:
-                    formatted_transaction[key_lower] = value
-
-            # Проверяем наличие поля state
-            if 'state' not in formatted_transaction:
-                # Пробуем найти поле с другим названием
-                state_keys = [k for k in formatted_transaction.keys() if 'state' in k.lower() or 'status' in k.lower()]
-                if state_keys:
-                    for state_key in state_keys:
-                        if formatted_transaction[state_key]:
-                            formatted_transaction['state'] = str(formatted_transaction[state_key]).upper()
-                            break
-
-            formatted_transactions.append(formatted_transaction)
+        formatted_transactions = format_records(df)
 
         logger.info(f"Успешно прочитан CSV файл: {file_path}. Найдено {len(formatted_transactions)} записей")
 
@@ -76,6 +434,75 @@ def read_csv_file(file_path: str) -> List[Dict[str, Any]]:
         return []
 
 
+def iter_csv_chunks(file_path: str, chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Читает CSV-файл блоками фиксированного размера.
+
+    Каждый блок читается через pd.read_csv(chunksize=...) и нормализуется так же,
+    как в read_csv_file, поэтому потребление памяти зависит от chunk_size,
+    а не от размера файла.
+
+    Args:
+        file_path: Путь к CSV-файлу
+        chunk_size: Количество строк в одном блоке
+
+    Yields:
+        Списки транзакций длиной не более chunk_size
+    """
+    logger.debug(f"Потоковое чтение CSV файла: {file_path}, размер блока: {chunk_size}")
+
+    if chunk_size < 1:
+        raise ValueError("Размер блока должен быть не меньше 1")
+
+    count = 0
+    try:
+        # Движок pyarrow не поддерживает chunksize, поэтому блоки читает стандартный движок
+        dialect = sniff_csv_dialect(file_path)
+        dtypes = _csv_dtypes(file_path, dialect)
+        with pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size, **dialect) as reader:
+            for chunk in reader:
+                batch = format_records(chunk)
+                count += len(batch)
+                yield batch
+
+        logger.info(f"Успешно прочитан CSV файл: {file_path}. Найдено {count} записей")
+
+    except FileNotFoundError:
+        logger.error(f"CSV файл не найден: {file_path}")
+    except pd.errors.EmptyDataError:
+        logger.error(f"CSV файл пустой: {file_path}")
+    except Exception as e:
+        logger.error(f"Ошибка при чтении CSV файла {file_path} после {count} записей: {e}")
+
+
+def iter_csv_file(file_path: str, chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково читает CSV-файл и отдает транзакции по одной.
+
+    Args:
+        file_path: Путь к CSV-файлу
+        chunk_size: Количество строк, читаемых с диска за один раз
+
+    Yields:
+        Транзакции в порядке следования в файле
+    """
+    for batch in iter_csv_chunks(file_path, chunk_size):
+        yield from batch
+
+
+def _excel_source(file_path: str) -> Union[str, IO[bytes]]:
+    """
+    Возвращает источник для чтения Excel-файла.
+
+    XLSX - это zip-архив, которому нужен произвольный доступ, поэтому сжатый
+    файл распаковывается в память (без временной копии на диске).
+    """
+    if detect_compression(file_path) is None:
+        return file_path
+    with open_binary(file_path) as file:
+        return io.BytesIO(file.read())
+
+
 def read_excel_file(file_path: str, sheet_name: str = 0) -> List[Dict[str, Any]]:
     """
     Читает Excel-файл и преобразует в нужный формат.
@@ -84,31 +511,12 @@ def read_excel_file(file_path: str, sheet_name: str = 0) -> List[Dict[str, Any]]
 
     try:
         # Читаем Excel файл
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        df = pd.read_excel(_excel_source(file_path), sheet_name=sheet_name)
 
         # Логируем информацию о файле
         logger.debug(f"Excel файл прочитан. Колонки: {list(df.columns)}")
 
-        # Заменяем NaN на None
-        df = df.where(pd.notna(df), None)
-
-        # Конвертируем в список словарей
-        transactions = df.to_dict("records")
-
-        # Форматируем транзакции
-        formatted_transactions = []
-        for transaction in transactions:
-            formatted_transaction = {}
-            for key, value in transaction.items():
-                key_lower = str(key).lower().strip()
-
-                # Приводим state к верхнему регистру
-                if key_lower == 'state' and value:
-                    formatted_transaction[key_lower] = str(value).upper()
-                else:
-                    formatted_transaction[key_lower] = value
-
-            formatted_transactions.append(formatted_transaction)
+        formatted_transactions = format_records(df)
 
         logger.info(f"Успешно прочитан Excel файл: {file_path}. Найдено {len(formatted_transactions)} записей")
         return formatted_transactions
@@ -121,14 +529,79 @@ def read_excel_file(file_path: str, sheet_name: str = 0) -> List[Dict[str, Any]]
         return []
 
 
+def _iter_sheet_rows(rows: Iterator[tuple]) -> Iterator[Dict[str, Any]]:
+    """Преобразует строки листа Excel в транзакции; заголовок разбирается один раз."""
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = [str(column).lower().strip() for column in header]
+    state_positions = [columns.index(column) for column in _resolve_state_columns(columns)]
+
+    for row in rows:
+        if all(value is None for value in row):
+            continue
+
+        transaction = dict(zip(columns, row))
+        if state_positions:
+            state = transaction.get("state")
+            for position in state_positions:
+                value = row[position] if position < len(row) else None
+                if value is not None and str(value) != "":
+                    state = str(value).upper()
+                    break
+            transaction["state"] = state
+        yield transaction
+
+
+def iter_excel_file(file_path: str, sheet_name: Optional[Union[int, str]] = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково читает XLSX-файл в режиме только для чтения.
+
+    Строки листа читаются по одной через openpyxl, заголовок нормализуется
+    один раз, поэтому в памяти не держится ни весь лист, ни вся книга.
+
+    Args:
+        file_path: Путь к XLSX-файлу
+        sheet_name: Номер или название листа; None - все листы по очереди
+
+    Yields:
+        Транзакции в порядке следования в листах
+    """
+    logger.debug(f"Потоковое чтение Excel файла: {file_path}, лист: {sheet_name}")
+
+    count = 0
+    try:
+        workbook = load_workbook(_excel_source(file_path), read_only=True, data_only=True)
+        try:
+            if sheet_name is None:
+                sheets = workbook.worksheets
+            elif isinstance(sheet_name, int):
+                sheets = [workbook.worksheets[sheet_name]]
+            else:
+                sheets = [workbook[sheet_name]]
+
+            for sheet in sheets:
+                for transaction in _iter_sheet_rows(sheet.iter_rows(values_only=True)):
+                    count += 1
+                    yield transaction
+        finally:
+            workbook.close()
+
+        logger.info(f"Успешно прочитан Excel файл: {file_path}. Найдено {count} записей")
+
+    except FileNotFoundError:
+        logger.error(f"Excel файл не найден: {file_path}")
+    except Exception as e:
+        logger.error(f"Ошибка при чтении Excel файла {file_path} после {count} записей: {e}")
+
+
 def read_json_file(file_path: str) -> List[Dict[str, Any]]:
     """Читает JSON-файл."""
-    import json
-
     logger.debug(f"Попытка чтения JSON файла: {file_path}")
 
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
+        with open_text(file_path) as file:
             data = json.load(file)
 
         if isinstance(data, list):
@@ -149,19 +622,155 @@ def read_json_file(file_path: str) -> List[Dict[str, Any]]:
         return []
 
 
+def iter_json_file(file_path: str, buffer_size: int = JSON_BUFFER_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково читает JSON-файл с массивом транзакций верхнего уровня.
+
+    Файл читается блоками по buffer_size символов, элементы массива разбираются
+    по одному, поэтому в памяти одновременно находится только текущий блок
+    и текущая транзакция.
+
+    Args:
+        file_path: Путь к JSON-файлу
+        buffer_size: Размер блока чтения в символах
+
+    Yields:
+        Транзакции в порядке следования в файле
+    """
+    logger.debug(f"Потоковое чтение JSON файла: {file_path}")
+
+    decoder = json.JSONDecoder()
+    count = 0
+
+    try:
+        with open_text(file_path) as file:
+            buffer = ""
+            pos = 0
+            eof = False
+
+            def fill() -> bool:
+                """Дочитывает следующий блок, отбрасывая уже разобранную часть буфера."""
+                nonlocal buffer, pos, eof
+                if eof:
+                    return False
+                chunk = file.read(buffer_size)
+                if not chunk:
+                    eof = True
+                    return False
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                return True
+
+            def skip_whitespace() -> str:
+                """Пропускает пробельные символы и возвращает следующий символ ('' в конце файла)."""
+                nonlocal pos
+                while True:
+                    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                        pos += 1
+                    if pos < len(buffer):
+                        return buffer[pos]
+                    if not fill():
+                        return ""
+
+            if skip_whitespace() != "[":
+                logger.warning(f"Файл {file_path} не содержит список.")
+                return
+
+            pos += 1
+            if skip_whitespace() == "]":
+                logger.info(f"Успешно прочитан JSON файл: {file_path}. Найдено 0 записей")
+                return
+
+            while True:
+                if not skip_whitespace():
+                    raise json.JSONDecodeError("Незавершенный массив", buffer, pos)
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Элемент не поместился в буфер целиком - дочитываем файл
+                    if fill():
+                        continue
+                    raise
+
+                if not isinstance(item, (dict, list, str)) and not eof:
+                    # Число на границе блока могло быть прочитано не полностью: начало "0." или "-2.5e"
+                    # разбирается как более короткое число. Оно завершено, только если за ним в буфере
+                    # уже есть разделитель
+                    rest = end
+                    while rest < len(buffer) and buffer[rest] in " \t\r\n":
+                        rest += 1
+                    if (rest == len(buffer) or buffer[rest] not in ",]") and fill():
+                        continue
+
+                pos = end
+                yield item
+                count += 1
+
+                separator = skip_whitespace()
+                pos += 1
+                if separator == "]":
+                    break
+                if separator != ",":
+                    raise json.JSONDecodeError("Ожидался разделитель ','", buffer, pos - 1)
+
+        logger.info(f"Успешно прочитан JSON файл: {file_path}. Найдено {count} записей")
+
+    except FileNotFoundError:
+        logger.error(f"Файл не найден: {file_path}")
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка декодирования JSON в файле {file_path} после {count} записей: {e}")
+    except Exception as e:
+        logger.error(f"Неожиданная ошибка при чтении файла {file_path}: {e}")
+
+
 def detect_file_type_and_read(file_path: str) -> List[Dict[str, Any]]:
-    """Определяет тип файла и читает данные."""
+    """
+    Определяет тип файла и читает данные.
+
+    Сжатые файлы (.json.gz, .csv.xz и т.п.) распаковываются на лету, формат
+    файла с неизвестным расширением определяется по содержимому.
+    """
     logger.debug(f"Определение типа файла: {file_path}")
 
-    if file_path.lower().endswith(".csv"):
+    file_type = detect_file_type(file_path)
+    if file_type == "csv":
         logger.debug(f"Определен как CSV файл: {file_path}")
         return read_csv_file(file_path)
-    elif file_path.lower().endswith((".xlsx", ".xls")):
+    elif file_type in ("xlsx", "xls"):
         logger.debug(f"Определен как Excel файл: {file_path}")
         return read_excel_file(file_path)
-    elif file_path.lower().endswith(".json"):
+    elif file_type == "json":
         logger.debug(f"Определен как JSON файл: {file_path}")
         return read_json_file(file_path)
     else:
         logger.error(f"Неподдерживаемый формат файла: {file_path}")
-        return []
\ No newline at end of file
+        return []
+
+
+def detect_file_type_and_iter(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Потоковый вариант detect_file_type_and_read.
+
+    JSON-, CSV- и XLSX-файлы разбираются инкрементально, поэтому фильтры (filter_by_state,
+    filter_by_currency) начинают получать транзакции до окончания разбора файла.
+
+    Args:
+        file_path: Путь к файлу с транзакциями (в том числе сжатому)
+
+    Yields:
+        Транзакции по одной
+    """
+    logger.debug(f"Определение типа файла для потокового чтения: {file_path}")
+
+    file_type = detect_file_type(file_path)
+    if file_type == "json":
+        yield from iter_json_file(file_path)
+    elif file_type == "csv":
+        yield from iter_csv_file(file_path)
+    elif file_type == "xlsx":
+        yield from iter_excel_file(file_path)
+    elif file_type == "xls":
+        # Старый формат .xls не поддерживается openpyxl, читаем целиком
+        yield from read_excel_file(file_path)
+    else:
+        logger.error(f"Неподдерживаемый формат файла: {file_path}")
@@ -1,22 +1,142 @@
-from typing import Any, Dict, Iterator, List
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 
-def filter_by_currency(transactions: List[Dict[str, Any]], currency_code: str) -> Iterator[Dict[str, Any]]:
+from .transaction import Transaction
+from .transaction_table import TransactionTable
+
+# Максимальный 16-значный номер карты
+MAX_CARD_NUMBER = 9999999999999999
+
+# Длина строки с номером карты в блочном режиме: "XXXX XXXX XXXX XXXX\n"
+CARD_LINE_WIDTH = 20
+
+# Количество номеров карт, форматируемых за один раз в блочном режиме
+CARD_BLOCK_SIZE = 1 << 20
+
+
+def _card_word_tables() -> Tuple[np.ndarray, ...]:
+    """
+    Строит таблицы 32-битных слов для строки "XXXX XXXX XXXX XXXX\n" (5 слов по 4 байта).
+
+    Строка делится на 4 группы цифр g0-g3, а слова ложатся на нее так:
+    "g0g0" " g1g1g1" "g1 g2g2" "g2g2 g3" "g3g3g3\n". Таблица для группы
+    по числу 0-9999 дает байты этой группы (и пробелов) на их местах
+    в слове; слово, покрывающее две группы, собирается операцией ИЛИ.
     """
-    Фильтрует транзакции по заданной валюте.
+    digits = (np.arange(10000)[:, None] // np.array([1000, 100, 10, 1]) % 10 + ord("0")).astype("<u4")
+    d0, d1, d2, d3 = digits.T
+    space, newline = ord(" "), ord("\n")
+    return (
+        d0 | d1 << 8 | d2 << 16 | d3 << 24,  # слово 0: g0
+        space | d0 << 8 | d1 << 16 | d2 << 24,  # слово 1: пробел и g1
+        d3 | space << 8,  # слово 2: конец g1 и пробел
+        d0 << 16 | d1 << 24,  # слово 2: начало g2
+        d2 | d3 << 8 | space << 16,  # слово 3: конец g2 и пробел
+        d0 << 24,  # слово 3: начало g3
+        d1 | d2 << 8 | d3 << 16 | newline << 24,  # слово 4: конец g3 и перевод строки
+    )
+
+
+_CARD_WORDS = _card_word_tables()
+
+
+def _luhn_sums() -> np.ndarray:
+    """Вклад 4 цифр числа 0-9999 в сумму Луна, когда удваиваются 1-я и 3-я цифры справа."""
+    digits = np.arange(10000)[:, None] // np.array([1000, 100, 10, 1]) % 10
+    doubled = digits * 2
+    doubled -= 9 * (doubled > 9)
+    sums: np.ndarray = digits[:, 0] + doubled[:, 1] + digits[:, 2] + doubled[:, 3]
+    return sums
+
+
+_LUHN_SUMS = _luhn_sums()
+
+# Контрольная цифра по сумме Луна
+_LUHN_CHECK = (10 - np.arange(4 * int(_LUHN_SUMS.max()) + 1) % 10) % 10
+
+# Первая цифра четырехзначной группы
+_THOUSANDS = np.arange(10000) // 1000
+
+
+def currency_codes(currency_code: Union[str, Iterable[str]]) -> FrozenSet[str]:
+    """Приводит код валюты или набор кодов к множеству кодов."""
+    if isinstance(currency_code, str):
+        return frozenset([currency_code])
+    return frozenset(currency_code)
+
+
+def operation_currency(transaction: Dict[str, Any]) -> Optional[Any]:
+    """
+    Возвращает код валюты операции.
 
     Args:
-        transactions: Список словарей с транзакциями
-        currency_code: Код валюты для фильтрации (например, "USD", "RUB")
+        transaction: Словарь транзакции (operationAmount -> currency или плоское поле currency_code) или Transaction
 
-    Yields:
-        Словари транзакций, где валюта операции соответствует заданной
+    Returns:
+        Код валюты или None, если валюта не указана
     """
-    for transaction in transactions:
-        operation_amount = transaction.get("operationAmount", {})
-        currency = operation_amount.get("currency", {})
-        if currency.get("code") == currency_code:
-            yield transaction
+    if isinstance(transaction, Transaction):
+        return transaction.currency_code
+    operation_amount = transaction.get("operationAmount")
+    if isinstance(operation_amount, dict):
+        currency = operation_amount.get("currency")
+        return currency.get("code") if isinstance(currency, dict) else currency
+    return transaction.get("currency_code")
+
+
+def currency_matcher(
+    currency_code: Union[str, Iterable[str]], exclude: bool = False
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Создает проверку операции по валюте.
+
+    Args:
+        currency_code: Код валюты или набор кодов
+        exclude: Если True - проверку проходят операции в любой другой валюте (и без валюты)
+
+    Returns:
+        Функция, возвращающая True для подходящих операций
+    """
+    codes = currency_codes(currency_code)
+    if exclude:
+        return lambda transaction: operation_currency(transaction) not in codes
+    return lambda transaction: operation_currency(transaction) in codes
+
+
+def filter_by_currency(
+    transactions: Union[Iterable[Dict[str, Any]], TransactionTable],
+    currency_code: Union[str, Iterable[str]],
+    exclude: bool = False,
+) -> Union[Iterator[Dict[str, Any]], TransactionTable]:
+    """
+    Фильтрует транзакции по заданной валюте или набору валют.
+
+    Примеры: filter_by_currency(data, "RUB"), filter_by_currency(data, {"USD", "EUR"}),
+    filter_by_currency(data, "RUB", exclude=True) - все операции, кроме рублевых.
+
+    Args:
+        transactions: Список или итератор словарей с транзакциями либо TransactionTable
+        currency_code: Код валюты (например, "USD", "RUB") или набор кодов
+        exclude: Если True - отбираются операции во всех валютах, кроме заданных
+
+    Returns:
+        Итератор по словарям транзакций, где валюта операции соответствует заданной
+        (для TransactionTable - отфильтрованная таблица)
+    """
+    if isinstance(transactions, TransactionTable):
+        return transactions.filter_by_currency(currency_code, exclude)
+    return _iter_by_currency(transactions, currency_code, exclude)
+
+
+def _iter_by_currency(
+    transactions: Iterable[Dict[str, Any]], currency_code: Union[str, Iterable[str]], exclude: bool
+) -> Iterator[Dict[str, Any]]:
+    """Лениво отбирает транзакции по валюте за один проход при любом количестве кодов."""
+    return filter(currency_matcher(currency_code, exclude), transactions)
 
 
 def transaction_descriptions(transactions: List[Dict[str, Any]]) -> Iterator[str]:
@@ -33,6 +153,16 @@ def transaction_descriptions(transactions: List[Dict[str, Any]]) -> Iterator[str
         yield transaction.get("description", "")
 
 
+def _check_card_range(start: int, end: int) -> None:
+    """Проверяет диапазон номеров карт."""
+    if start < 1:
+        raise ValueError("Start value must be at least 1")
+    if start > end:
+        raise ValueError("Start value cannot be greater than end value")
+    if end > MAX_CARD_NUMBER:
+        raise ValueError("End value exceeds maximum card number (9999999999999999)")
+
+
 def card_number_generator(start: int, end: int) -> Iterator[str]:
     """
     Генерирует номера банковских карт в заданном диапазоне.
@@ -48,12 +178,7 @@ def card_number_generator(start: int, end: int) -> Iterator[str]:
         ValueError: Если start > end или значения выходят за допустимые пределы
     """
     # Проверка входных данных
-    if start < 1:
-        raise ValueError("Start value must be at least 1")
-    if start > end:
-        raise ValueError("Start value cannot be greater than end value")
-    if end > 9999999999999999:
-        raise ValueError("End value exceeds maximum card number (9999999999999999)")
+    _check_card_range(start, end)
 
     for number in range(start, end + 1):
         # Форматируем номер в 16-значный строковый формат с ведущими нулями
@@ -61,3 +186,237 @@ def card_number_generator(start: int, end: int) -> Iterator[str]:
         # Разбиваем на группы по 4 цифры
         formatted_number = f"{card_number[:4]} {card_number[4:8]} {card_number[8:12]} {card_number[12:16]}"
         yield formatted_number
+
+
+def _card_words(count: int, out: Optional[Any]) -> np.ndarray:
+    """Возвращает массив count x 5 слов для строк номеров (в буфере out или новый)."""
+    words_per_line = CARD_LINE_WIDTH // 4
+    if out is None:
+        return np.empty((count, words_per_line), dtype="<u4")
+    if len(memoryview(out).cast("B")) < count * CARD_LINE_WIDTH:
+        raise ValueError(f"Буфер меньше {count * CARD_LINE_WIDTH} байт")
+    return np.frombuffer(out, dtype="<u4", count=count * words_per_line).reshape(count, words_per_line)
+
+
+def _fill_card_words(words: np.ndarray, highs: np.ndarray, high_index: np.ndarray, low: np.ndarray) -> None:
+    """
+    Заполняет строки номеров по старшим 12 и младшим 4 цифрам.
+
+    Args:
+        words: Массив count x 5 слов
+        highs: Различные значения старших 12 цифр (номер // 10000) - небольшой массив
+        high_index: Индекс значения в highs для каждой строки
+        low: Младшие 4 цифры каждой строки
+    """
+    word0, word1, word2_g1, word2_g2, word3_g2, word3_g3, word4 = _CARD_WORDS
+    g0, g1, g2 = highs // 10**8, highs // 10**4 % 10000, highs % 10000
+    words[:, 0] = word0[g0][high_index]
+    words[:, 1] = word1[g1][high_index]
+    words[:, 2] = (word2_g1[g1] | word2_g2[g2])[high_index]
+    words[:, 3] = word3_g2[g2][high_index] | word3_g3[low]
+    words[:, 4] = word4[low]
+
+
+def _split_by_ten_thousand(first: int, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Делит числа first..first+count-1 на старшую часть (число // 10000) и младшие 4 цифры без деления.
+
+    Returns:
+        Кортеж (различные старшие части, индекс старшей части для каждого числа, младшие 4 цифры)
+    """
+    high, low = divmod(first, 10000)
+    blocks = (low + count - 1) // 10000 + 1
+    highs = high + np.arange(blocks, dtype=np.int64)
+    edges = np.concatenate(([0], np.arange(1, blocks) * 10000 - low, [count]))
+    carry = np.repeat(np.arange(blocks), np.diff(edges))
+    return highs, carry, np.arange(low, low + count, dtype=np.int64) - carry * 10000
+
+
+def format_card_numbers(start: int, count: int, out: Optional[Any] = None) -> memoryview:
+    """
+    Форматирует count номеров карт подряд, начиная со start, в буфер строк "XXXX XXXX XXXX XXXX\n".
+
+    Строка номера собирается из пяти 32-битных слов по таблицам для групп
+    из 4 цифр (см. _card_word_tables). Старшие 12 цифр у номеров подряд
+    меняются раз в 10000 номеров, поэтому их слова вычисляются один раз
+    на каждые 10000 номеров, а для младшей группы достаточно сложения.
+    Строки Python для отдельных номеров не создаются.
+
+    Args:
+        start: Первый номер карты
+        count: Количество номеров
+        out: Записываемый буфер (bytearray, memoryview, mmap) размером не меньше count * CARD_LINE_WIDTH
+            байт; по умолчанию создается новый
+
+    Returns:
+        memoryview на count * CARD_LINE_WIDTH байт с номерами карт
+
+    Raises:
+        ValueError: Если диапазон выходит за допустимые пределы или буфер слишком мал
+    """
+    _check_card_range(start, start + count - 1)
+    words = _card_words(count, out)
+    highs, carry, low = _split_by_ten_thousand(start, count)
+    _fill_card_words(words, highs, carry, low)
+    return words.data.cast("B")
+
+
+def luhn_check_digit(prefix: int) -> int:
+    """
+    Вычисляет контрольную цифру по алгоритму Луна.
+
+    Args:
+        prefix: Номер без контрольной цифры (для карты - первые 15 цифр)
+
+    Returns:
+        Цифра, которую нужно дописать справа, чтобы номер прошел проверку Луна
+    """
+    total = 0
+    for position, digit in enumerate(reversed(str(prefix))):
+        value = int(digit) * (2 if position % 2 == 0 else 1)
+        total += value - 9 if value > 9 else value
+    return (10 - total % 10) % 10
+
+
+def is_luhn_valid(card_number: Union[int, str]) -> bool:
+    """Проверяет номер карты (числом или строкой, пробелы допускаются) по алгоритму Луна."""
+    digits = str(card_number).replace(" ", "")
+    return digits.isdigit() and luhn_check_digit(int(digits[:-1] or "0")) == int(digits[-1])
+
+
+def format_luhn_card_numbers(first_prefix: int, count: int, out: Optional[Any] = None) -> memoryview:
+    """
+    Форматирует номера карт с контрольной цифрой Луна для count 15-значных префиксов подряд.
+
+    Контрольная цифра вычисляется инкрементально: сумма Луна префикса -
+    это сумма вкладов групп из 4 цифр (таблица _LUHN_SUMS), а старшие
+    11 цифр у префиксов подряд меняются раз в 10000 префиксов, поэтому их
+    сумма считается один раз на блок, а для каждого номера добавляется
+    только вклад младших 4 цифр.
+
+    Args:
+        first_prefix: Первый префикс (номер карты без контрольной цифры)
+        count: Количество номеров
+        out: Записываемый буфер размером не меньше count * CARD_LINE_WIDTH байт (по умолчанию новый)
+
+    Returns:
+        memoryview на count * CARD_LINE_WIDTH байт с номерами карт
+    """
+    if first_prefix < 0 or first_prefix + count - 1 > MAX_CARD_NUMBER // 10:
+        raise ValueError("Prefix range exceeds 15 digits")
+    words = _card_words(count, out)
+    prefix_highs, carry, prefix_low = _split_by_ten_thousand(first_prefix, count)
+
+    # Префикс = старшие 11 цифр * 10000 + младшие 4; в обеих частях удваиваются цифры на нечетных местах справа
+    high_sums = (
+        _LUHN_SUMS[prefix_highs // 10**8]
+        + _LUHN_SUMS[prefix_highs // 10**4 % 10000]
+        + _LUHN_SUMS[prefix_highs % 10000]
+    )
+    check = _LUHN_CHECK[high_sums[carry] + _LUHN_SUMS[prefix_low]]
+
+    # Номер = префикс * 10 + контрольная цифра: старшие 12 цифр номера - старшие 11 цифр префикса
+    # и первая из его младших 4 цифр, младшие 4 цифры номера - остальные 3 цифры и контрольная
+    thousands = _THOUSANDS[prefix_low]
+    highs = (prefix_highs[:, None] * 10 + np.arange(10)).ravel()
+    _fill_card_words(words, highs, carry * 10 + thousands, (prefix_low - thousands * 1000) * 10 + check)
+    return words.data.cast("B")
+
+
+def _format_shard(first: int, count: int, luhn: bool, out: Optional[Any] = None) -> memoryview:
+    """Форматирует часть диапазона: номера подряд или номера для префиксов подряд (luhn)."""
+    if luhn:
+        return format_luhn_card_numbers(first, count, out)
+    return format_card_numbers(first, count, out)
+
+
+def _format_shard_bytes(first: int, count: int, luhn: bool) -> bytes:
+    """Форматирует часть диапазона в рабочем процессе."""
+    return bytes(_format_shard(first, count, luhn))
+
+
+def card_number_blocks(
+    start: int, end: int, block_size: int = CARD_BLOCK_SIZE, luhn: bool = False, workers: Optional[int] = 1
+) -> Iterator[memoryview]:
+    """
+    Генерирует номера карт в заданном диапазоне блоками.
+
+    Диапазон делится на части по block_size номеров. При workers > 1 части
+    форматируются в пуле процессов, а блоки отдаются строго в порядке
+    частей, поэтому результат не зависит от количества процессов. В пуле
+    одновременно обрабатывается не больше 2 * workers частей.
+
+    Args:
+        start: Начальный номер карты (включительно)
+        end: Конечный номер карты (включительно)
+        block_size: Количество номеров в блоке
+        luhn: Если True - только номера, проходящие проверку Луна (по одному на каждые 15 первых цифр)
+        workers: Количество процессов (None - по числу ядер, 1 - без пула)
+
+    Yields:
+        Блоки строк "XXXX XXXX XXXX XXXX\n" (memoryview); без пула буфер переиспользуется,
+        поэтому блок нужно записать или скопировать до получения следующего
+
+    Raises:
+        ValueError: Если start > end или значения выходят за допустимые пределы
+    """
+    _check_card_range(start, end)
+    if block_size < 1:
+        raise ValueError("block_size должен быть не меньше 1")
+
+    first, last = start, end
+    if luhn:
+        # Номера строятся по префиксам; крайние номера могут выйти за границы диапазона
+        first, last = start // 10, end // 10
+        if first * 10 + luhn_check_digit(first) < start:
+            first += 1
+        if last * 10 + luhn_check_digit(last) > end:
+            last -= 1
+        if first > last:
+            return
+    shards = ((shard, min(block_size, last - shard + 1)) for shard in range(first, last + 1, block_size))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or last - first < block_size:
+        buffer = bytearray(min(block_size, last - first + 1) * CARD_LINE_WIDTH)
+        for shard, count in shards:
+            yield _format_shard(shard, count, luhn, buffer)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for shard, count in shards:
+            pending.append(executor.submit(_format_shard_bytes, shard, count, luhn))
+            if len(pending) >= 2 * workers:
+                yield memoryview(pending.popleft().result())
+        while pending:
+            yield memoryview(pending.popleft().result())
+
+
+def write_card_numbers(
+    start: int,
+    end: int,
+    file: BinaryIO,
+    block_size: int = CARD_BLOCK_SIZE,
+    luhn: bool = False,
+    workers: Optional[int] = 1,
+) -> int:
+    """
+    Записывает номера карт в заданном диапазоне в двоичный файл, по номеру на строку.
+
+    Args:
+        start: Начальный номер карты (включительно)
+        end: Конечный номер карты (включительно)
+        file: Файл, открытый на запись в двоичном режиме
+        block_size: Количество номеров, форматируемых за один раз
+        luhn: Если True - только номера, проходящие проверку Луна
+        workers: Количество процессов (None - по числу ядер, 1 - без пула)
+
+    Returns:
+        Количество записанных номеров
+    """
+    written = 0
+    for block in card_number_blocks(start, end, block_size, luhn, workers):
+        file.write(block)
+        written += len(block) // CARD_LINE_WIDTH
+    return written
@@ -0,0 +1,121 @@
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from .file_reader import detect_file_type_and_read
+from .logger_config import setup_logger
+from .record_file import frame_from_arrays, frame_to_arrays, read_records, write_record
+from .transaction_table import TransactionTable
+
+logger = setup_logger("ingest_cache", "ingest_cache.log")
+
+# Расширение файла кэша, который хранится рядом с исходным файлом
+CACHE_SUFFIX = ".cache.dat"
+
+# Версия формата кэша; при изменении структуры TransactionTable старые кэши игнорируются
+CACHE_VERSION = 3
+
+# Размер блоков в начале, середине и конце файла, по которым считается хэш содержимого
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+
+def cache_path_for(file_path: str) -> str:
+    """Возвращает путь к файлу кэша для исходного файла."""
+    return file_path + CACHE_SUFFIX
+
+
+def file_fingerprint(file_path: str) -> Dict[str, Any]:
+    """
+    Вычисляет отпечаток файла: размер, время изменения и хэш содержимого.
+
+    Хэш считается по блокам в начале, середине и конце файла, поэтому его
+    вычисление не зависит от размера файла.
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        Словарь с ключами size, mtime_ns и hash
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    middle = max(stat.st_size // 2 - FINGERPRINT_BLOCK_SIZE // 2, 0)
+    tail = max(stat.st_size - FINGERPRINT_BLOCK_SIZE, 0)
+    with open(file_path, "rb") as file:
+        for offset in sorted({0, middle, tail}):
+            file.seek(offset)
+            digest.update(file.read(FINGERPRINT_BLOCK_SIZE))
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+
+
+def _read_cache(cache_path: str, fingerprint: Dict[str, Any]) -> Optional[TransactionTable]:
+    """
+    Загружает таблицу из кэша, если он существует и соответствует отпечатку файла.
+
+    Кэш лежит рядом с исходным файлом, в том числе в папке для входящих
+    выписок, поэтому он читается без pickle: подложенный файл не может
+    выполнить код, а только не пройдет проверку.
+    """
+    try:
+        with open(cache_path, "rb") as file:
+            header, arrays = next(read_records(file))
+            if header.get("version") != CACHE_VERSION or header.get("fingerprint") != fingerprint:
+                logger.info(f"Кэш {cache_path} устарел")
+                return None
+            return TransactionTable(frame_from_arrays(header["columns"], arrays))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать кэш {cache_path}: {e}")
+        return None
+
+
+def _write_cache(cache_path: str, fingerprint: Dict[str, Any], table: TransactionTable) -> None:
+    """Атомарно записывает таблицу в кэш; ошибки записи не прерывают работу."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        columns, arrays = frame_to_arrays(table.frame)
+        with open(temp_path, "wb") as file:
+            write_record(file, {"version": CACHE_VERSION, "fingerprint": fingerprint, "columns": columns}, arrays)
+        os.replace(temp_path, cache_path)
+        logger.debug(f"Кэш записан: {cache_path}")
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Не удалось записать кэш {cache_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def load_transactions(file_path: str, use_cache: bool = True) -> TransactionTable:
+    """
+    Читает транзакции из файла с использованием кэша на диске.
+
+    Нормализованные транзакции сохраняются в колоночном виде рядом с исходным
+    файлом. Кэш используется, пока не изменились размер, время изменения
+    и хэш содержимого исходного файла.
+
+    Args:
+        file_path: Путь к файлу JSON, CSV или XLSX
+        use_cache: Если False, файл читается заново, а кэш не используется
+
+    Returns:
+        Таблица транзакций (пустая, если файл не удалось прочитать)
+    """
+    logger.debug(f"Загрузка транзакций: {file_path}")
+
+    try:
+        fingerprint = file_fingerprint(file_path)
+    except FileNotFoundError:
+        logger.error(f"Файл не найден: {file_path}")
+        return TransactionTable.from_records([])
+
+    cache_path = cache_path_for(file_path)
+    if use_cache:
+        table = _read_cache(cache_path, fingerprint)
+        if table is not None:
+            logger.info(f"Транзакции загружены из кэша {cache_path}: {len(table)} записей")
+            return table
+
+    table = TransactionTable.from_records(detect_file_type_and_read(file_path))
+    if use_cache and len(table):
+        _write_cache(cache_path, fingerprint, table)
+    return table
@@ -1,18 +1,126 @@
-from datetime import datetime
-from typing import Any, Dict, List
+import heapq
+import operator
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from .transaction import (
+    DATE_KEY_MAX,
+    DATE_MISSING,
+    Transaction,
+    date_in_period,
+    get_state,
+    parse_date_key,
+    parse_id_key,
+)
+from .transaction_table import TransactionTable
 
-def filter_by_state(operations: List[Dict[str, Any]], state: str = "EXECUTED") -> List[Dict[str, Any]]:
+
+class StateIndex:
+    """
+    Индекс операций по статусу: статус -> позиции операций в списке.
+
+    Строится один раз для набора данных: ключ статуса ищется и значение
+    нормализуется (upper/strip) при построении, после чего фильтрация
+    по любому статусу - это выборка найденных позиций.
+
+    Индекс привязан к списку, для которого построен: после изменения списка
+    на месте (append, sort, замена элементов) нужно построить новый индекс.
+    covers распознает изменение длины и перестановку крайних элементов,
+    но не любую перестановку внутри списка.
+    """
+
+    def __init__(self, operations: Sequence[Dict[str, Any]]) -> None:
+        """
+        Args:
+            operations: Список операций
+        """
+        self._operations = operations
+        self._size = len(operations)
+        # Первая и последняя операции: по ним covers замечает сортировку списка на месте
+        self._ends = (operations[0], operations[-1]) if operations else None
+        self._positions: Dict[str, List[int]] = {}
+
+        # Значения статуса повторяются, поэтому каждое значение нормализуется один раз
+        normalized: Dict[Any, str] = {}
+        for position, operation in enumerate(operations):
+            value = get_state(operation)
+            if value is None:
+                continue
+            try:
+                state = normalized[value]
+            except KeyError:
+                state = normalized[value] = str(value).upper().strip()
+            except TypeError:
+                # Нехэшируемое значение статуса
+                state = str(value).upper().strip()
+            if state:
+                self._positions.setdefault(state, []).append(position)
+
+    @property
+    def states(self) -> List[str]:
+        """Статусы, встречающиеся в наборе данных."""
+        return list(self._positions)
+
+    def covers(self, operations: Any) -> bool:
+        """
+        Проверяет, что индекс построен для этого списка и список не менялся.
+
+        Сравниваются сам список, его длина и первая и последняя операции
+        (по тождеству объектов). Перестановка, не затронувшая крайние
+        операции, не обнаруживается - после изменения списка на месте
+        индекс нужно построить заново.
+        """
+        if operations is not self._operations or len(operations) != self._size:
+            return False
+        return self._ends is None or (operations[0] is self._ends[0] and operations[-1] is self._ends[-1])
+
+    def positions(self, state: str) -> List[int]:
+        """
+        Возвращает позиции операций с заданным статусом.
+
+        Args:
+            state: Статус (без учета регистра и пробелов по краям)
+
+        Returns:
+            Позиции операций в порядке следования
+        """
+        return self._positions.get(state.upper().strip(), [])
+
+    def filter(self, state: str) -> List[Dict[str, Any]]:
+        """Возвращает операции с заданным статусом в исходном порядке."""
+        operations = self._operations
+        return [operations[position] for position in self.positions(state)]
+
+
+def filter_by_state(
+    operations: Union[Iterable[Dict[str, Any]], TransactionTable],
+    state: str = "EXECUTED",
+    index: Optional[StateIndex] = None,
+) -> Union[List[Dict[str, Any]], TransactionTable]:
     """
     Фильтрует список операций по состоянию.
 
     Args:
-        operations: Список операций
+        operations: Список операций, итератор (например, detect_file_type_and_iter) или TransactionTable
         state: Статус для фильтрации (по умолчанию EXECUTED)
+        index: Индекс StateIndex, построенный для этого списка: при повторных вызовах
+            фильтрация выполняется за время, пропорциональное числу найденных операций
 
     Returns:
-        Отфильтрованный список операций
+        Отфильтрованный список операций (для TransactionTable - таблица)
+
+    Raises:
+        ValueError: Если индекс построен для другого списка операций
     """
+    if isinstance(operations, TransactionTable):
+        # Таблица хранит собственный индекс по статусу
+        return operations.filter_by_state(state)
+
+    if index is not None:
+        if not index.covers(operations):
+            raise ValueError("Индекс StateIndex построен для другого списка операций")
+        return index.filter(state)
+
     if not operations:
         return []
 
@@ -20,16 +128,9 @@ def filter_by_state(operations: List[Dict[str, Any]], state: str = "EXECUTED") -
 
     filtered_operations = []
     for operation in operations:
-        # Ищем поле state в разных вариантах написания
-        operation_state = None
-
-        # Пробуем разные варианты ключей
-        possible_keys = ['state', 'State', 'STATE', 'status', 'Status', 'STATUS']
-
-        for key in possible_keys:
-            if key in operation and operation[key]:
-                operation_state = str(operation[key]).upper().strip()
-                break
+        # Ищем поле state в разных вариантах написания (STATE_KEYS)
+        value = get_state(operation)
+        operation_state = str(value).upper().strip() if value is not None else None
 
         # Если нашли state и он совпадает с целевым
         if operation_state and operation_state == target_state:
@@ -38,28 +139,186 @@ def filter_by_state(operations: List[Dict[str, Any]], state: str = "EXECUTED") -
     return filtered_operations
 
 
-def sort_by_date(operations: List[Dict[str, Any]], reverse: bool = True) -> List[Dict[str, Any]]:
+def _is_sorted(keys: List[Any], reverse: bool) -> bool:
+    """Проверяет за O(n), что ключи уже упорядочены (для reverse - по невозрастанию)."""
+    return all(map(operator.ge if reverse else operator.le, keys, islice(keys, 1, None)))
+
+
+def sort_by_date(
+    operations: Union[List[Dict[str, Any]], TransactionTable], reverse: bool = True
+) -> Union[List[Dict[str, Any]], TransactionTable]:
     """
     Сортирует список операций по дате.
 
+    Для TransactionTable и записей Transaction используются даты, разобранные
+    при загрузке; даты словарей разбираются один раз за вызов. Уже упорядоченный
+    список определяется за O(n) и не сортируется.
+
     Args:
-        operations: Список операций
+        operations: Список операций или TransactionTable
         reverse: Если True - по убыванию, False - по возрастанию
 
     Returns:
-        Отсортированный список операций
+        Отсортированный список операций (для TransactionTable - таблица)
     """
+    if isinstance(operations, TransactionTable):
+        return operations.sort_by_date(reverse)
+
     if not operations:
         return []
 
-    def get_date_key(operation: Dict[str, Any]) -> datetime:
-        """Вспомогательная функция для получения даты из операции."""
-        date_str = operation.get("date")
-        if date_str:
-            try:
-                return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-            except (ValueError, TypeError):
-                return datetime.min
-        return datetime.min
+    def get_date_key(operation: Dict[str, Any]) -> int:
+        """Ключ даты операции - тот же, что в TransactionTable (UTC, DATE_MISSING для пропусков)."""
+        if isinstance(operation, Transaction):
+            return operation.date_key
+        return parse_date_key(operation.get("date"))
+
+    keys = [get_date_key(operation) for operation in operations]
+    if _is_sorted(keys, reverse):
+        return list(operations)
+
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    return [operations[i] for i in order]
+
+
+def filter_by_date_range(
+    operations: Union[Iterable[Dict[str, Any]], TransactionTable], start: Any = None, end: Any = None
+) -> Union[List[Dict[str, Any]], TransactionTable]:
+    """
+    Выбирает операции за период start <= дата < end.
+
+    Даты операций и границы сравниваются в местном времени, как выводятся
+    (см. transaction.date_in_period): смещение часового пояса отбрасывается.
+    Для TransactionTable границы периода ищутся двоичным поиском по
+    отсортированной колонке дат (O(log n + k)); список просматривается
+    один раз с сохранением порядка. Операции без даты не выбираются.
+
+    Args:
+        operations: Список операций, итератор или TransactionTable
+        start: Начало периода включительно (ISO-строка, datetime или date; None - без ограничения)
+        end: Конец периода не включительно (None - без ограничения)
+
+    Returns:
+        Операции за период (для TransactionTable - таблица)
+
+    Raises:
+        ValueError: Если границу периода не удалось разобрать
+    """
+    if isinstance(operations, TransactionTable):
+        return operations.filter_by_date_range(start, end)
+
+    bounds = []
+    for bound, default in ((start, DATE_MISSING + 1), (end, DATE_KEY_MAX)):
+        key = default if bound is None else parse_date_key(bound, local=True)
+        if key == DATE_MISSING:
+            raise ValueError(f"Некорректная дата: {bound!r}")
+        bounds.append(key)
+    lower, upper = bounds
+    return [operation for operation in operations if date_in_period(operation, lower, upper)]
+
+
+def order_key(operation: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Возвращает ключ операции для постраничного вывода: (ключ даты, id).
+
+    Операции с равными ключами упорядочиваются по позиции в наборе данных.
+
+    Args:
+        operation: Словарь операции или Transaction
+
+    Returns:
+        Кортеж целых чисел; операции без даты или id получают минимальные значения
+    """
+    if isinstance(operation, Transaction):
+        return operation.date_key, parse_id_key(operation.id)
+    return parse_date_key(operation.get("date")), parse_id_key(operation.get("id"))
+
+
+def _top_keyed(
+    operations: Iterable[Dict[str, Any]], limit: int, reverse: bool, after: Optional[Tuple[int, int, int]]
+) -> List[Tuple[Tuple[int, int, int], Dict[str, Any]]]:
+    """Первые limit операций списка вместе с их курсорами (ключ даты, id, позиция)."""
+    if limit < 1:
+        raise ValueError("limit должен быть не меньше 1")
+
+    # Выборка кучей устойчива: операции с равными датой и id остаются в порядке позиций
+    # при любом направлении, позиция нужна только для курсора
+    keyed: Iterable[Tuple[Tuple[int, int], int, Dict[str, Any]]] = (
+        (order_key(op), position, op) for position, op in enumerate(operations)
+    )
+    if after is not None:
+        bound, last = after[:2], after[2]
+        if reverse:
+            keyed = (item for item in keyed if item[0] < bound or (item[0] == bound and item[1] > last))
+        else:
+            keyed = (item for item in keyed if item[0] > bound or (item[0] == bound and item[1] > last))
+
+    select = heapq.nlargest if reverse else heapq.nsmallest
+    return [(key + (position,), op) for key, position, op in select(limit, keyed, key=operator.itemgetter(0))]
+
 
-    return sorted(operations, key=get_date_key, reverse=reverse)
\ No newline at end of file
+def top_by_date(
+    operations: Union[Iterable[Dict[str, Any]], TransactionTable],
+    limit: int,
+    reverse: bool = True,
+    after: Optional[Tuple[int, int, int]] = None,
+) -> Union[List[Dict[str, Any]], TransactionTable]:
+    """
+    Возвращает первые limit операций по дате (например, последние N операций) без полной сортировки.
+
+    Операции упорядочиваются по ключу order_key (дата, затем id), а с равными
+    ключами - по позиции в наборе данных. Для списка используется куча
+    размера limit (O(n log limit)), для TransactionTable - частичная выборка
+    по колонке дат.
+
+    Args:
+        operations: Список операций, итератор или TransactionTable
+        limit: Количество операций
+        reverse: Если True - сначала новые, False - сначала старые
+        after: Курсор последней операции предыдущей страницы (см. page_by_date):
+            выбираются операции строго после него
+
+    Returns:
+        Не более limit операций в заданном порядке (для TransactionTable - таблица)
+
+    Raises:
+        ValueError: Если limit меньше 1
+    """
+    if isinstance(operations, TransactionTable):
+        return operations.top_by_date(limit, reverse, after)
+    return [operation for _, operation in _top_keyed(operations, limit, reverse, after)]
+
+
+def page_by_date(
+    operations: Union[Sequence[Dict[str, Any]], TransactionTable],
+    limit: int,
+    cursor: Optional[Tuple[int, int, int]] = None,
+    reverse: bool = True,
+) -> Tuple[Union[List[Dict[str, Any]], TransactionTable], Optional[Tuple[int, int, int]]]:
+    """
+    Возвращает страницу операций по дате и курсор следующей страницы.
+
+    Курсор - ключ (дата, id, позиция в наборе данных) последней операции
+    страницы, поэтому следующая страница выбирается условием "строго после
+    курсора" без сортировки всех операций и без пропусков, если операции не
+    менялись между запросами (в том числе при совпадающих датах и id).
+
+    Args:
+        operations: Список операций или TransactionTable
+        limit: Размер страницы
+        cursor: Курсор, возвращенный для предыдущей страницы (None - первая страница)
+        reverse: Если True - сначала новые, False - сначала старые
+
+    Returns:
+        Кортеж (операции страницы, курсор следующей страницы или None, если страница последняя)
+
+    Raises:
+        ValueError: Если limit меньше 1
+    """
+    if isinstance(operations, TransactionTable):
+        return operations.page_by_date(limit, cursor, reverse)
+    keyed = _top_keyed(operations, limit, reverse, cursor)
+    page = [operation for _, operation in keyed]
+    if len(page) < limit:
+        return page, None
+    return page, keyed[-1][0]
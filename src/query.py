@@ -0,0 +1,250 @@
+import re
+from itertools import chain, islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .generators import currency_codes, currency_matcher
+from .logger_config import setup_logger
+from .processing import sort_by_date
+from .transaction import DATE_KEY_MAX, DATE_MISSING, date_in_period, get_state, parse_date_key
+from .transaction_table import TransactionTable
+
+logger = setup_logger("query", "query.log")
+
+# Относительная стоимость проверки одной операции: сравнение строк дешевле разбора даты и поиска подстроки
+STATE_COST = 1.0
+CURRENCY_COST = 1.0
+DATE_COST = 4.0
+SEARCH_COST = 8.0
+
+# Количество операций, по которым оценивается доля прошедших каждую проверку
+SAMPLE_SIZE = 256
+
+
+class Predicate(NamedTuple):
+    """Условие запроса: проверка словаря операции и векторная проверка строк таблицы."""
+
+    name: str
+    cost: float
+    test: Callable[[Dict[str, Any]], bool]
+    mask: Callable[[TransactionTable, np.ndarray], np.ndarray]
+
+
+def _selectivity(predicate: Predicate, sample: Sequence[Dict[str, Any]]) -> float:
+    """Оценивает долю операций, проходящих проверку (со сглаживанием для малых выборок)."""
+    passed = sum(1 for operation in sample if predicate.test(operation))
+    return (passed + 1) / (len(sample) + 2)
+
+
+def order_predicates(predicates: List[Predicate], sample: Sequence[Dict[str, Any]]) -> List[Predicate]:
+    """
+    Упорядочивает проверки так, чтобы ожидаемая стоимость отсева была минимальной.
+
+    Для независимых условий оптимален порядок по возрастанию cost / (1 - p),
+    где p - доля операций, проходящих проверку: дешевые и строгие проверки
+    выполняются первыми, а дорогой поиск подстроки - только для оставшихся.
+
+    Args:
+        predicates: Проверки запроса
+        sample: Выборка операций для оценки p (пустая - порядок только по стоимости)
+
+    Returns:
+        Проверки в порядке выполнения
+    """
+    if not sample:
+        return sorted(predicates, key=lambda predicate: predicate.cost)
+    ranks = {predicate.name: predicate.cost / (1 - _selectivity(predicate, sample)) for predicate in predicates}
+    return sorted(predicates, key=lambda predicate: ranks[predicate.name])
+
+
+def _sample(operations: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Равномерная выборка из списка операций не больше SAMPLE_SIZE элементов."""
+    step = max(len(operations) // SAMPLE_SIZE, 1)
+    return list(operations[::step][:SAMPLE_SIZE])
+
+
+class TransactionQuery:
+    """
+    Запрос к транзакциям: фильтры по статусу, валюте, периоду и описанию и сортировка по дате.
+
+    В отличие от цепочки filter_by_state -> sort_by_date -> filter_by_currency ->
+    process_bank_search, которая создает новый список на каждом шаге, запрос
+    проверяет все условия за один проход. Условия упорядочиваются по оценке
+    доли отсеиваемых операций и стоимости проверки, а сортируются только
+    отобранные операции.
+
+    Пример:
+        TransactionQuery().filter_by_state("EXECUTED").filter_by_currency("RUB").search("перевод").execute(data)
+    """
+
+    def __init__(self) -> None:
+        self._state: Optional[str] = None
+        self._currency: Optional[Tuple[FrozenSet[str], bool]] = None
+        self._period: Optional[tuple] = None
+        self._search: Optional[str] = None
+        self._reverse: Optional[bool] = None
+
+    def filter_by_state(self, state: str = "EXECUTED") -> "TransactionQuery":
+        """Оставляет операции с заданным статусом (как processing.filter_by_state)."""
+        self._state = state.upper().strip()
+        return self
+
+    def filter_by_currency(
+        self, currency_code: Union[str, Iterable[str]], exclude: bool = False
+    ) -> "TransactionQuery":
+        """Оставляет операции в заданной валюте или наборе валют (как generators.filter_by_currency)."""
+        self._currency = (currency_codes(currency_code), exclude)
+        return self
+
+    def filter_by_date_range(self, start: Any = None, end: Any = None) -> "TransactionQuery":
+        """
+        Оставляет операции за период start <= дата < end (как processing.filter_by_date_range).
+
+        Даты сравниваются в местном времени, как выводятся (см. transaction.date_in_period).
+
+        Raises:
+            ValueError: Если границу периода не удалось разобрать
+        """
+        bounds = []
+        for bound in (start, end):
+            key = None if bound is None else parse_date_key(bound, local=True)
+            if key == DATE_MISSING:
+                raise ValueError(f"Некорректная дата: {bound!r}")
+            bounds.append(key)
+        self._period = (
+            DATE_MISSING + 1 if bounds[0] is None else max(bounds[0], DATE_MISSING + 1),
+            DATE_KEY_MAX if bounds[1] is None else bounds[1],
+        )
+        return self
+
+    def search(self, search: str) -> "TransactionQuery":
+        """Оставляет операции, в описании которых есть строка (как utils.process_bank_search)."""
+        self._search = search or None
+        return self
+
+    def sort_by_date(self, reverse: bool = True) -> "TransactionQuery":
+        """Сортирует отобранные операции по дате (как processing.sort_by_date)."""
+        self._reverse = reverse
+        return self
+
+    def predicates(self) -> List[Predicate]:
+        """Возвращает проверки запроса (статус по таблице выбирается индексом и сюда не входит)."""
+        predicates = []
+
+        if self._state is not None:
+            state = self._state
+
+            def test_state(operation: Dict[str, Any]) -> bool:
+                value = get_state(operation)
+                return value is not None and str(value).upper().strip() == state
+
+            def mask_state(table: TransactionTable, positions: np.ndarray) -> np.ndarray:
+                matched: np.ndarray = (table.frame["state"].iloc[positions] == state).to_numpy(
+                    dtype=bool, na_value=False
+                )
+                return matched
+
+            predicates.append(Predicate("state", STATE_COST, test_state, mask_state))
+
+        if self._currency is not None:
+            codes, exclude = self._currency
+
+            def mask_currency(table: TransactionTable, positions: np.ndarray) -> np.ndarray:
+                return table.currency_mask(codes, exclude, positions)
+
+            predicates.append(Predicate("currency", CURRENCY_COST, currency_matcher(codes, exclude), mask_currency))
+
+        if self._period is not None:
+            lower, upper = self._period
+
+            def test_period(operation: Dict[str, Any]) -> bool:
+                return date_in_period(operation, lower, upper)
+
+            def mask_period(table: TransactionTable, positions: np.ndarray) -> np.ndarray:
+                return table.period_mask(lower, upper, positions)
+
+            predicates.append(Predicate("date", DATE_COST, test_period, mask_period))
+
+        if self._search is not None:
+            pattern = re.compile(re.escape(self._search), re.IGNORECASE)
+
+            def test_search(operation: Dict[str, Any]) -> bool:
+                return pattern.search(operation.get("description") or "") is not None
+
+            def mask_search(table: TransactionTable, positions: np.ndarray) -> np.ndarray:
+                descriptions = table.frame["description"].iloc[positions]
+                found: np.ndarray = descriptions.str.contains(pattern, na=False).to_numpy(dtype=bool)
+                return found
+
+            predicates.append(Predicate("search", SEARCH_COST, test_search, mask_search))
+
+        return predicates
+
+    def execute(
+        self, operations: Union[Iterable[Dict[str, Any]], TransactionTable]
+    ) -> Union[List[Dict[str, Any]], TransactionTable]:
+        """
+        Выполняет запрос.
+
+        Args:
+            operations: Список операций, итератор (например, detect_file_type_and_iter) или TransactionTable
+
+        Returns:
+            Отобранные операции в исходном порядке или отсортированные по дате
+            (для TransactionTable - таблица)
+        """
+        if isinstance(operations, TransactionTable):
+            return self._execute_table(operations)
+
+        if isinstance(operations, Sequence):
+            sample = _sample(operations)
+        else:
+            # Оценка по первым операциям итератора, после чего они возвращаются в поток
+            iterator = iter(operations)
+            sample = list(islice(iterator, SAMPLE_SIZE))
+            operations = chain(sample, iterator)
+
+        predicates = order_predicates(self.predicates(), sample)
+        logger.debug(f"Порядок проверок: {[predicate.name for predicate in predicates]}")
+        tests = [predicate.test for predicate in predicates]
+
+        result: List[Dict[str, Any]] = []
+        for operation in operations:
+            for test in tests:
+                if not test(operation):
+                    break
+            else:
+                result.append(operation)
+
+        if self._reverse is not None:
+            result = sort_by_date(result, self._reverse)  # type: ignore[assignment]
+        logger.info(f"Запрос отобрал {len(result)} операций")
+        return result
+
+    def _execute_table(self, table: TransactionTable) -> TransactionTable:
+        """
+        Выполняет запрос к таблице: позиции строк сужаются каждой проверкой,
+        а таблица с результатом создается один раз.
+        """
+        predicates = self.predicates()
+        if self._state is not None:
+            # Статус выбирается по индексу таблицы за время, пропорциональное числу найденных строк
+            positions = table.state_index.get(self._state, np.empty(0, dtype=np.intp))
+            predicates = [predicate for predicate in predicates if predicate.name != "state"]
+        else:
+            positions = np.arange(len(table))
+
+        if predicates and len(positions):
+            step = max(len(positions) // SAMPLE_SIZE, 1)
+            sample = table.take(positions[::step][:SAMPLE_SIZE]).to_records()
+            for predicate in order_predicates(predicates, sample):
+                positions = positions[predicate.mask(table, positions)]
+                if not len(positions):
+                    break
+
+        result = table.take(positions)
+        if self._reverse is not None:
+            result = result.sort_by_date(self._reverse)
+        logger.info(f"Запрос отобрал {len(result)} транзакций из {len(table)}")
+        return result
@@ -0,0 +1,153 @@
+import io
+import json
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Длина записи в байтах перед ее содержимым
+RECORD_LENGTH = struct.Struct("<Q")
+
+# Имя массива с заголовком записи (JSON в UTF-8)
+HEADER_KEY = "header"
+
+Arrays = Dict[str, np.ndarray]
+
+
+def _json_array(value: Any) -> np.ndarray:
+    """Кодирует значение в JSON и возвращает байты массивом uint8."""
+    return np.frombuffer(json.dumps(value, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+
+def _json_value(array: np.ndarray) -> Any:
+    """Декодирует значение из массива, записанного _json_array."""
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def write_record(file: BinaryIO, header: Dict[str, Any], arrays: Optional[Arrays] = None) -> None:
+    """
+    Дописывает в файл запись: заголовок JSON и числовые массивы NumPy.
+
+    Запись - архив np.savez с префиксом длины, поэтому записи можно
+    дописывать в конец файла. Объекты Python не сериализуются: читать
+    такие файлы безопасно, даже если они подложены извне.
+
+    Args:
+        file: Файл, открытый для записи в двоичном режиме
+        header: Заголовок записи (значения, представимые в JSON)
+        arrays: Массивы чисел по именам
+
+    Raises:
+        TypeError: Если заголовок не представим в JSON
+        ValueError: Если массив содержит объекты Python
+    """
+    arrays = dict(arrays or {})
+    for name, array in arrays.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Массив {name} содержит объекты Python")
+    arrays[HEADER_KEY] = _json_array(header)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)  # type: ignore[arg-type]
+    blob = buffer.getvalue()
+    file.write(RECORD_LENGTH.pack(len(blob)))
+    file.write(blob)
+
+
+def read_records(file: BinaryIO) -> Iterator[Tuple[Dict[str, Any], Arrays]]:
+    """
+    Читает записи, сохраненные write_record, не выполняя кода из файла (allow_pickle=False).
+
+    Args:
+        file: Файл, открытый для чтения в двоичном режиме
+
+    Yields:
+        Кортежи (заголовок, массивы по именам)
+
+    Raises:
+        ValueError: Если файл обрезан или поврежден
+    """
+    while True:
+        prefix = file.read(RECORD_LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) < RECORD_LENGTH.size:
+            raise ValueError("Файл обрезан: неполная длина записи")
+        (length,) = RECORD_LENGTH.unpack(prefix)
+        blob = file.read(length)
+        if len(blob) < length:
+            raise ValueError("Файл обрезан: неполная запись")
+        with np.load(io.BytesIO(blob), allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        yield _json_value(arrays.pop(HEADER_KEY)), arrays
+
+
+def frame_to_arrays(frame: pd.DataFrame) -> Tuple[List[List[str]], Arrays]:
+    """
+    Раскладывает DataFrame на описание колонок и числовые массивы.
+
+    Числовые колонки сохраняются как есть, целые с пропусками (Int64) -
+    значениями и маской пропусков, категориальные - кодами и списком
+    категорий, остальные (строки, None) - списком JSON.
+
+    Args:
+        frame: DataFrame
+
+    Returns:
+        Кортеж (список [имя, вид] для каждой колонки, массивы по именам)
+
+    Raises:
+        TypeError: Если значение колонки не представимо в JSON
+    """
+    columns = []
+    arrays: Arrays = {}
+    for position, name in enumerate(frame.columns):
+        column = frame[name]
+        key = f"column{position}"
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            kind = "category"
+            arrays[key] = column.cat.codes.to_numpy()
+            arrays[f"{key}.categories"] = _json_array(column.cat.categories.tolist())
+        elif str(column.dtype) == "Int64":
+            kind = "Int64"
+            arrays[key] = column.to_numpy(dtype=np.int64, na_value=0)
+            arrays[f"{key}.mask"] = column.isna().to_numpy()
+        elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+            kind = "numpy"
+            arrays[key] = column.to_numpy()
+        else:
+            kind = "json"
+            arrays[key] = _json_array(column.to_numpy(dtype=object, na_value=None).tolist())
+        columns.append([str(name), kind])
+    return columns, arrays
+
+
+def frame_from_arrays(columns: List[List[str]], arrays: Arrays) -> pd.DataFrame:
+    """
+    Собирает DataFrame, разложенный frame_to_arrays.
+
+    Args:
+        columns: Описание колонок из frame_to_arrays
+        arrays: Массивы по именам
+
+    Returns:
+        DataFrame с теми же колонками и типами
+
+    Raises:
+        ValueError: Если вид колонки неизвестен
+    """
+    data = {}
+    for position, (name, kind) in enumerate(columns):
+        key = f"column{position}"
+        values = arrays[key]
+        if kind == "category":
+            data[name] = pd.Series(pd.Categorical.from_codes(values, _json_value(arrays[f"{key}.categories"])))
+        elif kind == "Int64":
+            data[name] = pd.Series(pd.arrays.IntegerArray(values.astype(np.int64), arrays[f"{key}.mask"]))
+        elif kind == "numpy":
+            data[name] = pd.Series(values)
+        elif kind == "json":
+            data[name] = pd.Series(_json_value(values), dtype=object)
+        else:
+            raise ValueError(f"Неизвестный вид колонки {name}: {kind}")
+    return pd.DataFrame(data)
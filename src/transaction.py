@@ -0,0 +1,334 @@
+import sys
+from datetime import date as date_type
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Варианты написания ключа статуса, как в processing.filter_by_state
+STATE_KEYS = ["state", "State", "STATE", "status", "Status", "STATUS"]
+
+# Ключ даты для операций без даты или с некорректной датой (аналог datetime.min, минимум int64)
+DATE_MISSING = -(2**63)
+
+# Наибольший ключ даты (максимум int64) - граница периода без ограничения
+DATE_KEY_MAX = 2**63 - 1
+
+# Ключ id для операций без числового id (сортируется первым, как DATE_MISSING)
+ID_MISSING = -(2**63)
+
+# Начало эпохи для перевода дат в микросекунды
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Местное время даты со смещением часового пояса отличается от времени UTC меньше чем на сутки (в микросекундах)
+DATE_OFFSET_LIMIT = 24 * 60 * 60 * 1_000_000
+
+# Ключи словаря транзакции в формате operations.json
+RECORD_KEYS = ["id", "state", "date", "operationAmount", "description", "from", "to"]
+
+# Атрибуты Transaction, соответствующие ключам словаря (кроме составного operationAmount)
+SLOT_FOR_KEY = {
+    "id": "id",
+    "state": "state",
+    "date": "date",
+    "description": "description",
+    "from": "from_account",
+    "to": "to_account",
+}
+
+
+def get_state(record: Dict[str, Any]) -> Optional[Any]:
+    """
+    Возвращает значение статуса операции по первому заполненному варианту ключа (STATE_KEYS).
+
+    Args:
+        record: Словарь транзакции
+
+    Returns:
+        Значение статуса без нормализации или None, если статус не задан
+    """
+    for key in STATE_KEYS:
+        if key in record and record[key]:
+            return record[key]
+    return None
+
+
+def flatten_record(record: Dict[str, Any]) -> List[Any]:
+    """
+    Извлекает поля транзакции из словаря в формате JSON или CSV/Excel.
+
+    Args:
+        record: Словарь транзакции (operationAmount -> currency или плоские amount/currency_code)
+
+    Returns:
+        Список [id, state, date, amount, currency_code, currency_name, description, from, to]
+    """
+    state = get_state(record)
+    if state is not None:
+        state = str(state).upper().strip()
+
+    operation_amount = record.get("operationAmount")
+    if isinstance(operation_amount, dict):
+        amount = operation_amount.get("amount")
+        currency = operation_amount.get("currency") or {}
+        if isinstance(currency, dict):
+            currency_code = currency.get("code")
+            currency_name = currency.get("name")
+        else:
+            currency_code = currency_name = currency
+    else:
+        amount = record.get("amount")
+        currency_code = record.get("currency_code", record.get("currency"))
+        currency_name = record.get("currency_name", currency_code)
+
+    return [
+        record.get("id"),
+        state,
+        record.get("date"),
+        amount,
+        currency_code,
+        currency_name,
+        record.get("description"),
+        record.get("from"),
+        record.get("to"),
+    ]
+
+
+def parse_amount_cents(amount: Any) -> Optional[int]:
+    """
+    Переводит сумму в целое количество копеек (центов).
+
+    Args:
+        amount: Сумма строкой ("31957.58", "100,50") или числом
+
+    Returns:
+        Сумма в копейках или None, если сумму не удалось разобрать
+    """
+    if amount is None:
+        return None
+    try:
+        return round(float(str(amount).strip().replace(",", ".")) * 100)
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_date_key(date: Any, local: bool = False) -> int:
+    """
+    Переводит ISO-дату в целое количество микросекунд от начала эпохи.
+
+    Даты с часовым поясом приводятся к UTC, как в TransactionTable, а при
+    local=True смещение отбрасывается: ключ соответствует местному времени
+    даты, в котором она выводится (widget.get_date).
+
+    Args:
+        date: Дата строкой ("2019-08-26T10:50:58.294041", "...Z", "...+03:00") или объект datetime/date
+        local: Если True - ключ местного времени даты, иначе - времени UTC
+
+    Returns:
+        Ключ для сортировки или DATE_MISSING, если дату не удалось разобрать
+    """
+    if isinstance(date, str):
+        try:
+            parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            return DATE_MISSING
+    elif isinstance(date, datetime):
+        parsed = date
+    elif isinstance(date, date_type):
+        parsed = datetime(date.year, date.month, date.day)
+    else:
+        return DATE_MISSING
+    if parsed.tzinfo is not None:
+        if not local:
+            parsed = parsed.astimezone(timezone.utc)
+        parsed = parsed.replace(tzinfo=None)
+    return (parsed - EPOCH) // MICROSECOND
+
+
+def parse_id_key(id: Any) -> int:
+    """
+    Переводит id транзакции в целое число для упорядочивания операций с равной датой.
+
+    Args:
+        id: Id числом или строкой
+
+    Returns:
+        Целый id или ID_MISSING, если id не задан или не является числом
+    """
+    if id is None or isinstance(id, bool):
+        return ID_MISSING
+    try:
+        return int(id)
+    except (ValueError, TypeError, OverflowError):
+        return ID_MISSING
+
+
+def _intern(value: Any) -> Any:
+    """Интернирует строки с небольшим числом различных значений."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Transaction:
+    """
+    Компактная запись о транзакции.
+
+    Хранит поля в __slots__, статус, валюту и описание - в виде интернированных
+    строк (одна копия на все транзакции), сумму - в копейках. Дата разбирается
+    один раз при создании записи (date_key - микросекунды от эпохи). Поддерживает
+    чтение как словаря (get, [], in), поэтому принимается функциями,
+    работающими со словарями транзакций.
+    """
+
+    __slots__ = (
+        "id",
+        "state",
+        "date",
+        "date_key",
+        "amount_cents",
+        "currency_code",
+        "currency_name",
+        "description",
+        "from_account",
+        "to_account",
+    )
+
+    def __init__(
+        self,
+        id: Any = None,
+        state: Optional[str] = None,
+        date: Optional[str] = None,
+        amount_cents: Optional[int] = None,
+        currency_code: Optional[str] = None,
+        currency_name: Optional[str] = None,
+        description: Optional[str] = None,
+        from_account: Optional[str] = None,
+        to_account: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.state = _intern(state)
+        self.date = date
+        self.date_key = parse_date_key(date)
+        self.amount_cents = amount_cents
+        self.currency_code = _intern(currency_code)
+        self.currency_name = _intern(currency_name)
+        self.description = _intern(description)
+        self.from_account = from_account
+        self.to_account = to_account
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "Transaction":
+        """
+        Создает запись из словаря транзакции в формате JSON или CSV/Excel.
+
+        Args:
+            record: Словарь транзакции
+
+        Returns:
+            Запись о транзакции
+        """
+        id_, state, date, amount, currency_code, currency_name, description, from_account, to_account = (
+            flatten_record(record)
+        )
+        return cls(
+            id_,
+            state,
+            date,
+            parse_amount_cents(amount),
+            currency_code,
+            currency_name,
+            description,
+            from_account,
+            to_account,
+        )
+
+    @property
+    def amount(self) -> Optional[str]:
+        """Сумма строкой с двумя знаками после запятой, как в operations.json."""
+        if self.amount_cents is None:
+            return None
+        return f"{self.amount_cents / 100:.2f}"
+
+    def _value(self, key: str) -> Any:
+        """Возвращает значение по ключу словаря в формате operations.json."""
+        if key == "operationAmount":
+            return {"amount": self.amount, "currency": {"name": self.currency_name, "code": self.currency_code}}
+        return getattr(self, SLOT_FOR_KEY[key])
+
+    def keys(self) -> List[str]:
+        """Ключи, для которых у транзакции есть значение."""
+        return [key for key in RECORD_KEYS if key in self]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return self._value(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key == "operationAmount":
+            return True
+        slot = SLOT_FOR_KEY.get(key) if isinstance(key, str) else None
+        return slot is not None and getattr(self, slot) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Аналог dict.get."""
+        return self[key] if key in self else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Преобразует запись в словарь в формате operations.json.
+
+        Returns:
+            Словарь транзакции
+        """
+        return {key: self._value(key) for key in self.keys()}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.to_dict()!r})"
+
+
+def date_in_period(operation: Dict[str, Any], lower: int, upper: int) -> bool:
+    """
+    Проверяет, что дата операции попадает в период lower <= дата < upper.
+
+    Даты сравниваются в местном времени (parse_date_key с local=True), как
+    выводятся: операция 2019-08-26T01:30:00+03:00 относится к 26.08.2019.
+    У Transaction исходная строка разбирается, только если ключ UTC ближе
+    суток к границе периода.
+
+    Args:
+        operation: Словарь операции или Transaction
+        lower: Ключ начала периода (местное время) включительно
+        upper: Ключ конца периода (местное время) не включительно
+
+    Returns:
+        True, если дата операции известна и попадает в период
+    """
+    if isinstance(operation, Transaction):
+        key = operation.date_key
+        if key == DATE_MISSING or key < lower - DATE_OFFSET_LIMIT or key >= upper + DATE_OFFSET_LIMIT:
+            return False
+        if lower + DATE_OFFSET_LIMIT <= key < upper - DATE_OFFSET_LIMIT:
+            return True
+        date = operation.date
+    else:
+        date = operation.get("date")
+    key = parse_date_key(date, local=True)
+    return key != DATE_MISSING and lower <= key < upper
+
+
+def to_transactions(records: Iterable[Dict[str, Any]]) -> Iterator[Transaction]:
+    """
+    Преобразует словари транзакций в компактные записи.
+
+    Args:
+        records: Список или итератор словарей (например, detect_file_type_and_iter)
+
+    Yields:
+        Записи Transaction
+    """
+    for record in records:
+        yield Transaction.from_dict(record)
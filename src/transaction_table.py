@@ -0,0 +1,584 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .transaction import DATE_KEY_MAX, DATE_MISSING, DATE_OFFSET_LIMIT, ID_MISSING, flatten_record, parse_date_key
+
+# Колонки таблицы транзакций в порядке хранения
+COLUMNS = ["id", "state", "date", "amount", "currency_code", "currency_name", "description", "from", "to"]
+
+# Смещение часового пояса в конце ISO-даты со временем ("+03:00", "-0500", "+03")
+DATE_OFFSET_PATTERN = r"[T ]\d.*[+-]\d{2}(?::?\d{2})*(?:\.\d+)?$"
+
+# Колонки с категориальным типом
+CATEGORY_COLUMNS = ["state", "currency_code", "currency_name"]
+
+# Количество строк, материализуемых за один раз при итерации по таблице
+ITER_BATCH_SIZE = 10000
+
+
+def _parse_date_keys(dates: pd.Series) -> np.ndarray:
+    """Переводит ISO-даты в микросекунды от начала эпохи; некорректные даты получают DATE_MISSING."""
+    parsed = pd.to_datetime(dates, format="ISO8601", errors="coerce", utc=True)
+    keys: np.ndarray = parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[us]").view(np.int64)
+    return keys
+
+
+def _clip_key(key: int) -> int:
+    """Ограничивает ключ даты диапазоном допустимых ключей (без DATE_MISSING)."""
+    return min(max(key, DATE_MISSING + 1), DATE_KEY_MAX)
+
+
+def _date_texts(dates: pd.Series) -> pd.Series:
+    """Исходные строки дат для вывода; значения других типов заменяются на None."""
+    return pd.Series([value if isinstance(value, str) else None for value in dates.tolist()], dtype=object)
+
+
+def _format_date_text(date_string: str, date_format: str) -> str:
+    """Форматирует исходную строку даты в ее часовом поясе, как widget.get_date; некорректная строка не меняется."""
+    try:
+        return datetime.fromisoformat(date_string.replace("Z", "+00:00")).strftime(date_format)
+    except (ValueError, TypeError):
+        return date_string
+
+
+def _parse_amount_cents(amounts: pd.Series) -> pd.Series:
+    """Переводит суммы в целое количество копеек (центов)."""
+    text = amounts.astype("string").str.strip().str.replace(",", ".", regex=False)
+    numbers = pd.to_numeric(text, errors="coerce")
+    return (numbers * 100).round().astype("Int64")
+
+
+def _format_date_keys(keys: np.ndarray, date_format: str) -> List[Optional[str]]:
+    """Форматирует ключи дат векторно; для DATE_MISSING возвращается None."""
+    dates = pd.Series(keys.view("datetime64[us]")).dt.strftime(date_format)
+    return _object_values(dates.where(keys != DATE_MISSING))
+
+
+def _object_values(column: pd.Series) -> List[Any]:
+    """Возвращает значения колонки списком Python-объектов, заменяя пропуски на None."""
+    values: List[Any] = column.to_numpy(dtype=object, na_value=None).tolist()
+    return values
+
+
+class TransactionTable:
+    """
+    Колоночное представление списка транзакций на базе pandas/NumPy.
+
+    Колонки типизированы: id и сумма в копейках - целые, дата - микросекунды
+    от начала эпохи, статус и валюта - категориальные. Фильтрация и сортировка
+    выполняются векторно, а словари транзакций создаются только при выводе.
+
+    Ключ даты хранит время UTC и используется только для сортировки и поиска
+    по периоду; для вывода хранится исходная строка даты (колонка date_text),
+    чтобы дата со смещением часового пояса не сдвигалась на другой день.
+    """
+
+    def __init__(self, frame: pd.DataFrame, sorted_reverse: Optional[bool] = None) -> None:
+        """
+        Args:
+            frame: DataFrame с колонками COLUMNS и исходными строками дат date_text
+            sorted_reverse: Порядок строк по дате, если он известен (True - по убыванию, False - по возрастанию)
+        """
+        self._frame = frame
+        self._sorted_reverse = sorted_reverse
+        self._state_index: Optional[Dict[Any, np.ndarray]] = None
+        # Индекс для поиска по датам в неотсортированной таблице: позиции строк и ключи по возрастанию
+        self._date_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "TransactionTable":
+        """
+        Создает таблицу из словарей транзакций (формат JSON или CSV/Excel).
+
+        Args:
+            records: Список или итератор транзакций
+
+        Returns:
+            Таблица транзакций
+        """
+        rows = [flatten_record(record) for record in records]
+        raw = pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+
+        frame = pd.DataFrame(
+            {
+                "id": pd.to_numeric(raw["id"], errors="coerce").astype("Int64"),
+                "state": raw["state"].astype("category"),
+                "date": _parse_date_keys(raw["date"]),
+                "date_text": _date_texts(raw["date"]),
+                "amount": _parse_amount_cents(raw["amount"]),
+                "currency_code": raw["currency_code"].astype("category"),
+                "currency_name": raw["currency_name"].astype("category"),
+                "description": raw["description"].fillna(""),
+                "from": raw["from"],
+                "to": raw["to"],
+            }
+        )
+        return cls(frame)
+
+    @classmethod
+    def concat(cls, tables: List["TransactionTable"]) -> "TransactionTable":
+        """
+        Объединяет несколько таблиц в одну, сохраняя порядок строк.
+
+        Args:
+            tables: Список таблиц
+
+        Returns:
+            Объединенная таблица
+        """
+        if not tables:
+            return cls.from_records([])
+        frame = pd.concat([table.frame for table in tables], ignore_index=True)
+        # При разных наборах категорий pandas приводит колонку к object
+        return cls(frame.astype({column: "category" for column in CATEGORY_COLUMNS}))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """DataFrame с колонками таблицы."""
+        return self._frame
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Отдает транзакции в виде словарей, материализуя их блоками."""
+        for start in range(0, len(self._frame), ITER_BATCH_SIZE):
+            yield from self._take(slice(start, start + ITER_BATCH_SIZE)).to_records()
+
+    @property
+    def sorted_reverse(self) -> Optional[bool]:
+        """Известный порядок строк по дате: True - по убыванию, False - по возрастанию, None - неизвестен."""
+        return self._sorted_reverse
+
+    def _take(self, rows: Union[slice, np.ndarray], sorted_reverse: Optional[bool] = None) -> "TransactionTable":
+        """
+        Возвращает таблицу из выбранных строк (срез, маска или позиции).
+
+        Выборка строк с сохранением их порядка (маска, возрастающие позиции)
+        сохраняет и сортировку по дате, поэтому для нее передается текущий порядок.
+        """
+        return TransactionTable(self._frame.iloc[rows], sorted_reverse)
+
+    def take(self, positions: np.ndarray) -> "TransactionTable":
+        """
+        Возвращает таблицу из строк с заданными позициями.
+
+        Args:
+            positions: Позиции строк по возрастанию (порядок строк и сортировка по дате сохраняются)
+
+        Returns:
+            Таблица с выбранными строками
+        """
+        return self._take(positions, self._sorted_reverse)
+
+    def date_keys(self) -> np.ndarray:
+        """Даты транзакций в микросекундах от начала эпохи (DATE_MISSING - дата неизвестна)."""
+        keys: np.ndarray = self._frame["date"].to_numpy()
+        return keys
+
+    def id_keys(self) -> np.ndarray:
+        """Id транзакций целыми числами (ID_MISSING - id не задан)."""
+        keys: np.ndarray = self._frame["id"].to_numpy(dtype=np.int64, na_value=ID_MISSING)
+        return keys
+
+    @property
+    def state_index(self) -> Dict[Any, np.ndarray]:
+        """
+        Индекс по статусу: статус -> позиции строк.
+
+        Строится при первом обращении одним проходом по кодам категорий
+        и переиспользуется, так как таблица не изменяется.
+        """
+        if self._state_index is None:
+            self._state_index = self._frame.groupby("state", observed=True, sort=False).indices
+        return self._state_index
+
+    def filter_by_state(self, state: str = "EXECUTED") -> "TransactionTable":
+        """
+        Фильтрует транзакции по статусу.
+
+        Использует индекс state_index, поэтому повторная фильтрация по любому
+        статусу не просматривает всю таблицу.
+
+        Args:
+            state: Статус для фильтрации (по умолчанию EXECUTED)
+
+        Returns:
+            Таблица с транзакциями в заданном статусе
+        """
+        positions = self.state_index.get(state.upper().strip(), np.empty(0, dtype=np.intp))
+        return self._take(positions, self._sorted_reverse)
+
+    def sort_by_date(self, reverse: bool = True) -> "TransactionTable":
+        """
+        Сортирует транзакции по дате (устойчиво, как sorted).
+
+        Даты разобраны при создании таблицы, поэтому сортируется целочисленная
+        колонка. Уже упорядоченная таблица определяется за O(n) и не копируется.
+
+        Args:
+            reverse: Если True - по убыванию, False - по возрастанию
+
+        Returns:
+            Отсортированная таблица
+        """
+        if self._sorted_reverse == reverse:
+            return self
+
+        keys = self.date_keys()
+        ascending = keys[:-1] <= keys[1:]
+        descending = keys[:-1] >= keys[1:]
+        if (descending if reverse else ascending).all():
+            # Порядок уже нужный: запоминаем его, данные таблицы не меняются
+            self._sorted_reverse = reverse
+            return self
+        if (ascending if reverse else descending).all() and not (ascending & descending).any():
+            # Строго упорядочено в обратную сторону: без равных дат достаточно развернуть
+            return self._take(slice(None, None, -1), reverse)
+
+        if reverse:
+            # Устойчивая сортировка по убыванию: сортируем перевернутый массив и
+            # переворачиваем результат, чтобы равные даты сохранили исходный порядок
+            order = np.argsort(keys[::-1], kind="stable")[::-1]
+            order = len(keys) - 1 - order
+        else:
+            order = np.argsort(keys, kind="stable")
+        return self._take(order, reverse)
+
+    def _date_bound(self, value: Any, default: int) -> int:
+        """Переводит границу периода в ключ даты; None - граница не задана."""
+        if value is None:
+            return default
+        key = parse_date_key(value, local=True)
+        if key == DATE_MISSING:
+            raise ValueError(f"Некорректная дата: {value!r}")
+        return key
+
+    def period_mask(
+        self, lower: int, upper: int, positions: Optional[Union[np.ndarray, slice]] = None
+    ) -> np.ndarray:
+        """
+        Проверяет, что даты строк попадают в период lower <= дата < upper в местном времени.
+
+        Ключ даты хранит время UTC, а местное время (в котором дата выводится)
+        отличается от него меньше чем на сутки. Поэтому исходные строки дат
+        разбираются только у строк, ключ которых ближе суток к границе
+        периода, как в transaction.date_in_period.
+
+        Args:
+            lower: Ключ начала периода (местное время) включительно
+            upper: Ключ конца периода (местное время) не включительно
+            positions: Позиции или срез проверяемых строк (по умолчанию все строки)
+
+        Returns:
+            Логическая маска для строк (или позиций)
+        """
+        keys = self.date_keys() if positions is None else self.date_keys()[positions]
+        mask: np.ndarray = (keys >= lower) & (keys < upper)
+        near = np.zeros(len(keys), dtype=bool)
+        for bound in (lower, upper):
+            if DATE_MISSING + 1 < bound < DATE_KEY_MAX:
+                near |= (keys >= _clip_key(bound - DATE_OFFSET_LIMIT)) & (keys < _clip_key(bound + DATE_OFFSET_LIMIT))
+        near &= keys != DATE_MISSING
+        near_positions = np.flatnonzero(near)
+        if len(near_positions):
+            if positions is None:
+                rows = near_positions
+            elif isinstance(positions, slice):
+                selected = range(len(self))[positions]
+                rows = selected.start + selected.step * near_positions
+            else:
+                rows = positions[near_positions]
+            texts = self._frame["date_text"].to_numpy()[rows].tolist()
+            for position, text, key in zip(near_positions.tolist(), texts, keys[near_positions].tolist()):
+                # Без знака смещения после даты (и у дат не строкой, например datetime из Excel)
+                # местное время совпадает с ключом
+                if isinstance(text, str) and ("+" in text[10:] or "-" in text[10:]):
+                    local = parse_date_key(text, local=True)
+                    if local != DATE_MISSING:
+                        key = local
+                mask[position] = lower <= key < upper
+        return mask
+
+    def filter_by_date_range(self, start: Any = None, end: Any = None) -> "TransactionTable":
+        """
+        Выбирает транзакции за период start <= дата < end.
+
+        Даты сравниваются в местном времени, как выводятся (см. period_mask).
+        Границы ищутся двоичным поиском по отсортированной колонке дат,
+        расширенным на сутки, поэтому запрос стоит O(log n + k). У
+        отсортированной таблицы результат - срез без копирования данных, если
+        строки периода идут в ней подряд; для
+        неотсортированной один раз строится индекс дат, а транзакции
+        возвращаются в исходном порядке. Транзакции без даты в результат не
+        попадают.
+
+        Args:
+            start: Начало периода включительно (ISO-строка, datetime или date; None - без ограничения)
+            end: Конец периода не включительно (None - без ограничения)
+
+        Returns:
+            Таблица с транзакциями за период
+
+        Raises:
+            ValueError: Если границу периода не удалось разобрать
+        """
+        lower = max(self._date_bound(start, DATE_MISSING + 1), DATE_MISSING + 1)
+        upper = self._date_bound(end, np.iinfo(np.int64).max)
+        if upper <= lower:
+            return self._take(slice(0, 0), self._sorted_reverse)
+
+        if self._sorted_reverse is None and self._date_index is None:
+            # Порядок неизвестен: проверяем его один раз, иначе строим индекс дат
+            keys = self.date_keys()
+            if (keys[:-1] <= keys[1:]).all():
+                self._sorted_reverse = False
+            elif (keys[:-1] >= keys[1:]).all():
+                self._sorted_reverse = True
+            else:
+                order = np.argsort(keys, kind="stable")
+                self._date_index = (order, keys[order])
+
+        # Ключи UTC строк периода отличаются от местного времени меньше чем на сутки
+        bounds = [_clip_key(lower - DATE_OFFSET_LIMIT), _clip_key(upper + DATE_OFFSET_LIMIT)]
+        if self._sorted_reverse is None:
+            order, sorted_keys = self._date_index  # type: ignore[misc]
+            low, high = np.searchsorted(sorted_keys, bounds, side="left")
+            positions = np.sort(order[low:high])
+            return self._take(positions[self.period_mask(lower, upper, positions)])
+
+        keys = self.date_keys()
+        if self._sorted_reverse:
+            # Перевернутый массив - представление без копирования
+            low, high = np.searchsorted(keys[::-1], bounds, side="left")
+            rows = slice(len(keys) - high, len(keys) - low)
+        else:
+            low, high = np.searchsorted(keys, bounds, side="left")
+            rows = slice(low, high)
+        selected = rows.start + np.flatnonzero(self.period_mask(lower, upper, rows))
+        if len(selected) and selected[-1] - selected[0] + 1 == len(selected):
+            # Строки периода идут подряд (в том числе если местное время не меняет порядок) - срез без копирования
+            return self._take(slice(int(selected[0]), int(selected[-1]) + 1), self._sorted_reverse)
+        return self._take(selected, self._sorted_reverse)
+
+    def _top_positions(self, limit: int, reverse: bool, after: Optional[Tuple[int, int, int]]) -> np.ndarray:
+        """Позиции первых limit строк в порядке (дата, id, позиция) строго после курсора after."""
+        if limit < 1:
+            raise ValueError("limit должен быть не меньше 1")
+
+        keys = self.date_keys()
+        ids = self.id_keys()
+        positions = np.arange(len(keys))
+        if after is not None:
+            date_key, id_key, position = after
+            # Строки с равными датой и id идут в порядке позиций при любом направлении
+            later = (ids == id_key) & (positions > position)
+            if reverse:
+                mask = (keys < date_key) | ((keys == date_key) & ((ids < id_key) | later))
+            else:
+                mask = (keys > date_key) | ((keys == date_key) & ((ids > id_key) | later))
+            positions = np.flatnonzero(mask)
+
+        if limit < len(positions):
+            # Строки с датой не дальше limit-й по порядку; равные ей даты упорядочиваются по id ниже
+            candidate_keys = keys[positions]
+            if reverse:
+                threshold = np.partition(candidate_keys, len(positions) - limit)[len(positions) - limit]
+                positions = positions[candidate_keys >= threshold]
+            else:
+                threshold = np.partition(candidate_keys, limit - 1)[limit - 1]
+                positions = positions[candidate_keys <= threshold]
+
+        if reverse:
+            # Устойчивая сортировка перевернутых позиций после обращения оставляет равные строки в порядке позиций
+            positions = positions[::-1]
+            order = np.lexsort((ids[positions], keys[positions]))[::-1]
+        else:
+            order = np.lexsort((ids[positions], keys[positions]))
+        top: np.ndarray = positions[order[:limit]]
+        return top
+
+    def top_by_date(
+        self, limit: int, reverse: bool = True, after: Optional[Tuple[int, int, int]] = None
+    ) -> "TransactionTable":
+        """
+        Возвращает первые limit транзакций в порядке (дата, id) без сортировки всей таблицы.
+
+        Граница limit-й даты находится частичной выборкой (np.partition, O(n)),
+        после чего сортируются только строки не дальше этой границы. Строки с
+        равными датой и id идут в порядке позиций в таблице. Для постраничного
+        вывода передается курсор последней строки предыдущей страницы (см.
+        page_by_date): выбираются строки строго после него, поэтому следующие
+        страницы тоже не требуют полной сортировки.
+
+        Args:
+            limit: Количество транзакций
+            reverse: Если True - сначала новые, False - сначала старые
+            after: Курсор (ключ даты, id, позиция) последней строки предыдущей страницы
+
+        Returns:
+            Таблица из не более чем limit транзакций, отсортированная по дате и id
+
+        Raises:
+            ValueError: Если limit меньше 1
+        """
+        return self._take(self._top_positions(limit, reverse, after), reverse)
+
+    def page_by_date(
+        self, limit: int, cursor: Optional[Tuple[int, int, int]] = None, reverse: bool = True
+    ) -> Tuple["TransactionTable", Optional[Tuple[int, int, int]]]:
+        """
+        Возвращает страницу транзакций по дате и курсор следующей страницы (как processing.page_by_date).
+
+        Args:
+            limit: Размер страницы
+            cursor: Курсор, возвращенный для предыдущей страницы (None - первая страница)
+            reverse: Если True - сначала новые, False - сначала старые
+
+        Returns:
+            Кортеж (страница, курсор (ключ даты, id, позиция) следующей страницы или None,
+            если страница последняя)
+
+        Raises:
+            ValueError: Если limit меньше 1
+        """
+        positions = self._top_positions(limit, reverse, cursor)
+        page = self._take(positions, reverse)
+        if len(positions) < limit:
+            return page, None
+        last = int(positions[-1])
+        return page, (int(self.date_keys()[last]), int(self.id_keys()[last]), last)
+
+    def currency_mask(
+        self, currency_code: Union[str, Iterable[str]], exclude: bool = False, positions: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Проверяет валюту строк по кодам категориальной колонки currency_code.
+
+        Коды валют переводятся в таблицу соответствия "код категории -> подходит",
+        поэтому проверка - одна векторная выборка при любом количестве валют.
+
+        Args:
+            currency_code: Код валюты или набор кодов
+            exclude: Если True - подходят строки во всех валютах, кроме заданных (и без валюты)
+            positions: Позиции проверяемых строк (по умолчанию все строки)
+
+        Returns:
+            Логическая маска для строк (или позиций)
+        """
+        codes = {currency_code} if isinstance(currency_code, str) else set(currency_code)
+        column = self._frame["currency_code"]
+        categories = column.cat.categories
+        # Последний элемент - для строк без валюты (код категории -1)
+        lookup = np.full(len(categories) + 1, exclude, dtype=bool)
+        lookup[[categories.get_loc(code) for code in codes if code in categories]] = not exclude
+        category_codes: np.ndarray = column.cat.codes.to_numpy()
+        if positions is not None:
+            category_codes = category_codes[positions]
+        mask: np.ndarray = lookup[category_codes]
+        return mask
+
+    def filter_by_currency(
+        self, currency_code: Union[str, Iterable[str]], exclude: bool = False
+    ) -> "TransactionTable":
+        """
+        Фильтрует транзакции по коду валюты или набору кодов.
+
+        Args:
+            currency_code: Код валюты (например, "USD", "RUB") или набор кодов
+            exclude: Если True - отбираются транзакции во всех валютах, кроме заданных
+
+        Returns:
+            Таблица с транзакциями в заданной валюте
+        """
+        return self._take(self.currency_mask(currency_code, exclude), self._sorted_reverse)
+
+    def search(self, search: str, column: str = "description") -> "TransactionTable":
+        """
+        Ищет транзакции, в описании которых встречается строка (без учета регистра).
+
+        Args:
+            search: Строка для поиска
+            column: Колонка, по которой выполняется поиск
+
+        Returns:
+            Таблица с найденными транзакциями
+        """
+        pattern = re.compile(re.escape(search), re.IGNORECASE)
+        mask = self._frame[column].str.contains(pattern, na=False).to_numpy(dtype=bool)
+        return self._take(mask, self._sorted_reverse)
+
+    def format_dates(self, date_format: str = "%d.%m.%Y") -> List[Optional[str]]:
+        """
+        Форматирует даты транзакций так же, как widget.get_date.
+
+        Даты без смещения часового пояса форматируются векторно из ключей
+        без повторного разбора строк. Ключ хранит время UTC, поэтому даты со
+        смещением (и строки, которые не удалось разобрать) форматируются из
+        исходной строки.
+
+        Args:
+            date_format: Формат strftime (по умолчанию - как в widget.get_date)
+
+        Returns:
+            Список дат строками (None для транзакций без даты)
+        """
+        keys = self.date_keys()
+        dates = _format_date_keys(keys, date_format)
+        texts = self._frame["date_text"]
+        from_text = texts.notna().to_numpy() & (
+            (keys == DATE_MISSING) | texts.str.contains(DATE_OFFSET_PATTERN, na=False).to_numpy(dtype=bool)
+        )
+        for position in np.flatnonzero(from_text).tolist():
+            dates[position] = _format_date_text(texts.iloc[position], date_format)
+        return dates
+
+    def to_records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Преобразует таблицу в список словарей в формате operations.json.
+
+        Args:
+            limit: Максимальное количество транзакций (по умолчанию все)
+
+        Returns:
+            Список транзакций
+        """
+        frame = self._frame if limit is None else self._frame.iloc[:limit]
+        # Исходная строка даты возвращается без изменений; ключ форматируется только для дат других типов
+        dates = _object_values(frame["date_text"])
+        if any(value is None for value in dates):
+            keys = _format_date_keys(frame["date"].to_numpy(), "%Y-%m-%dT%H:%M:%S.%f")
+            dates = [key if value is None else value for value, key in zip(dates, keys)]
+
+        amounts = [
+            f"{cents / 100:.2f}" if cents is not None else None for cents in _object_values(frame["amount"])
+        ]
+
+        records = []
+        for row in zip(
+            _object_values(frame["id"]),
+            _object_values(frame["state"]),
+            dates,
+            amounts,
+            _object_values(frame["currency_name"]),
+            _object_values(frame["currency_code"]),
+            _object_values(frame["description"]),
+            _object_values(frame["from"]),
+            _object_values(frame["to"]),
+        ):
+            records.append(
+                {
+                    "id": row[0],
+                    "state": row[1],
+                    "date": row[2],
+                    "operationAmount": {"amount": row[3], "currency": {"name": row[4], "code": row[5]}},
+                    "description": row[6],
+                    "from": row[7],
+                    "to": row[8],
+                }
+            )
+        return records
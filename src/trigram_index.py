@@ -0,0 +1,245 @@
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .logger_config import setup_logger
+from .transaction_table import TransactionTable
+from .word_index import POSITION_TYPECODE, intersect_positions
+
+logger = setup_logger("trigram_index", "trigram_index.log")
+
+try:
+    # Классы символов, которые re.IGNORECASE считает равными помимо совпадения в нижнем регистре
+    # ("i" и "ı", "s" и "ſ", "σ" и "ς" и т.п.)
+    from re._casefix import _EXTRA_CASES  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - другая реализация Python
+    _EXTRA_CASES = None
+
+# Индекс можно использовать для отбора кандидатов, только если приведение регистра совпадает с re
+TRIGRAMS_AVAILABLE = _EXTRA_CASES is not None
+
+# Если найдено больше 1/ROW_MASK_RATIO от числа различных описаний, позиции строк
+# выбираются маской по всем строкам, а не по группам строк каждого описания
+ROW_MASK_RATIO = 64
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _case_table() -> Dict[int, int]:
+    """Символы, которые заменяются одним представителем своего класса (наименьшим кодом)."""
+    table = {}
+    for lower, others in (_EXTRA_CASES or {}).items():
+        canonical = min((lower,) + tuple(others))
+        if lower != canonical:
+            table[lower] = canonical
+    return table
+
+
+_CASE_TABLE = _case_table()
+
+_CASE_PATTERN = re.compile("[" + "".join(re.escape(chr(code)) for code in _CASE_TABLE) + "]") if _CASE_TABLE else None
+
+
+def fold_case(text: str) -> str:
+    """
+    Приводит текст к виду, в котором символы, равные для re.IGNORECASE, совпадают.
+
+    re сравнивает символы по одному (простое приведение к нижнему регистру
+    и классы _EXTRA_CASES), поэтому длина текста сохраняется, и если шаблон
+    re.escape(строка) находится в тексте, то fold_case(строка) - подстрока
+    fold_case(текста).
+
+    Args:
+        text: Текст
+
+    Returns:
+        Текст той же длины в нижнем регистре
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Полное приведение удлиняет строку ("İ" -> "i̇"), а re берет только первый символ
+        lowered = "".join([char.lower()[0] for char in text])
+    if _CASE_PATTERN is not None and _CASE_PATTERN.search(lowered):
+        lowered = lowered.translate(_CASE_TABLE)
+    return lowered
+
+
+def _descriptions(operations: Union[Sequence[Dict[str, Any]], TransactionTable], start: int) -> List[str]:
+    """Описания операций, начиная с позиции start (пропуски и нестроковые значения - пустая строка)."""
+    if isinstance(operations, TransactionTable):
+        values = operations.frame["description"].iloc[start:].tolist()
+    else:
+        values = [operations[position].get("description", "") for position in range(start, len(operations))]
+    return [value if isinstance(value, str) else "" for value in values]
+
+
+def trigrams(text: str) -> set:
+    """Множество триграмм (подстрок из трех символов) приведенного текста."""
+    folded = fold_case(text)
+    return {folded[i: i + 3] for i in range(len(folded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Триграммный индекс описаний операций для поиска подстроки без учета регистра.
+
+    Индекс хранит различные описания, для каждой триграммы - номера
+    описаний, в которых она встречается, и номер описания каждой операции.
+    Поиск пересекает списки триграмм строки поиска и проверяет оставшиеся
+    описания тем же шаблоном re.escape(search) с re.IGNORECASE, что и
+    process_bank_search, поэтому результат совпадает с просмотром всех
+    операций. Шаблон проверяется один раз для каждого различного описания.
+    Строки короче трех символов проверяются по всем различным описаниям.
+
+    Индекс привязан к набору данных, переданному в последний вызов add:
+    поиск по другому объекту (в том числе отсортированной копии или
+    результату take) отклоняется. Когда набор данных дополняется, его
+    целиком передают в add - индексируются только новые операции.
+    """
+
+    def __init__(self) -> None:
+        self._size = 0
+        self._ids: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._row_texts = array(POSITION_TYPECODE)
+        # Позиции строк, сгруппированные по номеру описания, и границы групп (строятся при первом поиске)
+        self._groups: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # Набор данных, для которого построен индекс
+        self._operations: Optional[Union[Sequence[Dict[str, Any]], TransactionTable]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def texts(self) -> int:
+        """Количество различных описаний."""
+        return len(self._texts)
+
+    def _matches_last_row(self, operations: Union[Sequence[Dict[str, Any]], TransactionTable]) -> bool:
+        """Проверяет, что описание последней проиндексированной операции не изменилось."""
+        if not self._size:
+            return True
+        if len(operations) < self._size:
+            return False
+        return _descriptions(operations, self._size - 1)[0] == self._texts[self._row_texts[-1]]
+
+    def covers(self, operations: Any) -> bool:
+        """
+        Проверяет, что индекс построен для этого набора данных и покрывает все его операции.
+
+        Набор данных сравнивается по тождеству объекта, длине и описанию
+        последней операции; перестановка операций списка на месте,
+        не затронувшая последнюю операцию, не обнаруживается.
+        """
+        return (
+            self._operations is not None
+            and operations is self._operations
+            and len(operations) == self._size
+            and self._matches_last_row(operations)
+        )
+
+    def add(self, operations: Union[Sequence[Dict[str, Any]], TransactionTable]) -> int:
+        """
+        Индексирует операции набора данных, которых еще нет в индексе, и привязывает индекс к набору.
+
+        Args:
+            operations: Весь набор данных (список или TransactionTable); первые len(index)
+                операций уже проиндексированы, добавляются только следующие
+
+        Returns:
+            Количество добавленных операций
+
+        Raises:
+            ValueError: Если набор данных не является продолжением проиндексированного
+        """
+        if not self._matches_last_row(operations):
+            raise ValueError("Набор данных не является продолжением проиндексированного")
+        descriptions = _descriptions(operations, self._size)
+
+        ids, texts, postings, row_texts = self._ids, self._texts, self._postings, self._row_texts
+        for text in descriptions:
+            text_id = ids.get(text)
+            if text_id is None:
+                text_id = ids[text] = len(texts)
+                texts.append(text)
+                for trigram in trigrams(text):
+                    posting = postings.get(trigram)
+                    if posting is None:
+                        posting = postings[trigram] = array(POSITION_TYPECODE)
+                    posting.append(text_id)
+            row_texts.append(text_id)
+
+        self._size += len(descriptions)
+        self._groups = None
+        self._operations = operations
+        logger.debug(f"В индекс добавлено {len(descriptions)} операций, всего {self._size}, описаний {len(texts)}")
+        return len(descriptions)
+
+    def candidates(self, search: str) -> np.ndarray:
+        """
+        Номера описаний, в которых есть все триграммы строки поиска.
+
+        Args:
+            search: Строка поиска
+
+        Returns:
+            Номера описаний по возрастанию (для строк короче трех символов - все описания)
+        """
+        grams = trigrams(search) if TRIGRAMS_AVAILABLE else set()
+        if not grams:
+            return np.arange(len(self._texts), dtype=np.int64)
+
+        postings: List[np.ndarray] = []
+        for trigram in grams:
+            found = self._postings.get(trigram)
+            if found is None:
+                return _EMPTY
+            postings.append(np.frombuffer(found, dtype=np.int64))
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not len(result):
+                break
+            result = intersect_positions(result, posting)
+        return np.array(result)
+
+    def _rows(self, text_ids: np.ndarray) -> np.ndarray:
+        """Позиции строк с заданными номерами описаний по возрастанию."""
+        row_texts = np.frombuffer(self._row_texts, dtype=np.int64)
+        if len(text_ids) * ROW_MASK_RATIO >= len(self._texts):
+            found = np.zeros(len(self._texts), dtype=bool)
+            found[text_ids] = True
+            return np.flatnonzero(found[row_texts])
+
+        if self._groups is None:
+            order = np.argsort(row_texts, kind="stable")
+            bounds = np.searchsorted(row_texts[order], np.arange(len(self._texts) + 1))
+            self._groups = (order, bounds)
+        order, bounds = self._groups
+        starts, ends = bounds[text_ids], bounds[text_ids + 1]
+        counts = ends - starts
+        # Позиции всех групп одним массивом: смещение начала группы + номер внутри группы
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return np.sort(order[offsets])
+
+    def positions(self, search: str) -> np.ndarray:
+        """
+        Находит операции, в описании которых есть строка (без учета регистра).
+
+        Args:
+            search: Строка поиска
+
+        Returns:
+            Позиции найденных операций по возрастанию
+        """
+        pattern = re.compile(re.escape(search), re.IGNORECASE)
+        candidates = self.candidates(search)
+        texts = self._texts
+        matched = np.array([text_id for text_id in candidates.tolist() if pattern.search(texts[text_id])], np.int64)
+        logger.debug(
+            f"Поиск '{search}': кандидатов {len(candidates)} из {len(texts)} описаний, совпало {len(matched)}"
+        )
+        return self._rows(matched).astype(np.intp, copy=False)
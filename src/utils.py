@@ -1,15 +1,25 @@
+import functools
 import json
 import re
-from collections import Counter
-from typing import Any, Dict, List
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import pandas as pd
 
+from .file_reader import apply_transaction_dtypes, read_csv_frame
 from .logger_config import setup_logger
+from .transaction_table import TransactionTable
+from .trigram_index import TrigramIndex
 
 # Создаем логгер для модуля utils
 logger = setup_logger("utils", "utils.log")
 
+# До этого количества категорий проверка `category in description` по очереди (в C) быстрее прохода автомата
+CATEGORY_SCAN_LIMIT = 32
+
+# Количество автоматов CategoryMatcher для разных списков категорий, которые хранятся для повторного использования
+CATEGORY_MATCHER_CACHE_SIZE = 32
+
 
 def read_json_file(file_path: str) -> List[Dict[str, Any]]:
     """
@@ -60,8 +70,9 @@ def load_csv_transactions(file_path: str) -> List[Dict[str, Any]]:
     logger.debug(f"Загрузка CSV транзакций из: {file_path}")
 
     try:
-        # Читаем CSV файл с помощью pandas
-        df = pd.read_csv(file_path)
+        # Читаем CSV файл с помощью pandas: формат определяется по началу файла,
+        # типы колонок задаются по схеме транзакции
+        df = apply_transaction_dtypes(read_csv_frame(file_path))
 
         # Преобразуем DataFrame в список словарей
         transactions = df.to_dict("records")
@@ -93,8 +104,8 @@ def load_excel_transactions(file_path: str) -> List[Dict[str, Any]]:
     logger.debug(f"Загрузка Excel транзакций из: {file_path}")
 
     try:
-        # Читаем Excel файл с помощью pandas
-        df = pd.read_excel(file_path)
+        # Читаем Excel файл с помощью pandas и приводим колонки к типам схемы транзакции
+        df = apply_transaction_dtypes(pd.read_excel(file_path))
 
         # Преобразуем DataFrame в список словарей
         transactions = df.to_dict("records")
@@ -113,19 +124,41 @@ def load_excel_transactions(file_path: str) -> List[Dict[str, Any]]:
         return []
 
 
-def process_bank_search(data: List[Dict[str, Any]], search: str) -> List[Dict[str, Any]]:
+def process_bank_search(
+    data: Union[List[Dict[str, Any]], TransactionTable], search: str, index: Optional[TrigramIndex] = None
+) -> Union[List[Dict[str, Any]], TransactionTable]:
     """
     Ищет транзакции по заданной строке в описании с использованием регулярных выражений.
 
     Args:
-        data: Список словарей с данными о банковских операциях
+        data: Список словарей с данными о банковских операциях или TransactionTable
         search: Строка для поиска в описании операций
+        index: Триграммный индекс TrigramIndex, построенный для этих данных: шаблон проверяется
+            только для описаний, содержащих все триграммы строки поиска (результат тот же)
 
     Returns:
         List[Dict[str, Any]]: Список словарей с операциями, у которых в описании есть искомая строка
+        (для TransactionTable - таблица с найденными операциями)
+
+    Raises:
+        ValueError: Если индекс построен для других данных
     """
     logger.debug(f"Поиск транзакций по строке: '{search}'")
 
+    if index is not None and data and search:
+        if not index.covers(data):
+            raise ValueError("Индекс TrigramIndex построен для других данных")
+        positions = index.positions(search)
+        logger.info(f"Найдено {len(positions)} транзакций по запросу '{search}' (индекс)")
+        if isinstance(data, TransactionTable):
+            return data.take(positions)
+        return [data[position] for position in positions.tolist()]
+
+    if isinstance(data, TransactionTable) and search:
+        result_table = data.search(search)
+        logger.info(f"Найдено {len(result_table)} транзакций по запросу '{search}'")
+        return result_table
+
     if not data or not search:
         logger.warning("Пустые данные или строка поиска")
         return []
@@ -142,12 +175,109 @@ def process_bank_search(data: List[Dict[str, Any]], search: str) -> List[Dict[st
     return result
 
 
-def process_bank_operations(data: List[Dict[str, Any]], categories: List[str]) -> Dict[str, int]:
+class CategoryMatcher:
+    """
+    Автомат Ахо-Корасик для поиска категорий в описании за один проход.
+
+    Строится один раз для списка категорий (в нижнем регистре): бор категорий
+    с суффиксными ссылками, достроенный до детерминированного автомата, так что
+    каждый символ описания - один переход. Для каждого состояния заранее
+    известен наименьший номер категории, которая заканчивается в нем (с учетом
+    суффиксов), поэтому результат совпадает с проверкой `category in description`
+    по категориям в порядке списка. Для коротких списков (до CATEGORY_SCAN_LIMIT)
+    категории проверяются по очереди: это быстрее прохода автомата.
+    """
+
+    def __init__(self, categories: Sequence[str]) -> None:
+        """
+        Args:
+            categories: Категории в порядке приоритета
+        """
+        self.categories = [category.lower() for category in categories]
+        self._scan = len(self.categories) < CATEGORY_SCAN_LIMIT
+        self._delta: List[Dict[str, int]] = []
+        self._best: List[int] = []
+        if not self._scan:
+            self._build()
+
+    def _build(self) -> None:
+        """Строит автомат по категориям."""
+        no_match = len(self.categories)
+
+        # Бор категорий: переходы и наименьший номер категории, заканчивающейся в состоянии
+        transitions: List[Dict[str, int]] = [{}]
+        best = [no_match]
+        for number, category in enumerate(self.categories):
+            state = 0
+            for char in category:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = transitions[state][char] = len(transitions)
+                    transitions.append({})
+                    best.append(no_match)
+                state = next_state
+            best[state] = min(best[state], number)
+
+        # Обход в ширину: переходы состояния дополняются переходами его суффиксной ссылки
+        delta: List[Dict[str, int]] = [dict(transitions[0])] + [{} for _ in transitions[1:]]
+        queue = deque((state, 0) for state in transitions[0].values())
+        while queue:
+            state, link = queue.popleft()
+            best[state] = min(best[state], best[link])
+            for char, next_state in transitions[state].items():
+                queue.append((next_state, delta[link].get(char, 0)))
+            delta[state] = {**delta[link], **transitions[state]}
+
+        self._delta = delta
+        self._best = best
+
+    def match(self, description: str) -> Optional[str]:
+        """
+        Находит первую по порядку списка категорию, которая встречается в описании.
+
+        Args:
+            description: Описание в нижнем регистре
+
+        Returns:
+            Категория (в нижнем регистре) или None
+        """
+        if self._scan:
+            for category in self.categories:
+                if category in description:
+                    return category
+            return None
+
+        delta, best = self._delta, self._best
+        found = best[0]
+        state = 0
+        for char in description:
+            state = delta[state].get(char, 0)
+            if best[state] < found:
+                found = best[state]
+                if not found:
+                    break
+        return self.categories[found] if found < len(self.categories) else None
+
+
+@functools.lru_cache(maxsize=CATEGORY_MATCHER_CACHE_SIZE)
+def category_matcher(categories: Tuple[str, ...]) -> CategoryMatcher:
+    """Возвращает автомат для списка категорий (повторные вызовы с тем же списком используют готовый)."""
+    return CategoryMatcher(categories)
+
+
+def process_bank_operations(
+    data: Union[List[Dict[str, Any]], TransactionTable], categories: List[str]
+) -> Dict[str, int]:
     """
     Подсчитывает количество банковских операций по категориям.
 
+    Операция относится к первой по порядку списка категории, которая
+    встречается в ее описании (без учета регистра). Одинаковые описания
+    проверяются один раз, а каждое описание просматривается за один
+    проход автоматом CategoryMatcher, независимо от количества категорий.
+
     Args:
-        data: Список словарей с данными о банковских операциях
+        data: Список словарей с данными о банковских операциях или TransactionTable
         categories: Список категорий операций для подсчета
 
     Returns:
@@ -159,26 +289,22 @@ def process_bank_operations(data: List[Dict[str, Any]], categories: List[str]) -
         logger.warning("Пустые данные или категории")
         return {}
 
-    # Приводим категории к нижнему регистру для сравнения без учета регистра
-    categories_lower = [cat.lower() for cat in categories]
-
-    # Собираем все описания
-    descriptions = []
-    for transaction in data:
-        description = transaction.get("description", "").lower()
-        if description:
-            descriptions.append(description)
-
-    # Фильтруем описания по категориям
-    filtered_descriptions = []
-    for desc in descriptions:
-        for category in categories_lower:
-            if category in desc:
-                filtered_descriptions.append(category)
-                break
-
-    # Используем Counter для подсчета
-    counter = Counter(filtered_descriptions)
+    matcher = category_matcher(tuple(categories))
+
+    # Собираем описания с количеством повторов
+    if isinstance(data, TransactionTable):
+        descriptions = Counter(data.frame["description"].tolist())
+    else:
+        descriptions = Counter(transaction.get("description", "") for transaction in data)
+
+    # Относим описания к категориям
+    counter: Counter = Counter()
+    for description, count in descriptions.items():
+        if not description:
+            continue
+        category = matcher.match(description.lower())
+        if category is not None:
+            counter[category] += count
 
     # Восстанавливаем оригинальные названия категорий
     result = {}
@@ -0,0 +1,354 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .batch_reader import SUPPORTED_EXTENSIONS, read_statement
+from .logger_config import setup_logger
+from .transaction_table import TransactionTable
+
+logger = setup_logger("watcher", "watcher.log")
+
+# Флаги событий inotify (linux/inotify.h): файл закрыт после записи или перемещен в папку
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+# Заголовок события inotify: wd, mask, cookie, len
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# Максимальное количество файлов, ожидающих обработки; при заполнении очереди наблюдатель ждет
+QUEUE_SIZE = 256
+
+# Количество потоков, разбирающих файлы
+WORKERS = 4
+
+# Интервал опроса папки, если inotify недоступен, секунды
+POLL_INTERVAL = 1.0
+
+# Таймаут ожидания событий, после которого наблюдатель проверяет флаг остановки, секунды
+STOP_CHECK_INTERVAL = 0.5
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """Загружает функции inotify из libc (только Linux)."""
+    library = ctypes.util.find_library("c")
+    if not library:
+        return None
+    try:
+        libc = ctypes.CDLL(library, use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+_libc = _load_inotify()
+
+INOTIFY_AVAILABLE = _libc is not None
+
+
+def is_statement_file(name: str) -> bool:
+    """Проверяет, что файл является выпиской (не скрытый и поддерживаемого формата)."""
+    return not name.startswith(".") and name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+class TransactionStore:
+    """
+    Потокобезопасное хранилище транзакций в памяти.
+
+    Транзакции хранятся по файлам: повторно обработанный файл заменяет
+    прежние данные. Объединенная таблица собирается при первом запросе
+    после изменения и затем переиспользуется.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tables: Dict[str, TransactionTable] = {}
+        self._errors: Dict[str, str] = {}
+        self._merged: Optional[TransactionTable] = None
+
+    def add(self, file_path: str, table: TransactionTable) -> None:
+        """
+        Добавляет (или заменяет) транзакции файла.
+
+        Args:
+            file_path: Путь к файлу выписки
+            table: Транзакции файла
+        """
+        with self._lock:
+            self._tables[file_path] = table
+            self._errors.pop(file_path, None)
+            self._merged = None
+
+    def add_error(self, file_path: str, error: str) -> None:
+        """Запоминает ошибку обработки файла."""
+        with self._lock:
+            self._errors[file_path] = error
+
+    def table(self) -> TransactionTable:
+        """
+        Возвращает все транзакции хранилища.
+
+        Returns:
+            Объединенная таблица транзакций в порядке путей к файлам
+        """
+        with self._lock:
+            if self._merged is None:
+                self._merged = TransactionTable.concat([self._tables[path] for path in sorted(self._tables)])
+            return self._merged
+
+    @property
+    def files(self) -> List[str]:
+        """Обработанные файлы."""
+        with self._lock:
+            return sorted(self._tables)
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        """Ошибки обработки файлов {путь: описание}."""
+        with self._lock:
+            return dict(self._errors)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(table) for table in self._tables.values())
+
+
+class DirectoryWatcher:
+    """
+    Наблюдатель за папкой с выписками.
+
+    Новые файлы находятся через inotify (Linux) или опросом папки и через
+    ограниченную очередь передаются пулу потоков, которые читают их через
+    detect_file_type_and_read и публикуют транзакции в TransactionStore.
+    Если очередь заполнена, наблюдатель ждет, пока потоки ее разберут.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        store: Optional[TransactionStore] = None,
+        workers: int = WORKERS,
+        queue_size: int = QUEUE_SIZE,
+        poll_interval: float = POLL_INTERVAL,
+        use_inotify: Optional[bool] = None,
+        process_existing: bool = True,
+    ) -> None:
+        """
+        Args:
+            directory: Папка, за которой ведется наблюдение
+            store: Хранилище транзакций (по умолчанию создается новое)
+            workers: Количество потоков, разбирающих файлы
+            queue_size: Размер очереди файлов, ожидающих обработки
+            poll_interval: Интервал опроса папки без inotify, секунды
+            use_inotify: Использовать inotify (None - если доступен)
+            process_existing: Обработать файлы, которые уже лежат в папке
+        """
+        if workers < 1:
+            raise ValueError("workers должен быть не меньше 1")
+        self.directory = directory
+        self.store = store if store is not None else TransactionStore()
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.use_inotify = INOTIFY_AVAILABLE if use_inotify is None else use_inotify and INOTIFY_AVAILABLE
+        self.process_existing = process_existing
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self) -> "DirectoryWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Запускает наблюдение и потоки обработки."""
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"Папка не найдена: {self.directory}")
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"watcher-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        if self.use_inotify:
+            # Подписка выполняется до начального сканирования, чтобы не пропустить файлы между ними
+            fd = self._inotify_open()
+            self._threads.append(threading.Thread(target=self._watch_inotify, args=(fd,), daemon=True))
+        else:
+            self._threads.append(threading.Thread(target=self._watch_polling, daemon=True))
+
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Наблюдение за {self.directory}: {'inotify' if self.use_inotify else 'опрос'}, "
+                    f"потоков {self.workers}")
+
+    def stop(self) -> None:
+        """Останавливает наблюдение, дожидаясь обработки файлов из очереди."""
+        self._stop.set()
+        watcher = self._threads[-1:] if self._threads else []
+        for thread in watcher:
+            thread.join()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        logger.info(f"Наблюдение за {self.directory} остановлено")
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждет, пока очередь файлов будет разобрана.
+
+        Args:
+            timeout: Максимальное время ожидания, секунды
+
+        Returns:
+            True, если все поставленные в очередь файлы обработаны
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _enqueue(self, file_path: str) -> None:
+        """Ставит файл в очередь; при заполненной очереди блокируется (обратное давление)."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(file_path, timeout=STOP_CHECK_INTERVAL)
+                return
+            except queue.Full:
+                logger.debug(f"Очередь заполнена, ожидание обработки: {file_path}")
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Возвращает выписки папки и их размер и время изменения."""
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if is_statement_file(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _work(self) -> None:
+        """Поток обработки: читает файлы из очереди и публикует транзакции."""
+        while True:
+            file_path = self._queue.get()
+            try:
+                if file_path is None:
+                    return
+                started = time.monotonic()
+                table, error = read_statement(file_path, True)
+                if error:
+                    logger.error(f"Ошибка обработки {file_path}: {error}")
+                    self.store.add_error(file_path, error)
+                else:
+                    self.store.add(file_path, table)
+                    logger.info(f"Файл {file_path}: {len(table)} транзакций за {time.monotonic() - started:.2f} с")
+            except Exception as e:
+                logger.error(f"Неожиданная ошибка обработки {file_path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _watch_polling(self) -> None:
+        """
+        Опрашивает папку с интервалом poll_interval.
+
+        Файл ставится в очередь, когда его размер и время изменения не менялись
+        между двумя опросами, поэтому недописанные файлы не читаются.
+        """
+        processed: Dict[str, Tuple[int, int]] = {} if self.process_existing else self._scan()
+        pending: Dict[str, Tuple[int, int]] = {}
+
+        while not self._stop.is_set():
+            try:
+                current = self._scan()
+            except OSError as e:
+                logger.error(f"Ошибка чтения папки {self.directory}: {e}")
+                current = {}
+
+            for file_path, signature in current.items():
+                if processed.get(file_path) == signature:
+                    continue
+                if pending.get(file_path) == signature:
+                    del pending[file_path]
+                    processed[file_path] = signature
+                    self._enqueue(file_path)
+                else:
+                    pending[file_path] = signature
+
+            # Удаленные файлы перестают отслеживаться
+            for file_path in set(processed) - set(current):
+                del processed[file_path]
+
+            self._stop.wait(self.poll_interval)
+
+    def _inotify_open(self) -> int:
+        """Создает дескриптор inotify и подписывается на события папки."""
+        if _libc is None:
+            raise OSError("inotify недоступен")
+        fd: int = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if _libc.inotify_add_watch(fd, os.fsencode(self.directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {self.directory}")
+        return fd
+
+    def _watch_inotify(self, fd: int) -> None:
+        """Получает события inotify: файл дописан и закрыт или перемещен в папку."""
+        try:
+            if self.process_existing:
+                for file_path in sorted(self._scan()):
+                    self._enqueue(file_path)
+
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], STOP_CHECK_INTERVAL)
+                if not ready:
+                    continue
+                data = os.read(fd, 65536)
+                offset = 0
+                while offset < len(data):
+                    _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                    name = data[offset + INOTIFY_EVENT.size: offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                    offset += INOTIFY_EVENT.size + length
+
+                    if mask & IN_Q_OVERFLOW:
+                        # События потеряны - обрабатываем папку целиком
+                        logger.warning(f"Переполнение очереди inotify, повторное сканирование {self.directory}")
+                        for file_path in sorted(self._scan()):
+                            self._enqueue(file_path)
+                    elif mask & IN_IGNORED:
+                        logger.error(f"Папка {self.directory} удалена, наблюдение прекращено")
+                        return
+                    elif name and is_statement_file(os.fsdecode(name)):
+                        self._enqueue(os.path.join(self.directory, os.fsdecode(name)))
+        except Exception as e:
+            logger.error(f"Ошибка наблюдения за {self.directory}: {e}")
+        finally:
+            os.close(fd)
+
+
+def watch_directory(directory: str, **kwargs: object) -> DirectoryWatcher:
+    """
+    Запускает наблюдение за папкой с выписками.
+
+    Args:
+        directory: Папка с выписками
+        **kwargs: Параметры DirectoryWatcher (workers, queue_size, poll_interval и др.)
+
+    Returns:
+        Запущенный наблюдатель; транзакции доступны через watcher.store
+    """
+    watcher = DirectoryWatcher(directory, **kwargs)  # type: ignore[arg-type]
+    watcher.start()
+    return watcher
@@ -1,5 +1,10 @@
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .transaction_table import TransactionTable
 
 
 def mask_account_card(account_info: str) -> str:
@@ -93,39 +98,78 @@ def get_transaction_amount(transaction: Dict[str, Any]) -> tuple:
     return amount, currency
 
 
-def display_transactions(transactions: List[Dict[str, Any]]) -> None:
-    """Отображает список транзакций."""
-    if not transactions:
-        print("Не найдено транзакций, подходящих под условия фильтрации")
-        return
+def _print_transaction(transaction: Dict[str, Any], formatted_date: str) -> None:
+    """Выводит одну транзакцию: дату и описание, счета и сумму."""
+    description = transaction.get("description", "")
+    from_account = transaction.get("from", "")
+    to_account = transaction.get("to", "")
 
-    print(f"Всего банковских операций в выборке: {len(transactions)}\n")
+    # Получаем сумму и валюту
+    amount, currency = get_transaction_amount(transaction)
 
-    for i, transaction in enumerate(transactions, 1):
-        # Форматируем дату
-        date_str = transaction.get("date", "")
-        formatted_date = get_date(date_str)
+    # Выводим информацию
+    print(f"{formatted_date} {description}")
 
-        description = transaction.get("description", "")
-        from_account = transaction.get("from", "")
-        to_account = transaction.get("to", "")
+    if from_account:
+        masked_from = mask_account_card(from_account)
+        if to_account:
+            masked_to = mask_account_card(to_account)
+            print(f"{masked_from} -> {masked_to}")
+        else:
+            print(f"{masked_from}")
+    elif to_account:
+        masked_to = mask_account_card(to_account)
+        print(f"{masked_to}")
+
+    print(f"Сумма: {amount} {currency}\n")
+
+
+def display_transactions(
+    transactions: Union[List[Dict[str, Any]], TransactionTable, Iterable[Dict[str, Any]]],
+    limit: Optional[int] = None,
+    total: Optional[int] = None,
+) -> None:
+    """
+    Отображает список транзакций (не больше limit первых, если limit задан).
+
+    Итератор (например, результат external_sort_by_date) выводится по мере
+    получения транзакций, а их количество - после вывода. При выводе части
+    выборки (страницы) в total передается количество операций во всей выборке.
+    """
+    if not isinstance(transactions, (list, tuple, TransactionTable)):
+        count = 0
+        for transaction in islice(transactions, limit):
+            _print_transaction(transaction, get_date(transaction.get("date", "")))
+            count += 1
+        if count:
+            print(f"Выведено банковских операций: {count}")
+        else:
+            print("Не найдено транзакций, подходящих под условия фильтрации")
+        return
 
-        # Получаем сумму и валюту
-        amount, currency = get_transaction_amount(transaction)
+    if total is None:
+        total = len(transactions)
+    formatted_dates = None
+    if isinstance(transactions, TransactionTable):
+        if limit is not None:
+            transactions = transactions.take(np.arange(min(limit, len(transactions))))
+        # Даты таблицы форматируются векторно, со смещением пояса - из исходной строки, как в get_date
+        formatted_dates = transactions.format_dates()
+        # Словари транзакций создаются только для вывода
+        transactions = transactions.to_records()
+    elif limit is not None:
+        transactions = transactions[:limit]
 
-        # Выводим информацию
-        print(f"{formatted_date} {description}")
+    if not transactions:
+        print("Не найдено транзакций, подходящих под условия фильтрации")
+        return
 
-        if from_account:
-            masked_from = mask_account_card(from_account)
-            if to_account:
-                masked_to = mask_account_card(to_account)
-                print(f"{masked_from} -> {masked_to}")
-            else:
-                print(f"{masked_from}")
-        elif to_account:
-            masked_to = mask_account_card(to_account)
-            print(f"{masked_to}")
+    print(f"Всего банковских операций в выборке: {total}\n")
 
-        print(f"Сумма: {amount} {currency}\n")
-        
\ No newline at end of file
+    for i, transaction in enumerate(transactions, 1):
+        # Форматируем дату
+        if formatted_dates is not None:
+            formatted_date = formatted_dates[i - 1] or ""
+        else:
+            formatted_date = get_date(transaction.get("date", ""))
+        _print_transaction(transaction, formatted_date)
@@ -0,0 +1,462 @@
+import hashlib
+import os
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .logger_config import setup_logger
+from .record_file import Arrays, read_records, write_record
+from .transaction_table import TransactionTable
+
+logger = setup_logger("word_index", "word_index.log")
+
+# Расширение файла индекса, который хранится рядом с набором данных
+WORD_INDEX_SUFFIX = ".words.dat"
+
+# Версия формата файла индекса
+WORD_INDEX_VERSION = 3
+
+# Поля операции, слова которых индексируются по умолчанию
+DEFAULT_FIELDS = ("description",)
+
+# Слово - последовательность букв и цифр любого алфавита (в том числе кириллицы)
+WORD_PATTERN = re.compile(r"\w+")
+
+# Максимальное количество различных текстов, слова которых запоминаются при построении
+TOKEN_CACHE_SIZE = 100_000
+
+# Тип позиций в списках вхождений (array и NumPy)
+POSITION_TYPECODE = "q"
+
+# Если вхождений слов с общим началом больше 1/UNION_BITMAP_RATIO от числа операций,
+# они объединяются битовой маской, а не сортировкой
+UNION_BITMAP_RATIO = 64
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# Разделители полей и строк при вычислении хэша проиндексированных строк
+FIELD_SEPARATOR = "\x1f"
+ROW_SEPARATOR = "\x1e"
+
+Postings = Dict[str, array]
+
+
+def normalize_text(text: str) -> str:
+    """Приводит текст к виду для сравнения слов: casefold и замена "ё" на "е"."""
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на нормализованные слова.
+
+    Args:
+        text: Текст (описание операции, отправитель, получатель или поисковый запрос)
+
+    Returns:
+        Слова в порядке следования
+    """
+    return WORD_PATTERN.findall(normalize_text(text))
+
+
+def index_path_for(file_path: str) -> str:
+    """Возвращает путь к файлу индекса для файла с набором данных."""
+    return file_path + WORD_INDEX_SUFFIX
+
+
+def _text(value: Any) -> str:
+    """Значение поля как текст; пропуски (None, NaN) и нестроковые значения не индексируются."""
+    return value if isinstance(value, str) else ""
+
+
+def _iter_rows(
+    operations: Union[Sequence[Dict[str, Any]], TransactionTable], fields: Tuple[str, ...], start: int
+) -> Iterator[Tuple[str, ...]]:
+    """Отдает значения индексируемых полей строк, начиная с позиции start."""
+    if isinstance(operations, TransactionTable):
+        columns = [operations.frame[field].iloc[start:].tolist() for field in fields]
+        for values in zip(*columns):
+            yield tuple(_text(value) for value in values)
+    else:
+        for position in range(start, len(operations)):
+            operation = operations[position]
+            yield tuple(_text(operation.get(field)) for field in fields)
+
+
+def _update_rows_hash(digest: Any, row: Tuple[str, ...]) -> None:
+    """Добавляет значения полей строки в хэш проиндексированных строк."""
+    digest.update((FIELD_SEPARATOR.join(row) + ROW_SEPARATOR).encode("utf-8", "surrogatepass"))
+
+
+def intersect_positions(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Пересекает отсортированные списки позиций: бинарный поиск элементов короткого в длинном."""
+    if len(left) > len(right):
+        left, right = right, left
+    if not len(left):
+        return _EMPTY
+    found = np.searchsorted(right, left)
+    found[found == len(right)] = 0
+    common: np.ndarray = left[right[found] == left]
+    return common
+
+
+class WordIndex:
+    """
+    Инвертированный индекс слов операций: слово -> позиции операций.
+
+    Слова выделяются из полей fields (по умолчанию - описание) без учета
+    регистра, "ё" и "е" не различаются. Запрос из нескольких слов находит
+    операции, содержащие все слова, а последнее слово запроса по умолчанию
+    ищется как начало слова (поиск по мере ввода). Позиции операций в
+    списках вхождений возрастают, поэтому запрос выполняется пересечением
+    списков и не просматривает описания.
+
+    Индекс привязан к набору данных, переданному в последний вызов add:
+    поиск по другому объекту (в том числе отсортированной копии или
+    результату take) отклоняется. Когда набор данных дополняется, его
+    целиком передают в add - индексируются только новые операции. Индекс
+    сохраняется в файл частями: save дописывает только вхождения,
+    добавленные после предыдущего сохранения.
+    """
+
+    def __init__(self, fields: Iterable[str] = DEFAULT_FIELDS) -> None:
+        """
+        Args:
+            fields: Поля операций, слова которых индексируются (например, description, from, to)
+        """
+        self._fields = tuple(fields)
+        self._size = 0
+        self._postings: Postings = {}
+        # Количество операций на момент последнего сохранения и значения полей последней строки
+        self._saved_size = 0
+        self._last_row: Optional[Tuple[str, ...]] = None
+        # Хэш значений полей всех проиндексированных строк; у загруженного индекса вычислитель
+        # хэша отсутствует, пока хэш не сверен с набором данных
+        self._rows_hash = hashlib.blake2b(digest_size=16).hexdigest()
+        self._digest: Optional[Any] = hashlib.blake2b(digest_size=16)
+        self._words: Optional[List[str]] = None
+        self._path: Optional[str] = None
+        # Набор данных, для которого построен индекс
+        self._operations: Optional[Union[Sequence[Dict[str, Any]], TransactionTable]] = None
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Индексируемые поля."""
+        return self._fields
+
+    @property
+    def words(self) -> List[str]:
+        """Слова индекса в порядке возрастания (для поиска по началу слова)."""
+        if self._words is None:
+            self._words = sorted(self._postings)
+        return self._words
+
+    def __len__(self) -> int:
+        return self._size
+
+    def covers(self, operations: Any) -> bool:
+        """
+        Проверяет, что индекс построен для этого набора данных и покрывает все его операции.
+
+        Набор данных сравнивается по тождеству объекта, длине и последней
+        проиндексированной операции; перестановка операций списка на месте,
+        не затронувшая последнюю операцию, не обнаруживается.
+        """
+        return (
+            self._operations is not None
+            and operations is self._operations
+            and len(operations) == self._size
+            and self._matches_last_row(operations)
+        )
+
+    def _matches_last_row(self, operations: Union[Sequence[Dict[str, Any]], TransactionTable]) -> bool:
+        """Проверяет, что последняя проиндексированная строка набора данных не изменилась."""
+        if not self._size:
+            return True
+        if len(operations) < self._size:
+            return False
+        return next(_iter_rows(operations, self._fields, self._size - 1)) == self._last_row
+
+    def _matches_rows(self, operations: Union[Sequence[Dict[str, Any]], TransactionTable]) -> bool:
+        """
+        Проверяет, что ни одна проиндексированная строка набора данных не изменилась.
+
+        Хэш значений полей первых len(index) строк сравнивается с сохраненным;
+        при совпадении индекс продолжает вычислять хэш для новых строк.
+        """
+        if len(operations) < self._size:
+            return False
+        digest = hashlib.blake2b(digest_size=16)
+        for _, row in zip(range(self._size), _iter_rows(operations, self._fields, 0)):
+            _update_rows_hash(digest, row)
+        if digest.hexdigest() != self._rows_hash:
+            return False
+        self._digest = digest
+        return True
+
+    def add(self, operations: Union[Sequence[Dict[str, Any]], TransactionTable]) -> int:
+        """
+        Индексирует операции набора данных, которых еще нет в индексе, и привязывает индекс к набору.
+
+        Args:
+            operations: Весь набор данных (список или TransactionTable); первые len(index)
+                операций уже проиндексированы, добавляются только следующие
+
+        Returns:
+            Количество добавленных операций
+
+        Raises:
+            ValueError: Если набор данных не является продолжением проиндексированного
+        """
+        # Индекс, загруженный из файла, сверяется со всеми строками, иначе - с последней
+        matches = self._matches_rows(operations) if self._digest is None else self._matches_last_row(operations)
+        if not matches:
+            raise ValueError("Набор данных не является продолжением проиндексированного")
+        start = self._size
+        digest: Any = self._digest
+        postings = self._postings
+        cache: Dict[str, List[str]] = {}
+        position = self._size
+        row = None
+        for row in _iter_rows(operations, self._fields, start):
+            _update_rows_hash(digest, row)
+            text = " ".join(row)
+            words = cache.get(text)
+            if words is None:
+                if len(cache) >= TOKEN_CACHE_SIZE:
+                    cache.clear()
+                # Слово встречается в списке вхождений строки один раз
+                words = cache[text] = list(dict.fromkeys(tokenize(text)))
+            for word in words:
+                posting = postings.get(word)
+                if posting is None:
+                    posting = postings[word] = array(POSITION_TYPECODE)
+                    self._words = None
+                posting.append(position)
+            position += 1
+
+        added = position - self._size
+        self._size = position
+        if row is not None:
+            self._last_row = row
+            self._rows_hash = digest.hexdigest()
+        self._operations = operations
+        logger.debug(f"В индекс добавлено {added} операций, всего {self._size}, слов {len(postings)}")
+        return added
+
+    def _posting(self, word: str) -> np.ndarray:
+        """Позиции операций со словом."""
+        posting = self._postings.get(word)
+        return _EMPTY if posting is None else np.frombuffer(posting, dtype=np.int64)
+
+    def _prefix_posting(self, prefix: str) -> np.ndarray:
+        """Позиции операций со словами, начинающимися с prefix."""
+        words = self.words
+        start = bisect_left(words, prefix)
+        end = bisect_left(words, prefix + "\U0010ffff", start)
+        if end - start == 1:
+            return self._posting(words[start])
+        if end == start:
+            return _EMPTY
+        # Буферы array склеиваются одним вызовом, без создания массива NumPy для каждого слова
+        postings = self._postings
+        positions = np.frombuffer(b"".join([postings[word] for word in words[start:end]]), dtype=np.int64)
+        if len(positions) * UNION_BITMAP_RATIO < self._size:
+            return np.unique(positions)
+        # Короткое начало слова охватывает большую часть операций: объединение через битовую маску без сортировки
+        mask = np.zeros(self._size, dtype=bool)
+        mask[positions] = True
+        return np.flatnonzero(mask)
+
+    def positions(self, query: str, prefix: bool = True) -> np.ndarray:
+        """
+        Находит операции, содержащие все слова запроса.
+
+        Args:
+            query: Поисковый запрос (одно или несколько слов)
+            prefix: Если True - последнее слово запроса ищется как начало слова
+
+        Returns:
+            Позиции найденных операций по возрастанию
+        """
+        words = tokenize(query)
+        if not words:
+            return _EMPTY
+
+        postings = [self._posting(word) for word in words[:-1]]
+        postings.append(self._prefix_posting(words[-1]) if prefix else self._posting(words[-1]))
+        # Пересечение начинается с самого короткого списка
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not len(result):
+                break
+            result = intersect_positions(result, posting)
+        # Копия не удерживает буферы списков вхождений, которые растут при добавлении операций
+        return np.array(result, dtype=np.intp)
+
+    def filter(
+        self, operations: Union[Sequence[Dict[str, Any]], TransactionTable], query: str, prefix: bool = True
+    ) -> Union[List[Dict[str, Any]], TransactionTable]:
+        """
+        Возвращает операции, содержащие все слова запроса, в исходном порядке.
+
+        Args:
+            operations: Набор данных, по которому построен индекс (список или TransactionTable)
+            query: Поисковый запрос
+            prefix: Если True - последнее слово запроса ищется как начало слова
+
+        Returns:
+            Найденные операции (для TransactionTable - таблица)
+
+        Raises:
+            ValueError: Если индекс построен для другого набора данных
+        """
+        if not self.covers(operations):
+            raise ValueError("Индекс WordIndex построен для другого набора данных")
+        positions = self.positions(query, prefix)
+        logger.info(f"Найдено {len(positions)} операций по словам '{query}'")
+        if isinstance(operations, TransactionTable):
+            return operations.take(positions)
+        return [operations[position] for position in positions.tolist()]
+
+    def _header(self) -> Dict[str, Any]:
+        return {"version": WORD_INDEX_VERSION, "fields": list(self._fields)}
+
+    def _segment(self, start: int) -> Tuple[Dict[str, Any], Arrays]:
+        """
+        Часть индекса с вхождениями операций, начиная с позиции start.
+
+        Слова хранятся в заголовке, а их списки вхождений - одним массивом
+        позиций и массивом длин списков.
+        """
+        words = []
+        parts = []
+        for word, posting in self._postings.items():
+            if posting[-1] >= start:
+                words.append(word)
+                parts.append(np.frombuffer(posting, dtype=np.int64)[bisect_left(posting, start):])
+        positions = np.concatenate(parts) if parts else _EMPTY
+        counts = np.array([len(part) for part in parts], dtype=np.int64)
+        header = {"size": self._size, "last_row": self._last_row, "rows_hash": self._rows_hash, "words": words}
+        return header, {"positions": positions, "counts": counts}
+
+    def save(self, path: str) -> None:
+        """
+        Сохраняет индекс в файл.
+
+        Если индекс был загружен из этого файла или уже сохранялся в него,
+        в файл дописываются только вхождения, добавленные после этого;
+        иначе файл записывается целиком (атомарно). Ошибки записи не
+        прерывают работу.
+
+        Args:
+            path: Путь к файлу индекса
+        """
+        try:
+            if self._path == path and os.path.exists(path):
+                if self._size > self._saved_size:
+                    with open(path, "ab") as file:
+                        write_record(file, *self._segment(self._saved_size))
+            else:
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as file:
+                    write_record(file, self._header())
+                    write_record(file, *self._segment(0))
+                os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Не удалось записать индекс {path}: {e}")
+            return
+        self._saved_size = self._size
+        self._path = path
+        logger.debug(f"Индекс записан: {path}, операций {self._size}")
+
+    @classmethod
+    def load(cls, path: str, fields: Iterable[str] = DEFAULT_FIELDS) -> Optional["WordIndex"]:
+        """
+        Загружает индекс из файла, объединяя сохраненные части.
+
+        Файл читается без pickle, поэтому подложенный рядом с данными файл
+        не может выполнить код.
+
+        Args:
+            path: Путь к файлу индекса
+            fields: Ожидаемые индексируемые поля
+
+        Returns:
+            Индекс или None, если файла нет, он поврежден или построен для других полей
+        """
+        index = cls(fields)
+        try:
+            with open(path, "rb") as file:
+                records = read_records(file)
+                header, _ = next(records, ({}, {}))
+                if header != index._header():
+                    logger.info(f"Индекс {path} построен с другими настройками")
+                    return None
+                postings = index._postings
+                for segment, arrays in records:
+                    positions = arrays["positions"].astype(np.int64, copy=False)
+                    ends = np.cumsum(arrays["counts"]).tolist()
+                    if len(ends) != len(segment["words"]) or (ends and ends[-1] != len(positions)):
+                        raise ValueError("Списки вхождений не соответствуют словам")
+                    for word, start, end in zip(segment["words"], [0] + ends, ends):
+                        posting = postings.get(word)
+                        if posting is None:
+                            posting = postings[word] = array(POSITION_TYPECODE)
+                        posting.frombytes(positions[start:end].tobytes())
+                    index._size = segment["size"]
+                    index._last_row = tuple(segment["last_row"]) if segment["last_row"] is not None else None
+                    index._rows_hash = segment["rows_hash"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать индекс {path}: {e}")
+            return None
+
+        index._saved_size = index._size
+        index._path = path
+        index._digest = None
+        return index
+
+
+def open_word_index(
+    file_path: str,
+    operations: Union[Sequence[Dict[str, Any]], TransactionTable],
+    fields: Iterable[str] = DEFAULT_FIELDS,
+    persist: bool = True,
+) -> WordIndex:
+    """
+    Возвращает индекс слов для набора данных из файла, используя сохраненный индекс.
+
+    Индекс хранится рядом с файлом (<файл>.words.dat). Если набор данных
+    с момента сохранения только дополнялся, в индекс добавляются новые
+    операции, а в файл дописывается только их часть. Если набор данных
+    стал короче или изменилась любая проиндексированная операция (индекс
+    хранит хэш индексируемых полей всех строк), индекс строится заново.
+
+    Args:
+        file_path: Путь к файлу с набором данных
+        operations: Операции этого файла (список или TransactionTable) в порядке файла
+        fields: Индексируемые поля
+        persist: Сохранять ли индекс на диск
+
+    Returns:
+        Индекс, покрывающий все операции
+    """
+    path = index_path_for(file_path)
+    index = WordIndex.load(path, fields) if persist else None
+    if index is not None and not index._matches_rows(operations):
+        logger.info(f"Набор данных {file_path} изменен не дописыванием, индекс строится заново")
+        index = None
+    if index is None:
+        index = WordIndex(fields)
+
+    added = index.add(operations)
+    logger.info(f"Индекс слов {file_path}: {len(index)} операций, добавлено {added}")
+    if persist and (added or index._path != path):
+        index.save(path)
+    return index
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.batch_reader import find_statement_files, read_statements
+from src.transaction_table import TransactionTable
+
+
+class TestBatchReader:
+    """Тесты для модуля batch_reader.py"""
+
+    @pytest.fixture
+    def statements_dir(self, tmp_path):
+        with open("data/operations.json", encoding="utf-8") as file:
+            operations = json.load(file)
+        (tmp_path / "a_operations.json").write_text(json.dumps(operations, ensure_ascii=False), encoding="utf-8")
+        (tmp_path / "b_transactions.csv").write_text(
+            "id;state;date;amount;currency_name;currency_code;description\n"
+            "1;executed;2023-01-01T10:00:00;100.5;USD;USD;Перевод\n"
+            "2;canceled;2023-01-02T10:00:00;200;руб.;RUB;Оплата\n",
+            encoding="utf-8",
+        )
+        pd.DataFrame({"id": [3], "state": ["PENDING"], "amount": [50.0]}).to_excel(
+            tmp_path / "c_transactions.xlsx", index=False
+        )
+        (tmp_path / "d_broken.json").write_text("[{broken", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("не выписка", encoding="utf-8")
+        return tmp_path
+
+    def test_find_statement_files_directory(self, statements_dir):
+        """В папке берутся только файлы поддерживаемых форматов"""
+        names = [os.path.basename(path) for path in find_statement_files(str(statements_dir))]
+        assert names == ["a_operations.json", "b_transactions.csv", "c_transactions.xlsx", "d_broken.json"]
+
+    def test_read_statements_compressed(self, statements_dir):
+        """Сжатые выписки находятся в папке и читаются без распаковки на диск"""
+        content = (statements_dir / "b_transactions.csv").read_bytes()
+        (statements_dir / "e_archive.csv.gz").write_bytes(gzip.compress(content))
+        paths = find_statement_files(str(statements_dir))
+        assert os.path.basename(paths[-1]) == "e_archive.csv.gz"
+        transactions, errors = read_statements(paths[-1:])
+        assert [t["id"] for t in transactions] == [1, 2]
+        assert errors == {}
+
+    def test_find_statement_files_glob(self, statements_dir):
+        """Поиск по шаблону glob"""
+        paths = find_statement_files(str(statements_dir / "*.csv"))
+        assert [os.path.basename(path) for path in paths] == ["b_transactions.csv"]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_read_statements_merges_in_order(self, statements_dir, max_workers):
+        """Транзакции объединяются в порядке файлов, ошибки собираются по файлам"""
+        transactions, errors = read_statements(str(statements_dir), max_workers=max_workers)
+        assert len(transactions) == 13
+        assert [t["id"] for t in transactions[10:]] == [1, 2, 3]
+        assert list(errors) == [str(statements_dir / "d_broken.json")]
+
+    def test_read_statements_as_table(self, statements_dir):
+        """Объединение в колоночную таблицу"""
+        table, errors = read_statements(str(statements_dir), max_workers=2, as_table=True)
+        assert isinstance(table, TransactionTable)
+        assert len(table) == 13
+        assert str(table.frame["state"].dtype) == "category"
+        assert len(table.filter_by_state("PENDING")) == 1
+        assert len(errors) == 1
+
+    def test_read_statements_explicit_list(self, statements_dir):
+        """Список путей, включая неподдерживаемый и отсутствующий файлы"""
+        paths = [str(statements_dir / "notes.txt"), str(statements_dir / "missing.csv")]
+        transactions, errors = read_statements(paths)
+        assert transactions == []
+        assert set(errors) == set(paths)
+
+    def test_read_statements_empty_statements(self, tmp_path):
+        """Пустые выписки читаются без ошибок, неразбираемые файлы - ошибки"""
+        (tmp_path / "a_empty.json").write_text("[]", encoding="utf-8")
+        (tmp_path / "b_header.csv").write_text("id;state;date;amount;currency_name;currency_code\n", encoding="utf-8")
+        (tmp_path / "c_blank.csv").write_text("", encoding="utf-8")
+        pd.DataFrame({"id": [], "state": []}).to_excel(tmp_path / "d_empty.xlsx", index=False)
+        (tmp_path / "e_object.json").write_text('{"id": 1}', encoding="utf-8")
+        (tmp_path / "f_broken.json").write_text("[{broken", encoding="utf-8")
+        (tmp_path / "g_garbage.xlsx").write_bytes(b"PK\x03\x04 not a workbook")
+        transactions, errors = read_statements(str(tmp_path), max_workers=1)
+        assert transactions == []
+        assert sorted(map(os.path.basename, errors)) == ["e_object.json", "f_broken.json", "g_garbage.xlsx"]
+
+        paths = [str(tmp_path / "a_empty.json"), str(tmp_path / "b_header.csv")]
+        table, errors = read_statements(paths, as_table=True)
+        assert len(table) == 0
+        assert errors == {}
+
+    def test_read_statements_empty_directory(self, tmp_path):
+        """Пустая папка"""
+        assert read_statements(str(tmp_path)) == ([], {})
+        table, errors = read_statements(str(tmp_path), as_table=True)
+        assert len(table) == 0
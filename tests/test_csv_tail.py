@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from src.csv_tail import CsvTail, tail_path_for
+from src.file_reader import read_csv_file
+from src.processing import filter_by_state, sort_by_date
+from src.transaction_table import TransactionTable
+
+HEADER = "id;state;date;amount;currency_name;currency_code;description\n"
+
+
+def make_rows(start, count):
+    states = ["executed", "canceled", "pending"]
+    return "".join(
+        f"{i};{states[i % 3]};2023-01-{i % 28 + 1:02d}T10:00:00;{i}.5;руб.;RUB;Перевод {i}\n"
+        for i in range(start, start + count)
+    )
+
+
+class TestCsvTail:
+    """Тесты для модуля csv_tail.py"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / "feed.csv"
+        path.write_text(HEADER + make_rows(1, 10), encoding="utf-8")
+        return str(path)
+
+    def append(self, path, text):
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_refresh_reads_only_appended_rows(self, csv_path):
+        """Повторное обновление разбирает только дописанные строки"""
+        tail = CsvTail(csv_path, persist=False)
+        assert len(tail.refresh()) == 10
+
+        self.append(csv_path, make_rows(11, 3))
+        delta = tail.refresh()
+        assert [op["id"] for op in delta] == [11, 12, 13]
+        assert len(tail.refresh()) == 0
+        assert tail.checkpoint["offset"] == os.path.getsize(csv_path)
+        assert tail.checkpoint["last_id"] == 13
+        assert tail.table.to_records() == TransactionTable.from_records(read_csv_file(csv_path)).to_records()
+
+    def test_incomplete_line_is_kept_for_next_refresh(self, csv_path):
+        """Недописанная строка читается после того, как она дописана полностью"""
+        tail = CsvTail(csv_path, persist=False)
+        tail.refresh()
+        row = make_rows(11, 1)
+        self.append(csv_path, row[:10])
+        assert len(tail.refresh()) == 0
+        self.append(csv_path, row[10:])
+        assert [op["id"] for op in tail.refresh()] == [11]
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_merge_into_filtered_sorted_result(self, csv_path, reverse):
+        """Новые транзакции вливаются в отфильтрованный и отсортированный результат"""
+        tail = CsvTail(csv_path, state="executed", reverse=reverse, persist=False)
+        tail.refresh()
+        self.append(csv_path, make_rows(11, 40))
+        tail.refresh()
+
+        expected = sort_by_date(filter_by_state(read_csv_file(csv_path), "EXECUTED"), reverse)
+        assert [op["id"] for op in tail.table] == [op["id"] for op in expected]
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_in_order_rows_are_not_merged(self, csv_path, reverse, monkeypatch):
+        """Новые строки с более поздними датами не копируют и не сортируют весь результат при обновлении"""
+        tail = CsvTail(csv_path, state="executed", reverse=reverse, persist=False)
+        tail.refresh()
+        concat = TransactionTable.concat
+        calls = []
+        monkeypatch.setattr(TransactionTable, "concat", lambda tables: calls.append(len(tables)) or concat(tables))
+        for start in (11, 14, 17):
+            self.append(csv_path, make_rows(start, 3))
+            tail.refresh()
+        assert calls == []
+
+        expected = sort_by_date(filter_by_state(read_csv_file(csv_path), "EXECUTED"), reverse)
+        assert [op["id"] for op in tail.table] == [op["id"] for op in expected]
+        assert tail.table.sorted_reverse is reverse
+        assert len(calls) == 1
+
+        # Строки с более ранними датами сливаются с прочитанными
+        self.append(csv_path, make_rows(30, 6))
+        tail.refresh()
+        expected = sort_by_date(filter_by_state(read_csv_file(csv_path), "EXECUTED"), reverse)
+        assert [op["id"] for op in tail.table] == [op["id"] for op in expected]
+
+    def test_checkpoint_persists_between_runs(self, csv_path):
+        """Повторный запуск продолжает с сохраненной контрольной точки"""
+        CsvTail(csv_path, state="EXECUTED", reverse=True).refresh()
+        assert os.path.exists(tail_path_for(csv_path))
+        self.append(csv_path, make_rows(11, 6))
+
+        tail = CsvTail(csv_path, state="EXECUTED", reverse=True)
+        assert len(tail.table) == 3
+        assert [op["id"] for op in tail.refresh()] == [15, 12]
+
+        expected = sort_by_date(filter_by_state(read_csv_file(csv_path), "EXECUTED"), True)
+        assert [op["id"] for op in CsvTail(csv_path, state="EXECUTED", reverse=True).table] == [
+            op["id"] for op in expected
+        ]
+
+    def test_rewritten_file_is_read_again(self, csv_path):
+        """Если файл перезаписан, он читается заново"""
+        tail = CsvTail(csv_path)
+        tail.refresh()
+        with open(csv_path, "w", encoding="utf-8") as file:
+            file.write(HEADER + make_rows(100, 12))
+
+        assert [op["id"] for op in CsvTail(csv_path).refresh()][:2] == [100, 101]
+        assert len(tail.refresh()) == 12
+        assert len(tail.table) == 12
+
+    def test_follow_yields_new_transactions(self, csv_path):
+        """Режим follow отдает новые транзакции"""
+        tail = CsvTail(csv_path, persist=False)
+        follower = tail.follow(interval=0)
+        assert len(next(follower)) == 10
+        self.append(csv_path, make_rows(11, 2))
+        assert [op["id"] for op in next(follower)] == [11, 12]
+
+    def test_file_not_found(self, tmp_path):
+        """Несуществующий файл"""
+        tail = CsvTail(str(tmp_path / "missing.csv"))
+        assert len(tail.refresh()) == 0
+        assert tail.checkpoint is None
@@ -0,0 +1,84 @@
+import json
+import os
+from datetime import date, datetime
+
+import pytest
+
+from src import external_sort
+from src.external_sort import external_sort_by_date
+from src.processing import sort_by_date
+from src.transaction import to_transactions
+from src.widget import display_transactions
+
+
+class TestExternalSort:
+    """Тесты для модуля external_sort.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            operations = [operation for operation in json.load(file) if operation]
+        # Равные даты проверяют устойчивость сортировки
+        return operations + [dict(operation, id=i) for i, operation in enumerate(operations[:10])]
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    @pytest.mark.parametrize("memory_budget", [1, 4096, 2**30])
+    def test_matches_sort_by_date(self, operations, reverse, memory_budget, tmp_path):
+        """Порядок совпадает с sort_by_date при любом бюджете памяти"""
+        result = list(external_sort_by_date(iter(operations), reverse, memory_budget, str(tmp_path)))
+        assert result == sort_by_date(operations, reverse)
+        # Временные файлы удаляются после выдачи всех операций
+        assert os.listdir(tmp_path) == []
+
+    def test_multi_pass_merge(self, operations, tmp_path, monkeypatch):
+        """Серий больше, чем сливается за один проход"""
+        monkeypatch.setattr(external_sort, "MERGE_FAN_IN", 3)
+        result = list(external_sort_by_date(operations, True, 2000, str(tmp_path)))
+        assert result == sort_by_date(operations, True)
+
+    def test_transactions(self, operations):
+        """Записи Transaction сортируются по разобранной дате"""
+        transactions = list(to_transactions(operations))
+        result = list(external_sort_by_date(transactions, memory_budget=4096))
+        assert [transaction.to_dict() for transaction in result] == sort_by_date(operations)
+
+    def test_excel_values_without_pickle(self, tmp_path, monkeypatch):
+        """Даты и пропуски значений Excel сохраняются в сериях JSON, а не pickle"""
+        operations = [
+            {"id": i, "date": datetime(2019, 8, 26 - i % 5, 10), "day": date(2019, 8, 1), "amount": float("nan")}
+            for i in range(20)
+        ]
+        runs = []
+        write_run = external_sort._write_run
+
+        def spy(entries, directory, number):
+            path = write_run(entries, directory, number)
+            with open(path, "rb") as file:
+                runs.append(file.read())
+            return path
+
+        monkeypatch.setattr(external_sort, "_write_run", spy)
+        result = list(external_sort_by_date(operations, True, 256, str(tmp_path)))
+        expected = sorted(operations, key=lambda op: op["date"], reverse=True)
+        assert [op["id"] for op in result] == [op["id"] for op in expected]
+        assert result[0]["date"] == datetime(2019, 8, 26, 10) and result[0]["day"] == date(2019, 8, 1)
+        # Серии содержат JSON операций
+        assert b'{"id": 0, "date": {"$datetime": "2019-08-26T10:00:00"}' in b"".join(runs)
+
+        with pytest.raises(TypeError):
+            list(external_sort_by_date([{"date": "2019-08-26", "value": object()}]))
+
+    def test_invalid_budget(self):
+        """Бюджет памяти должен быть положительным"""
+        with pytest.raises(ValueError):
+            list(external_sort_by_date([], memory_budget=0))
+
+    def test_display_stream(self, operations, capsys):
+        """display_transactions выводит отсортированный поток"""
+        display_transactions(external_sort_by_date(operations, memory_budget=4096), limit=5)
+        output = capsys.readouterr().out
+        assert output.count("Сумма:") == 5
+        assert "Выведено банковских операций: 5" in output
+
+        display_transactions(iter([]))
+        assert "Не найдено транзакций" in capsys.readouterr().out
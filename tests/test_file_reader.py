@@ -1,10 +1,32 @@
+import bz2
+import gzip
+import json
+import lzma
 import os
 import tempfile
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
+import pytest
 
-from src.file_reader import detect_file_type_and_read, read_csv_file, read_excel_file
+from src.file_reader import (
+    apply_transaction_dtypes,
+    detect_compression,
+    detect_file_type,
+    detect_file_type_and_iter,
+    detect_file_type_and_read,
+    iter_csv_chunks,
+    iter_csv_file,
+    iter_excel_file,
+    iter_json_file,
+    read_csv_file,
+    read_csv_frame,
+    read_excel_file,
+    sniff_csv_dialect,
+    transaction_dtypes,
+)
+from src.generators import filter_by_currency
+from src.processing import filter_by_state
 
 
 class TestFileReader:
@@ -137,3 +159,358 @@ class TestFileReader:
         """Тестирование определения неподдерживаемого типа файла"""
         result = detect_file_type_and_read("test.txt")
         assert result == []
+
+
+class TestStreamingJsonReader:
+    """Тесты для потокового чтения JSON"""
+
+    @pytest.fixture
+    def json_path(self, tmp_path):
+        data = json.load(open("data/operations.json", encoding="utf-8"))
+        path = tmp_path / "operations.json"
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        return str(path), data
+
+    @pytest.mark.parametrize("buffer_size", [1, 7, 64, 65536])
+    def test_iter_json_file_matches_json_load(self, json_path, buffer_size):
+        """Потоковое чтение дает тот же результат при любом размере блока"""
+        path, data = json_path
+        assert list(iter_json_file(path, buffer_size=buffer_size)) == data
+
+    def test_iter_json_file_numbers_on_block_boundary(self, tmp_path):
+        """Числа, разрезанные границей блока, читаются целиком"""
+        path = tmp_path / "numbers.json"
+        path.write_text("[12345, 678901, {\"id\": 1}]", encoding="utf-8")
+        for buffer_size in range(1, 10):
+            assert list(iter_json_file(str(path), buffer_size=buffer_size)) == [12345, 678901, {"id": 1}]
+
+    @pytest.mark.parametrize("buffer_size", range(1, 40))
+    def test_iter_json_file_scalars_on_block_boundary(self, tmp_path, buffer_size):
+        """Начало числа, похожее на более короткое число ("0.", "-2.5e"), дочитывается до разделителя"""
+        data = [0.1, 22, -2.5e-3, 1e10, 0, True, None, "3.5", {"amount": 0.75}, -0.0, 7]
+        path = tmp_path / "scalars.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        assert list(iter_json_file(str(path), buffer_size=buffer_size)) == data
+
+        path.write_text("[0.1, 22]", encoding="utf-8")
+        assert list(iter_json_file(str(path), buffer_size=buffer_size)) == [0.1, 22]
+
+    def test_iter_json_file_is_lazy(self, json_path):
+        """Первая транзакция доступна до разбора всего файла"""
+        path, data = json_path
+        with patch("src.file_reader.json.JSONDecoder.raw_decode", wraps=json.JSONDecoder().raw_decode) as decode:
+            first = next(iter_json_file(path, buffer_size=256))
+        assert first == data[0]
+        assert decode.call_count < len(data)
+
+    @pytest.mark.parametrize("content", ["", "{\"id\": 1}", "[{\"id\": 1},", "[{\"id\": 1} {\"id\": 2}]"])
+    def test_iter_json_file_invalid(self, tmp_path, content):
+        """Некорректный или не-списочный JSON не приводит к исключению"""
+        path = tmp_path / "bad.json"
+        path.write_text(content, encoding="utf-8")
+        assert len(list(iter_json_file(str(path)))) <= 1
+
+    def test_iter_json_file_empty_list(self, tmp_path):
+        """Пустой массив"""
+        path = tmp_path / "empty.json"
+        path.write_text(" [ ] ", encoding="utf-8")
+        assert list(iter_json_file(str(path))) == []
+
+    def test_iter_json_file_not_found(self):
+        """Несуществующий файл"""
+        assert list(iter_json_file("nonexistent.json")) == []
+
+    def test_detect_file_type_and_iter_with_filters(self, json_path):
+        """Фильтры принимают поток транзакций напрямую"""
+        path, data = json_path
+        executed = filter_by_state(detect_file_type_and_iter(path), "EXECUTED")
+        assert executed == filter_by_state(data, "EXECUTED")
+        rub = list(filter_by_currency(detect_file_type_and_iter(path), "RUB"))
+        assert rub == list(filter_by_currency(data, "RUB"))
+
+    def test_detect_file_type_and_iter_unsupported(self):
+        """Неподдерживаемый формат"""
+        assert list(detect_file_type_and_iter("test.txt")) == []
+
+
+class TestChunkedCsvReader:
+    """Тесты для блочного чтения CSV"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        rows = ["id;State;date;amount;currency_code;description"]
+        states = ["executed", "CANCELED", "pending"]
+        for i in range(1, 11):
+            rows.append(f"{i};{states[i % 3]};2023-01-{i:02d}T10:00:00;{i * 10}.5;RUB;Перевод {i}")
+        path = tmp_path / "transactions.csv"
+        path.write_text("\n".join(rows), encoding="utf-8")
+        return str(path)
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 10, 100])
+    def test_iter_csv_file_matches_read_csv_file(self, csv_path, chunk_size):
+        """Блочное чтение дает те же транзакции, что и полное"""
+        assert list(iter_csv_file(csv_path, chunk_size=chunk_size)) == read_csv_file(csv_path)
+
+    def test_iter_csv_chunks_sizes(self, csv_path):
+        """Размер блоков ограничен chunk_size"""
+        batches = list(iter_csv_chunks(csv_path, chunk_size=4))
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert batches[0][2]["state"] == "EXECUTED"
+        assert batches[0][0]["id"] == 1
+
+    def test_iter_csv_chunks_invalid_size(self, csv_path):
+        """Некорректный размер блока"""
+        with pytest.raises(ValueError):
+            next(iter_csv_chunks(csv_path, chunk_size=0))
+
+    def test_iter_csv_file_not_found(self):
+        """Несуществующий файл"""
+        assert list(iter_csv_file("nonexistent.csv")) == []
+
+    def test_detect_file_type_and_iter_csv(self, csv_path):
+        """Потоковое чтение CSV через detect_file_type_and_iter"""
+        assert len(filter_by_state(detect_file_type_and_iter(csv_path), "PENDING")) == 3
+
+
+class TestColumnNormalization:
+    """Тесты для нормализации колонок в CSV/Excel-ридерах"""
+
+    def test_status_alias_resolved_once(self, tmp_path):
+        """Статус берется из первой непустой колонки со status в названии"""
+        path = tmp_path / "status.csv"
+        path.write_text(
+            " ID ;Operation_Status;Status;description\n1;executed;;A\n2;;canceled;B\n3;;;C\n", encoding="utf-8"
+        )
+        result = read_csv_file(str(path))
+        assert [t["state"] for t in result] == ["EXECUTED", "CANCELED", None]
+        assert result[0]["id"] == 1
+        assert result[2]["operation_status"] is None
+
+    def test_missing_values_become_none(self, tmp_path):
+        """Пропуски заменяются на None"""
+        path = tmp_path / "missing.csv"
+        path.write_text("id;state;amount\n1;pending;\n2;;10.5\n", encoding="utf-8")
+        result = read_csv_file(str(path))
+        assert result == [
+            {"id": 1, "state": "PENDING", "amount": None},
+            {"id": 2, "state": None, "amount": 10.5},
+        ]
+
+    def test_excel_uses_same_normalization(self, tmp_path):
+        """Excel-ридер нормализует колонки так же, как CSV-ридер"""
+        path = tmp_path / "status.xlsx"
+        pd.DataFrame({"Id": [1, 2], "STATUS": ["executed", "Pending"]}).to_excel(path, index=False)
+        result = read_excel_file(str(path))
+        assert result == [
+            {"id": 1, "status": "executed", "state": "EXECUTED"},
+            {"id": 2, "status": "Pending", "state": "PENDING"},
+        ]
+
+
+class TestStreamingExcelReader:
+    """Тесты для потокового чтения XLSX"""
+
+    @pytest.fixture
+    def xlsx_path(self, tmp_path):
+        path = tmp_path / "transactions.xlsx"
+        first = pd.DataFrame(
+            {
+                "ID": [1, 2, 3],
+                "State": ["executed", None, "Pending"],
+                "amount": [100.5, 200.0, None],
+                "description": ["Перевод", "Оплата", "Вклад"],
+            }
+        )
+        second = pd.DataFrame({"id": [4], "status": ["canceled"], "amount": [10.0], "description": ["Возврат"]})
+        with pd.ExcelWriter(path) as writer:
+            first.to_excel(writer, sheet_name="Январь", index=False)
+            second.to_excel(writer, sheet_name="Февраль", index=False)
+        return str(path)
+
+    def test_iter_excel_file_matches_read_excel_file(self, xlsx_path):
+        """Потоковое чтение дает тот же результат, что и pandas"""
+        assert list(iter_excel_file(xlsx_path)) == read_excel_file(xlsx_path)
+
+    def test_iter_excel_file_sheet_by_name(self, xlsx_path):
+        """Лист можно выбрать по названию, статус берется из колонки status"""
+        result = list(iter_excel_file(xlsx_path, sheet_name="Февраль"))
+        assert result == [{"id": 4, "status": "canceled", "amount": 10, "description": "Возврат", "state": "CANCELED"}]
+
+    def test_iter_excel_file_all_sheets(self, xlsx_path):
+        """sheet_name=None читает все листы по очереди"""
+        result = list(iter_excel_file(xlsx_path, sheet_name=None))
+        assert [t["id"] for t in result] == [1, 2, 3, 4]
+        assert [t["state"] for t in result] == ["EXECUTED", None, "PENDING", "CANCELED"]
+
+    def test_iter_excel_file_invalid_sheet(self, xlsx_path):
+        """Несуществующий лист"""
+        assert list(iter_excel_file(xlsx_path, sheet_name="Март")) == []
+
+    def test_iter_excel_file_not_found(self):
+        """Несуществующий файл"""
+        assert list(iter_excel_file("nonexistent.xlsx")) == []
+
+    def test_detect_file_type_and_iter_xlsx(self, xlsx_path):
+        """detect_file_type_and_iter читает XLSX потоково"""
+        with patch("src.file_reader.pd.read_excel") as mock_read_excel:
+            assert len(list(detect_file_type_and_iter(xlsx_path))) == 3
+            mock_read_excel.assert_not_called()
+
+
+class TestTransactionSchema:
+    """Тесты для схемы типов транзакции"""
+
+    def test_transaction_dtypes(self):
+        """Категориальные колонки определяются без учета регистра"""
+        assert transaction_dtypes(["ID", " State", "currency_code", "from", "Description"]) == {
+            " State": "category",
+            "currency_code": "category",
+            "Description": "category",
+        }
+
+    def test_apply_transaction_dtypes(self):
+        """Числовые колонки приводятся к числам, категориальные - к category"""
+        df = pd.DataFrame({"id": ["1", "2"], "amount": ["10.5", None], "currency_code": ["RUB", "RUB"]})
+        result = apply_transaction_dtypes(df)
+        assert str(result["id"].dtype) == "Int64"
+        assert result["amount"].dtype == "float64"
+        assert str(result["currency_code"].dtype) == "category"
+
+    def test_apply_transaction_dtypes_keeps_non_numeric(self):
+        """Колонка с нечисловыми значениями не теряет данные"""
+        df = pd.DataFrame({"id": [1, 2], "amount": ["10.5", "1 000,00"]})
+        result = apply_transaction_dtypes(df)
+        assert result["amount"].tolist() == ["10.5", "1 000,00"]
+
+    def test_read_csv_file_uses_schema(self, tmp_path):
+        """read_csv_file применяет схему при разборе файла"""
+        path = tmp_path / "transactions.csv"
+        path.write_text("id;state;amount;currency_code\n1;executed;10.5;RUB\n2;canceled;;USD\n", encoding="utf-8")
+        with patch("src.file_reader.PYARROW_AVAILABLE", False), patch(
+            "src.file_reader.pd.read_csv", wraps=pd.read_csv
+        ) as mock_read_csv:
+            result = read_csv_file(str(path))
+        assert mock_read_csv.call_args.kwargs["dtype"] == {"state": "category", "currency_code": "category"}
+        assert result == [
+            {"id": 1, "state": "EXECUTED", "amount": 10.5, "currency_code": "RUB"},
+            {"id": 2, "state": "CANCELED", "amount": None, "currency_code": "USD"},
+        ]
+
+
+class TestCsvDialect:
+    """Тесты для определения формата CSV"""
+
+    @pytest.mark.parametrize(
+        "content, encoding, expected",
+        [
+            ("id;state;amount\n1;EXECUTED;100,50\n", "utf-8", {"sep": ";", "encoding": "utf-8"}),
+            ("id,state,description\n1,EXECUTED,Перевод\n", "utf-8", {"sep": ",", "encoding": "utf-8"}),
+            ("id\tstate\n1\tEXECUTED\n", "utf-8", {"sep": "\t", "encoding": "utf-8"}),
+            ("id|state\n1|EXECUTED\n", "utf-8-sig", {"sep": "|", "encoding": "utf-8-sig"}),
+            ("id;описание\n1;Перевод организации\n", "cp1251", {"sep": ";", "encoding": "cp1251"}),
+            ("id\n1\n", "utf-8", {"sep": ";", "encoding": "utf-8"}),
+        ],
+    )
+    def test_sniff_csv_dialect(self, tmp_path, content, encoding, expected):
+        """Разделитель и кодировка определяются по началу файла"""
+        path = tmp_path / "transactions.csv"
+        path.write_bytes(content.encode(encoding))
+        assert sniff_csv_dialect(str(path)) == {**expected, "compression": None}
+
+    def test_read_csv_file_cp1251_comma(self, tmp_path):
+        """Выгрузка в cp1251 с запятой в качестве разделителя"""
+        path = tmp_path / "transactions.csv"
+        path.write_bytes("id,state,description\n1,executed,Перевод\n".encode("cp1251"))
+        assert read_csv_file(str(path)) == [{"id": 1, "state": "EXECUTED", "description": "Перевод"}]
+
+    def test_read_csv_frame_pyarrow_fallback(self, tmp_path):
+        """При ошибке pyarrow файл читается стандартным движком"""
+        path = tmp_path / "transactions.csv"
+        path.write_text("id;state\n1;EXECUTED\n", encoding="utf-8")
+        with patch("src.file_reader.PYARROW_AVAILABLE", True), patch(
+            "src.file_reader._read_csv_pyarrow", side_effect=ImportError("pyarrow")
+        ) as mock_pyarrow:
+            df = read_csv_frame(str(path))
+
+        mock_pyarrow.assert_called_once()
+        assert df["id"].tolist() == [1]
+
+    def test_read_csv_frame_pyarrow_matches_default(self, tmp_path):
+        """Движок pyarrow дает тот же DataFrame, что и стандартный"""
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "transactions.csv"
+        path.write_bytes(
+            "id,state,date,amount,description,from\n"
+            "1,EXECUTED,2023-01-01T10:00:00.123456,10.5,Перевод,Счет 1\n"
+            "2,canceled,2023-01-02T10:00:00,,Вклад,\n".encode("cp1251")
+        )
+        with patch("src.file_reader.PYARROW_AVAILABLE", True):
+            pyarrow_frame = read_csv_frame(str(path))
+        with patch("src.file_reader.PYARROW_AVAILABLE", False):
+            default_frame = read_csv_frame(str(path))
+        pd.testing.assert_frame_equal(pyarrow_frame, default_frame)
+
+
+class TestCompressedInput:
+    """Тесты для чтения сжатых файлов и определения формата по содержимому"""
+
+    COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+    SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            return json.load(file)
+
+    @pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+    def test_json_compressed(self, tmp_path, operations, compression):
+        """Сжатый JSON читается без распаковки на диск"""
+        path = tmp_path / f"operations.json{self.SUFFIXES[compression]}"
+        path.write_bytes(self.COMPRESSORS[compression](json.dumps(operations).encode("utf-8")))
+        assert detect_compression(str(path)) == compression
+        assert detect_file_type_and_read(str(path)) == operations
+        assert list(detect_file_type_and_iter(str(path))) == operations
+
+    @pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+    def test_csv_compressed(self, tmp_path, compression):
+        """Сжатый CSV в cp1251 читается полностью и блоками"""
+        content = "id,state,description\n1,executed,Перевод\n2,canceled,Вклад\n".encode("cp1251")
+        path = tmp_path / f"transactions.csv{self.SUFFIXES[compression]}"
+        path.write_bytes(self.COMPRESSORS[compression](content))
+        expected = [
+            {"id": 1, "state": "EXECUTED", "description": "Перевод"},
+            {"id": 2, "state": "CANCELED", "description": "Вклад"},
+        ]
+        assert detect_file_type_and_read(str(path)) == expected
+        assert list(detect_file_type_and_iter(str(path))) == expected
+
+    def test_xlsx_compressed(self, tmp_path):
+        """Сжатый XLSX читается через pandas и openpyxl"""
+        xlsx_path = tmp_path / "transactions.xlsx"
+        pd.DataFrame({"id": [1, 2], "state": ["executed", "pending"]}).to_excel(xlsx_path, index=False)
+        path = tmp_path / "transactions.xlsx.gz"
+        path.write_bytes(gzip.compress(xlsx_path.read_bytes()))
+        expected = detect_file_type_and_read(str(xlsx_path))
+        assert detect_file_type_and_read(str(path)) == expected
+        assert list(detect_file_type_and_iter(str(path))) == expected
+
+    def test_detect_file_type_by_content(self, tmp_path, operations):
+        """Формат файла без известного расширения определяется по содержимому"""
+        json_path = tmp_path / "statement.gz"
+        json_path.write_bytes(gzip.compress(b"\n  " + json.dumps(operations[:2]).encode("utf-8")))
+        csv_path = tmp_path / "statement.dat"
+        csv_path.write_bytes("\ufeffid;state\n1;EXECUTED\n".encode("utf-8"))
+        xlsx_path = tmp_path / "statement.bin"
+        pd.DataFrame({"id": [1]}).to_excel(xlsx_path, index=False, engine="openpyxl")
+
+        assert detect_file_type(str(json_path)) == "json"
+        assert detect_file_type(str(csv_path)) == "csv"
+        assert detect_file_type(str(xlsx_path)) == "xlsx"
+        assert detect_file_type_and_read(str(json_path)) == operations[:2]
+        assert detect_file_type_and_read(str(csv_path)) == [{"id": 1, "state": "EXECUTED"}]
+
+    def test_detect_file_type_by_extension_without_io(self):
+        """Для известных расширений файл не открывается"""
+        assert detect_file_type("missing.csv") == "csv"
+        assert detect_file_type("missing.json.gz") == "json"
+        assert detect_file_type("missing.dat") is None
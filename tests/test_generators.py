@@ -1,6 +1,20 @@
+import io
+import itertools
+
 import pytest
 
-from src.generators import card_number_generator, filter_by_currency, transaction_descriptions
+from src.generators import (
+    CARD_LINE_WIDTH,
+    card_number_blocks,
+    card_number_generator,
+    filter_by_currency,
+    format_card_numbers,
+    format_luhn_card_numbers,
+    is_luhn_valid,
+    luhn_check_digit,
+    transaction_descriptions,
+    write_card_numbers,
+)
 
 
 class TestGenerators:
@@ -81,6 +95,29 @@ class TestGenerators:
         second_transaction = next(generator)
         assert second_transaction["id"] == 142264268
 
+    def test_filter_by_currency_set(self, sample_transactions):
+        """Фильтрация по набору валют"""
+        result = list(filter_by_currency(sample_transactions, {"RUB", "EUR"}))
+        assert [transaction["id"] for transaction in result] == [873106923]
+        assert len(list(filter_by_currency(sample_transactions, ["USD", "RUB"]))) == 4
+
+    def test_filter_by_currency_exclude(self, sample_transactions):
+        """Все операции, кроме операций в заданных валютах"""
+        result = list(filter_by_currency(sample_transactions + [{"id": 1}], "USD", exclude=True))
+        assert [transaction["id"] for transaction in result] == [873106923, 1]
+        assert list(filter_by_currency(sample_transactions, {"USD", "RUB"}, exclude=True)) == []
+
+    def test_filter_by_currency_flat_records(self):
+        """Плоские записи CSV/Excel с полем currency_code"""
+        records = [{"id": 1, "currency_code": "RUB"}, {"id": 2, "currency_code": "USD"}]
+        assert [record["id"] for record in filter_by_currency(records, "USD")] == [2]
+
+    def test_filter_by_currency_is_lazy(self, sample_transactions):
+        """Фильтрация бесконечного потока отдает операции по мере чтения"""
+        stream = itertools.cycle(sample_transactions)
+        result = filter_by_currency(stream, {"RUB"})
+        assert [next(result)["id"] for _ in range(3)] == [873106923] * 3
+
     # Тесты для transaction_descriptions
     def test_transaction_descriptions(self, sample_transactions):
         """Тестирование генератора описаний транзакций"""
@@ -156,3 +193,81 @@ class TestGenerators:
         """Тестирование генератора со слишком большими значениями"""
         with pytest.raises(ValueError, match="End value exceeds maximum card number"):
             list(card_number_generator(1, 10000000000000000))  # Превышает 16 цифр
+
+    # Тесты для блочного режима генерации номеров карт
+    @pytest.mark.parametrize(
+        "start, count",
+        [(1, 3), (9999, 2), (1, 10000), (123456789, 25000), (9999999999999990, 10), (4000123412349998, 3)],
+    )
+    def test_format_card_numbers(self, start, count):
+        """Блок совпадает с построчным генератором, в том числе на переходах групп цифр"""
+        block = bytes(format_card_numbers(start, count))
+        assert len(block) == count * CARD_LINE_WIDTH
+        assert block.decode("ascii").splitlines() == list(card_number_generator(start, start + count - 1))
+
+    def test_format_card_numbers_into_buffer(self):
+        """Номера записываются в переданный буфер"""
+        buffer = bytearray(5 * CARD_LINE_WIDTH)
+        view = format_card_numbers(42, 3, memoryview(buffer))
+        assert bytes(view) == b"0000 0000 0000 0042\n0000 0000 0000 0043\n0000 0000 0000 0044\n"
+        assert buffer[: 3 * CARD_LINE_WIDTH] == bytes(view)
+        with pytest.raises(ValueError):
+            format_card_numbers(1, 6, buffer)
+
+    def test_card_number_blocks(self):
+        """Диапазон делится на блоки заданного размера"""
+        blocks = [bytes(block) for block in card_number_blocks(1, 25, block_size=10)]
+        assert [len(block) // CARD_LINE_WIDTH for block in blocks] == [10, 10, 5]
+        assert b"".join(blocks).decode().splitlines() == list(card_number_generator(1, 25))
+
+    def test_write_card_numbers(self):
+        """Запись номеров в файл"""
+        file = io.BytesIO()
+        assert write_card_numbers(9999999999999990, 9999999999999999, file, block_size=4) == 10
+        assert file.getvalue().decode().splitlines() == list(card_number_generator(9999999999999990, 9999999999999999))
+
+    @pytest.mark.parametrize("start, end", [(0, 5), (5, 3), (1, 10000000000000000)])
+    def test_card_number_blocks_invalid_range(self, start, end):
+        """Блочный режим проверяет диапазон так же, как генератор"""
+        with pytest.raises(ValueError):
+            list(card_number_blocks(start, end))
+
+    # Тесты для номеров карт с контрольной цифрой Луна
+    @pytest.mark.parametrize(
+        "card_number, valid",
+        [("4111 1111 1111 1111", True), ("4111111111111112", False), (79927398713, True), ("1234abcd", False)],
+    )
+    def test_is_luhn_valid(self, card_number, valid):
+        """Проверка номера по алгоритму Луна"""
+        assert is_luhn_valid(card_number) is valid
+
+    def test_format_luhn_card_numbers(self):
+        """Контрольные цифры блока совпадают с вычисленными по всем цифрам, в том числе на переходах групп"""
+        first_prefix = 400012341239990
+        lines = bytes(format_luhn_card_numbers(first_prefix, 30)).decode().splitlines()
+        expected = [f"{prefix}{luhn_check_digit(prefix)}" for prefix in range(first_prefix, first_prefix + 30)]
+        assert [line.replace(" ", "") for line in lines] == expected
+        assert all(is_luhn_valid(line) for line in lines)
+
+    @pytest.mark.parametrize("start, end", [(1, 500), (99990, 100100), (9999999999998000, 9999999999999999)])
+    def test_luhn_blocks_match_filter(self, start, end):
+        """Блоки в режиме luhn - это все номера диапазона, проходящие проверку Луна"""
+        blocks = card_number_blocks(start, end, block_size=37, luhn=True)
+        result = b"".join(bytes(block) for block in blocks).decode().splitlines()
+        assert result == [number for number in card_number_generator(start, end) if is_luhn_valid(number)]
+
+    def test_luhn_parallel_is_deterministic(self):
+        """Результат пула процессов совпадает с однопроцессным и идет по порядку"""
+        start, end = 4000000000000000, 4000000000199999
+        serial, parallel = io.BytesIO(), io.BytesIO()
+        assert write_card_numbers(start, end, serial, block_size=3000, luhn=True) == 20000
+        assert write_card_numbers(start, end, parallel, block_size=3000, luhn=True, workers=2) == 20000
+        assert parallel.getvalue() == serial.getvalue()
+
+        plain = io.BytesIO()
+        write_card_numbers(1, 10000, plain, block_size=999, workers=2)
+        assert plain.getvalue().decode().splitlines() == list(card_number_generator(1, 10000))
+
+    def test_luhn_empty_range(self):
+        """В диапазоне нет номеров, проходящих проверку"""
+        assert list(card_number_blocks(11, 17, luhn=True)) == []
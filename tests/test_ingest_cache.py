@@ -0,0 +1,89 @@
+import json
+import os
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.ingest_cache import cache_path_for, file_fingerprint, load_transactions
+
+
+class TestIngestCache:
+    """Тесты для модуля ingest_cache.py"""
+
+    @pytest.fixture
+    def json_path(self, tmp_path):
+        with open("data/operations.json", encoding="utf-8") as file:
+            data = json.load(file)
+        path = tmp_path / "operations.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        return str(path)
+
+    def test_cache_created_and_reused(self, json_path):
+        """Повторная загрузка не читает исходный файл"""
+        first = load_transactions(json_path)
+        assert os.path.exists(cache_path_for(json_path))
+
+        with patch("src.ingest_cache.detect_file_type_and_read") as mock_read:
+            second = load_transactions(json_path)
+            mock_read.assert_not_called()
+
+        assert second.to_records() == first.to_records()
+
+    def test_cache_invalidated_on_change(self, json_path):
+        """Кэш сбрасывается при изменении файла"""
+        load_transactions(json_path)
+        with open(json_path, "w", encoding="utf-8") as file:
+            json.dump([{"id": 1, "state": "EXECUTED"}], file)
+
+        table = load_transactions(json_path)
+        assert [op["id"] for op in table] == [1]
+
+    def test_cache_invalidated_on_content_change_with_same_size_and_mtime(self, json_path):
+        """Кэш сбрасывается при изменении содержимого без изменения размера и времени"""
+        load_transactions(json_path)
+        stat = os.stat(json_path)
+        with open(json_path, "r+", encoding="utf-8") as file:
+            content = file.read().replace("EXECUTED", "CANCELED", 1)
+            file.seek(0)
+            file.write(content)
+        os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        table = load_transactions(json_path)
+        assert table.to_records()[0]["state"] == "CANCELED"
+
+    def test_use_cache_false(self, json_path):
+        """Без кэша файл читается заново и кэш не создается"""
+        table = load_transactions(json_path, use_cache=False)
+        assert len(table) == 10
+        assert not os.path.exists(cache_path_for(json_path))
+
+    def test_corrupted_cache(self, json_path):
+        """Поврежденный кэш игнорируется"""
+        with open(cache_path_for(json_path), "wb") as file:
+            file.write(b"not a pickle")
+        assert len(load_transactions(json_path)) == 10
+
+    def test_planted_pickle_not_executed(self, json_path, tmp_path):
+        """Подложенный pickle на месте кэша не выполняется"""
+        marker = tmp_path / "executed"
+
+        class Payload:
+            def __reduce__(self):
+                return Path.touch, (marker,)
+
+        with open(cache_path_for(json_path), "wb") as file:
+            pickle.dump(Payload(), file)
+        assert len(load_transactions(json_path)) == 10
+        assert not marker.exists()
+
+    def test_file_not_found(self, tmp_path):
+        """Несуществующий файл"""
+        assert len(load_transactions(str(tmp_path / "missing.json"))) == 0
+
+    def test_file_fingerprint(self, json_path):
+        """Отпечаток содержит размер, время изменения и хэш"""
+        fingerprint = file_fingerprint(json_path)
+        assert fingerprint["size"] == os.path.getsize(json_path)
+        assert set(fingerprint) == {"size", "mtime_ns", "hash"}
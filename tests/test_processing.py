@@ -2,7 +2,15 @@ from datetime import datetime
 
 import pytest
 
-from src.processing import filter_by_state, sort_by_date
+from src.processing import (
+    StateIndex,
+    filter_by_date_range,
+    filter_by_state,
+    order_key,
+    page_by_date,
+    sort_by_date,
+    top_by_date,
+)
 
 
 class TestProcessing:
@@ -52,3 +60,85 @@ class TestProcessing:
         if len(parsed_dates) > 1:
             for i in range(len(parsed_dates) - 1):
                 assert parsed_dates[i] >= parsed_dates[i + 1]
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_sort_by_date_presorted(self, sample_operations, reverse):
+        """Уже отсортированный список возвращается в том же порядке (новым списком)"""
+        sorted_operations = sort_by_date(sample_operations, reverse)
+        result = sort_by_date(sorted_operations, reverse)
+        assert result == sorted_operations
+        assert result is not sorted_operations
+
+    def test_filter_by_date_range(self, sample_operations):
+        """Выбор операций за период: начало включительно, конец - нет, без даты - не выбираются"""
+        result = filter_by_date_range(sample_operations, "2023-10-02T16:20:18.321987", datetime(2023, 10, 5))
+        assert [op["id"] for op in result] == [2, 3, 4]
+        assert [op["id"] for op in filter_by_date_range(sample_operations, end="2023-10-01")] == [7]
+        with pytest.raises(ValueError):
+            filter_by_date_range(sample_operations, "05.10.2023")
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    @pytest.mark.parametrize("limit", [1, 3, 10])
+    def test_top_by_date(self, sample_operations, reverse, limit):
+        """Первые limit операций совпадают с началом полной сортировки по (дата, id)"""
+        operations = sample_operations + [{"id": 0, "date": "2023-10-03T08:45:12.654321"}]
+        expected = sorted(operations, key=order_key, reverse=reverse)[:limit]
+        assert top_by_date(operations, limit, reverse) == expected
+        assert top_by_date(iter(operations), limit, reverse) == expected
+        with pytest.raises(ValueError):
+            top_by_date(operations, 0)
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_page_by_date(self, sample_operations, reverse):
+        """Страницы по курсору без пропусков и повторов складываются в полную сортировку"""
+        pages, cursor = [], None
+        while True:
+            page, cursor = page_by_date(sample_operations, 2, cursor, reverse)
+            pages.extend(page)
+            if cursor is None:
+                break
+        assert pages == sorted(sample_operations, key=order_key, reverse=reverse)
+
+
+class TestStateIndex:
+    """Тесты для индекса по статусу"""
+
+    @pytest.fixture
+    def operations(self):
+        return [
+            {"id": 1, "state": "EXECUTED"},
+            {"id": 2, "Status": " pending "},
+            {"id": 3, "state": "", "STATUS": "executed"},
+            {"id": 4},
+            {"id": 5, "state": "Canceled"},
+            {"id": 6, "state": ["EXECUTED"]},
+            {"id": 7, "State": "executed"},
+        ]
+
+    @pytest.mark.parametrize("state", ["EXECUTED", "pending", "CANCELED", "UNKNOWN", " executed "])
+    def test_index_matches_scan(self, operations, state):
+        """Фильтрация по индексу совпадает с полным просмотром"""
+        index = StateIndex(operations)
+        assert filter_by_state(operations, state, index=index) == filter_by_state(operations, state)
+
+    def test_index_positions(self, operations):
+        """Индекс хранит позиции операций по нормализованному статусу"""
+        index = StateIndex(operations)
+        assert index.positions("executed") == [0, 2, 6]
+        assert sorted(index.states) == ["CANCELED", "EXECUTED", "PENDING", "['EXECUTED']"]
+
+    def test_index_for_other_list(self, operations):
+        """Индекс, построенный для другого списка, не используется молча"""
+        index = StateIndex(operations)
+        with pytest.raises(ValueError):
+            filter_by_state(list(operations), "EXECUTED", index=index)
+        operations.append({"id": 8, "state": "EXECUTED"})
+        with pytest.raises(ValueError):
+            filter_by_state(operations, "EXECUTED", index=index)
+
+    def test_index_after_sort_in_place(self, operations):
+        """Сортировка списка на месте делает индекс недействительным"""
+        index = StateIndex(operations)
+        operations.sort(key=lambda operation: -operation["id"])
+        with pytest.raises(ValueError):
+            filter_by_state(operations, "EXECUTED", index=index)
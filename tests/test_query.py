@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.generators import filter_by_currency
+from src.processing import filter_by_date_range, filter_by_state, sort_by_date
+from src.query import CURRENCY_COST, SEARCH_COST, Predicate, TransactionQuery, order_predicates
+from src.transaction import to_transactions
+from src.transaction_table import TransactionTable
+from src.utils import process_bank_search
+
+
+class TestTransactionQuery:
+    """Тесты для модуля query.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            return [operation for operation in json.load(file) if operation]
+
+    def chain(self, operations, state, currency, search, reverse, period=(None, None)):
+        """Результат цепочки функций, которую заменяет запрос."""
+        result = filter_by_state(operations, state)
+        if reverse is not None:
+            result = sort_by_date(result, reverse)
+        result = filter_by_date_range(result, *period) if period != (None, None) else result
+        if currency:
+            result = list(filter_by_currency(result, currency))
+        if search:
+            result = process_bank_search(result, search)
+        return result
+
+    @pytest.mark.parametrize(
+        "state, currency, search, reverse",
+        [
+            ("EXECUTED", None, None, None),
+            ("executed", "RUB", None, True),
+            ("EXECUTED", "USD", "перевод", False),
+            ("CANCELED", None, "ОРГАНИЗАЦИИ", True),
+            ("EXECUTED", "EUR", None, None),
+        ],
+    )
+    def test_matches_chain(self, operations, state, currency, search, reverse):
+        """Запрос отбирает те же операции и в том же порядке, что и цепочка функций"""
+        query = TransactionQuery().filter_by_state(state)
+        if currency:
+            query.filter_by_currency(currency)
+        if search:
+            query.search(search)
+        if reverse is not None:
+            query.sort_by_date(reverse)
+
+        expected = self.chain(operations, state, currency, search, reverse)
+        assert query.execute(operations) == expected
+        assert query.execute(iter(operations)) == expected
+        result = query.execute(list(to_transactions(operations)))
+        assert [transaction.to_dict() for transaction in result] == expected
+
+        table = TransactionTable.from_records(operations)
+        assert query.execute(table).to_records() == TransactionTable.from_records(expected).to_records()
+
+    def test_date_range(self, operations):
+        """Фильтр по периоду"""
+        period = ("2018-01-01", "2019-01-01")
+        query = TransactionQuery().filter_by_state().filter_by_date_range(*period).sort_by_date(False)
+        expected = self.chain(operations, "EXECUTED", None, None, False, period)
+        assert expected
+        assert query.execute(operations) == expected
+        table = sort_by_date(TransactionTable.from_records(operations), True)
+        assert query.execute(table).to_records() == TransactionTable.from_records(expected).to_records()
+
+    def test_date_range_local_day(self):
+        """Период в main.py (ДД.ММ.ГГГГ) включает дату со смещением, которая выводится этим днем"""
+        records = [
+            {"id": 1, "state": "EXECUTED", "date": "2019-08-26T01:30:00+03:00"},
+            {"id": 2, "state": "EXECUTED", "date": "2019-08-25T23:30:00"},
+        ]
+        query = TransactionQuery().filter_by_date_range(datetime(2019, 8, 26), datetime(2019, 8, 27))
+        assert [op["id"] for op in query.execute(records)] == [1]
+        assert [op["id"] for op in query.execute(list(to_transactions(records)))] == [1]
+        assert [op["id"] for op in query.execute(TransactionTable.from_records(records))] == [1]
+
+    def test_currency_exclude(self, operations):
+        """Исключение валют в запросе"""
+        query = TransactionQuery().filter_by_state().filter_by_currency({"RUB"}, exclude=True)
+        expected = list(filter_by_currency(filter_by_state(operations, "EXECUTED"), "RUB", exclude=True))
+        assert expected
+        assert query.execute(operations) == expected
+        table = TransactionTable.from_records(operations)
+        assert query.execute(table).to_records() == TransactionTable.from_records(expected).to_records()
+
+    def test_invalid_date(self):
+        """Некорректная граница периода"""
+        with pytest.raises(ValueError):
+            TransactionQuery().filter_by_date_range("не дата")
+
+    def test_no_conditions(self, operations):
+        """Запрос без условий возвращает все операции"""
+        assert TransactionQuery().execute(operations) == operations
+        assert TransactionQuery().execute([]) == []
+
+    def test_order_predicates(self):
+        """Строгая дешевая проверка выполняется раньше, дорогая - последней"""
+        sample = [{"n": n} for n in range(100)]
+        strict = Predicate("strict", CURRENCY_COST, lambda op: op["n"] < 5, None)
+        loose = Predicate("loose", CURRENCY_COST, lambda op: op["n"] < 98, None)
+        costly = Predicate("costly", SEARCH_COST, lambda op: op["n"] < 50, None)
+        ordered = order_predicates([costly, loose, strict], sample)
+        assert [predicate.name for predicate in ordered] == ["strict", "costly", "loose"]
+        assert [predicate.name for predicate in order_predicates([costly, strict], [])] == ["strict", "costly"]
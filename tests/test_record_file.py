@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.record_file import frame_from_arrays, frame_to_arrays, read_records, write_record
+from src.transaction_table import TransactionTable
+
+
+class TestRecordFile:
+    """Тесты для модуля record_file.py"""
+
+    def test_records_round_trip(self):
+        """Записи дописываются друг за другом и читаются по порядку"""
+        file = io.BytesIO()
+        write_record(file, {"version": 1, "fields": ["description"]})
+        write_record(file, {"size": 3}, {"positions": np.arange(3, dtype=np.int64)})
+        file.seek(0)
+        records = list(read_records(file))
+        assert [header for header, _ in records] == [{"version": 1, "fields": ["description"]}, {"size": 3}]
+        assert records[0][1] == {}
+        assert records[1][1]["positions"].tolist() == [0, 1, 2]
+
+    def test_objects_rejected(self):
+        """Массивы объектов Python не записываются и не читаются"""
+        with pytest.raises(ValueError):
+            write_record(io.BytesIO(), {}, {"values": np.array([{"a": 1}], dtype=object)})
+
+        file = io.BytesIO()
+        write_record(file, {}, {"values": np.arange(2)})
+        blob = file.getvalue()
+        buffer = io.BytesIO()
+        np.savez(buffer, header=np.frombuffer(b"{}", dtype=np.uint8), values=np.array([{"a": 1}], dtype=object))
+        planted = io.BytesIO(len(buffer.getvalue()).to_bytes(8, "little") + buffer.getvalue())
+        with pytest.raises(ValueError):
+            list(read_records(planted))
+        with pytest.raises(ValueError):
+            list(read_records(io.BytesIO(blob[:-1])))
+
+    def test_frame_round_trip(self):
+        """Колонки таблицы транзакций восстанавливаются с теми же типами и значениями"""
+        table = TransactionTable.from_records(
+            [
+                {"id": 1, "state": "EXECUTED", "date": "2019-08-26T01:30:00+03:00", "description": "Перевод"},
+                {"id": None, "date": "не дата", "amount": "1.5", "currency_code": "RUB", "to": "Счет 1"},
+            ]
+        )
+        columns, arrays = frame_to_arrays(table.frame)
+        frame = frame_from_arrays(columns, arrays)
+        pd.testing.assert_frame_equal(frame, table.frame.reset_index(drop=True))
+        assert TransactionTable(frame).to_records() == table.to_records()
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, sort_by_date
+from src.transaction import DATE_MISSING, Transaction, parse_amount_cents, parse_date_key, to_transactions
+from src.transaction_table import TransactionTable
+from src.utils import process_bank_search
+from src.widget import display_transactions
+
+
+class TestTransaction:
+    """Тесты для модуля transaction.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            return json.load(file)
+
+    @pytest.fixture
+    def transactions(self, operations):
+        return list(to_transactions(operations))
+
+    @pytest.mark.parametrize(
+        "date, expected",
+        [
+            ("1970-01-01T00:00:00", 0),
+            ("1970-01-01T00:00:01.000002", 1_000_002),
+            ("1970-01-01T03:00:00+03:00", 0),
+            ("1970-01-01T00:00:00Z", 0),
+            ("invalid", DATE_MISSING),
+            (None, DATE_MISSING),
+        ],
+    )
+    def test_parse_date_key(self, date, expected):
+        """Дата переводится в микросекунды от эпохи (UTC)"""
+        assert parse_date_key(date) == expected
+
+    def test_date_key_matches_table(self, operations):
+        """Ключ даты записи совпадает с колонкой даты TransactionTable"""
+        keys = [transaction.date_key for transaction in to_transactions(operations)]
+        assert keys == TransactionTable.from_records(operations).date_keys().tolist()
+
+    def test_to_dict_round_trip(self, operations, transactions):
+        """to_dict восстанавливает исходный словарь"""
+        assert [t.to_dict() for t in transactions] == operations
+
+    def test_slots_and_interning(self, transactions):
+        """Запись не имеет __dict__, повторяющиеся строки хранятся в одном экземпляре"""
+        assert not hasattr(transactions[0], "__dict__")
+        assert transactions[0].state is transactions[1].state
+        assert transactions[0].currency_code is transactions[3].currency_code
+        assert transactions[0].amount_cents == 3195758
+
+    def test_mapping_access(self, transactions):
+        """Запись читается как словарь"""
+        transaction = transactions[0]
+        assert transaction["state"] == "EXECUTED"
+        assert transaction.get("operationAmount")["currency"]["code"] == "RUB"
+        assert "from" in transaction
+        assert "unknown" not in transaction
+        assert transaction.get("unknown", "default") == "default"
+        with pytest.raises(KeyError):
+            transaction["unknown"]
+
+    def test_missing_from(self):
+        """Отсутствующее поле from не попадает в ключи"""
+        transaction = Transaction.from_dict({"id": 1, "state": "EXECUTED", "to": "Счет 1234"})
+        assert "from" not in transaction
+        assert transaction.keys() == ["id", "state", "operationAmount", "to"]
+
+    def test_flat_csv_record(self):
+        """Транзакция в формате CSV"""
+        transaction = Transaction.from_dict(
+            {"id": 5, "status": "pending", "amount": "100,5", "currency_code": "USD", "currency_name": "USD"}
+        )
+        assert transaction.state == "PENDING"
+        assert transaction.amount == "100.50"
+
+    @pytest.mark.parametrize(
+        "amount, expected",
+        [("31957.58", 3195758), (" 100,50 ", 10050), (16210.0, 1621000), (None, None), ("abc", None)],
+    )
+    def test_parse_amount_cents(self, amount, expected):
+        """Разбор суммы"""
+        assert parse_amount_cents(amount) == expected
+
+    def test_pipeline_accepts_transactions(self, operations, transactions):
+        """Функции обработки принимают записи Transaction"""
+        assert [t["id"] for t in filter_by_state(transactions, "CANCELED")] == [
+            op["id"] for op in filter_by_state(operations, "CANCELED")
+        ]
+        assert [t["id"] for t in sort_by_date(transactions)] == [op["id"] for op in sort_by_date(operations)]
+        assert len(list(filter_by_currency(transactions, "USD"))) == len(list(filter_by_currency(operations, "USD")))
+        assert len(process_bank_search(transactions, "счет")) == len(process_bank_search(operations, "счет"))
+
+    def test_display_transactions(self, operations, transactions, capsys):
+        """display_transactions выводит записи так же, как словари"""
+        display_transactions(transactions)
+        records_output = capsys.readouterr().out
+        display_transactions(operations)
+        assert records_output == capsys.readouterr().out
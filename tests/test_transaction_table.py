@@ -0,0 +1,309 @@
+import json
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from src.generators import filter_by_currency
+from src.processing import (
+    filter_by_date_range,
+    filter_by_state,
+    order_key,
+    page_by_date,
+    sort_by_date,
+    top_by_date,
+)
+from src.transaction import to_transactions
+from src.transaction_table import TransactionTable
+from src.utils import process_bank_search
+from src.widget import display_transactions, get_date
+
+
+class TestTransactionTable:
+    """Тесты для модуля transaction_table.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            return json.load(file)
+
+    @pytest.fixture
+    def table(self, operations):
+        return TransactionTable.from_records(operations)
+
+    def test_from_records_types(self, table):
+        """Колонки таблицы типизированы"""
+        frame = table.frame
+        assert str(frame["id"].dtype) == "Int64"
+        assert str(frame["amount"].dtype) == "Int64"
+        assert frame["date"].dtype == "int64"
+        assert str(frame["state"].dtype) == "category"
+        assert str(frame["currency_code"].dtype) == "category"
+        assert frame["amount"].iloc[0] == 3195758
+
+    def test_to_records_round_trip(self, operations, table):
+        """Словари из таблицы совпадают с исходными транзакциями"""
+        records = table.to_records()
+        assert len(records) == len(operations)
+        for original, record in zip(operations, records):
+            assert record["id"] == original["id"]
+            assert record["date"] == original["date"]
+            assert record["operationAmount"] == original["operationAmount"]
+            assert record["description"] == original["description"]
+            assert record["to"] == original["to"]
+            assert record["from"] == original.get("from")
+
+    def test_to_records_keeps_date_offset(self):
+        """Дата со смещением часового пояса возвращается исходной строкой, ключ даты - время UTC"""
+        records = [
+            {"id": 1, "date": "2019-08-26T01:30:00+03:00"},
+            {"id": 2, "date": "2019-08-25T23:00:00"},
+            {"id": 3, "date": "не дата"},
+            {"id": 4},
+        ]
+        table = TransactionTable.from_records(records)
+        assert [record["date"] for record in table.to_records()] == [
+            "2019-08-26T01:30:00+03:00", "2019-08-25T23:00:00", "не дата", None
+        ]
+        # 01:30+03:00 - это 22:30 UTC предыдущего дня, раньше 23:00 без смещения
+        assert [op["id"] for op in table.sort_by_date(False)] == [3, 4, 1, 2]
+        # Период сравнивается с датой в ее часовом поясе, как она выводится: 01:30+03:00 - это 26.08.2019
+        assert [op["id"] for op in table.filter_by_date_range("2019-08-26", "2019-08-27")] == [1]
+        assert [op["id"] for op in table.filter_by_date_range("2019-08-25", "2019-08-26")] == [2]
+
+    def test_filter_by_state_matches_list(self, operations, table):
+        """filter_by_state дает тот же результат, что и для списка"""
+        for state in ["EXECUTED", "canceled", "PENDING"]:
+            expected = [op["id"] for op in filter_by_state(operations, state)]
+            result = filter_by_state(table, state)
+            assert isinstance(result, TransactionTable)
+            assert [op["id"] for op in result] == expected
+
+    def test_state_index_is_cached(self, table):
+        """Индекс по статусу строится один раз и хранит позиции строк"""
+        index = table.state_index
+        assert table.state_index is index
+        assert sorted(index) == ["CANCELED", "EXECUTED"]
+        assert list(index["CANCELED"]) == [i for i, op in enumerate(table) if op["state"] == "CANCELED"]
+        assert len(table.filter_by_state("PENDING")) == 0
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_sort_by_date_matches_list(self, operations, table, reverse):
+        """sort_by_date дает тот же порядок, что и для списка"""
+        expected = [op["id"] for op in sort_by_date(operations, reverse)]
+        assert [op["id"] for op in sort_by_date(table, reverse)] == expected
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_sort_by_date_mixed_offsets_matches_list(self, reverse):
+        """Даты с часовым поясом и без него упорядочиваются в списке так же, как в таблице (по UTC)"""
+        records = [
+            {"id": 1, "date": "2019-08-26T01:30:00+03:00"},
+            {"id": 2, "date": "2019-08-25T23:00:00"},
+            {"id": 3, "date": "2019-08-25T22:45:00Z"},
+            {"id": 4, "date": "не дата"},
+            {"id": 5},
+            {"id": 6, "date": "2019-08-25T20:00:00-03:00"},
+        ]
+        expected = [op["id"] for op in TransactionTable.from_records(records).sort_by_date(reverse)]
+        assert [op["id"] for op in sort_by_date(records, reverse)] == expected
+        assert expected == ([2, 6, 3, 1, 4, 5] if reverse else [4, 5, 1, 3, 2, 6])
+
+    def test_sort_by_date_stable_with_missing_dates(self):
+        """Сортировка устойчива, операции без даты считаются самыми ранними"""
+        records = [
+            {"id": 1, "date": "2023-01-01T00:00:00"},
+            {"id": 2},
+            {"id": 3, "date": "2023-01-01T00:00:00"},
+            {"id": 4, "date": "invalid"},
+            {"id": 5, "date": "2023-02-01T00:00:00"},
+        ]
+        table = TransactionTable.from_records(records)
+        for reverse in [True, False]:
+            expected = [op["id"] for op in sort_by_date(records, reverse)]
+            assert [op["id"] for op in table.sort_by_date(reverse)] == expected
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_sort_presorted_and_reversed(self, table, reverse):
+        """Отсортированная таблица не пересортировывается, порядок сохраняется после фильтрации"""
+        sorted_table = table.sort_by_date(reverse)
+        assert sorted_table.sorted_reverse is reverse
+        assert sorted_table.sort_by_date(reverse) is sorted_table
+        assert sorted_table.filter_by_state("EXECUTED").sorted_reverse is reverse
+
+        # Таблица, упорядоченная при загрузке, определяется за один проход
+        loaded = TransactionTable.from_records(sorted_table.to_records())
+        assert loaded.sorted_reverse is None
+        assert loaded.sort_by_date(reverse) is loaded
+
+        expected = [op["id"] for op in sort_by_date(table.to_records(), not reverse)]
+        assert [op["id"] for op in sorted_table.sort_by_date(not reverse)] == expected
+
+    @pytest.mark.parametrize("order", [None, True, False])
+    @pytest.mark.parametrize(
+        "start, end",
+        [("2018-01-01", "2019-01-01"), (None, "2018-06-30T02:08:58.425572"), ("2019-07-03", None), (None, None)],
+    )
+    def test_filter_by_date_range_matches_list(self, operations, table, order, start, end):
+        """Период выбирается так же, как при просмотре списка"""
+        if order is not None:
+            table = table.sort_by_date(order)
+            operations = sort_by_date(operations, order)
+        expected = [op["id"] for op in filter_by_date_range(operations, start, end)]
+        assert [op["id"] for op in filter_by_date_range(table, start, end)] == expected
+
+    @pytest.mark.parametrize("order", [None, False, True])
+    def test_filter_by_date_range_local_day(self, order):
+        """Дата со смещением у полуночи попадает в период того дня, которым она выводится"""
+        records = [
+            {"id": 1, "date": "2019-08-26T01:30:00+03:00"},
+            {"id": 2, "date": "2019-08-26T23:30:00-02:00"},
+            {"id": 3, "date": "2019-08-26T12:00:00"},
+            {"id": 4, "date": "2019-08-25T23:59:59"},
+            {"id": 5, "date": "2019-08-27T00:00:00Z"},
+            {"id": 6, "date": datetime(2019, 8, 26, 0, 0)},
+        ]
+        table = TransactionTable.from_records(records)
+        if order is not None:
+            table = table.sort_by_date(order)
+        start, end = datetime(2019, 8, 26), datetime(2019, 8, 27)
+        expected = [op["id"] for op in records if op["id"] in (1, 2, 3, 6)]
+        result = table.filter_by_date_range(start, end)
+        assert sorted(op["id"] for op in result) == sorted(expected)
+        assert [op["id"] for op in filter_by_date_range(records, start, end)] == expected
+        assert [op["id"] for op in filter_by_date_range(list(to_transactions(records)), start, end)] == expected
+        assert all(date == "26.08.2019" for date in result.format_dates())
+
+    def test_filter_by_date_range_sorted_is_view(self, table):
+        """У отсортированной таблицы период - срез без копирования"""
+        sorted_table = table.sort_by_date(False)
+        result = sorted_table.filter_by_date_range(date(2018, 1, 1), datetime(2019, 1, 1))
+        assert len(result) == 5
+        assert result.sorted_reverse is False
+        assert np.shares_memory(result.date_keys(), sorted_table.date_keys())
+
+    def test_filter_by_date_range_invalid(self, table):
+        """Некорректная граница периода и пустой период"""
+        with pytest.raises(ValueError):
+            table.filter_by_date_range("не дата")
+        assert len(table.filter_by_date_range("2019-01-01", "2018-01-01")) == 0
+        records = [{"id": 1}, {"id": 2, "date": "2020-01-01T00:00:00"}]
+        result = TransactionTable.from_records(records).filter_by_date_range(end="2021-01-01")
+        assert [op["id"] for op in result] == [2]
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    @pytest.mark.parametrize("limit", [1, 5, 200])
+    def test_top_by_date_matches_list(self, operations, table, reverse, limit):
+        """Выборка первых limit транзакций совпадает со списком"""
+        result = top_by_date(table, limit, reverse)
+        assert result.sorted_reverse is reverse
+        expected = TransactionTable.from_records(top_by_date(operations, limit, reverse))
+        assert result.to_records() == expected.to_records()
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_page_by_date(self, operations, table, reverse):
+        """Постраничный вывод таблицы совпадает со списком"""
+        cursor = list_cursor = None
+        while True:
+            page, cursor = page_by_date(table, 7, cursor, reverse)
+            list_page, list_cursor = page_by_date(operations, 7, list_cursor, reverse)
+            assert page.to_records() == TransactionTable.from_records(list_page).to_records()
+            assert cursor == list_cursor
+            if cursor is None:
+                break
+
+    @pytest.mark.parametrize("reverse", [True, False])
+    def test_page_by_date_ties(self, reverse):
+        """Строки с одинаковыми датой и id не пропускаются: список и таблица выдают все строки"""
+        operations = [
+            {"date": "2019-08-26T10:50:58.294041", "description": "Первая"},
+            {"id": 5, "date": "2019-08-26T10:50:58.294041", "description": "С id"},
+            {"date": "2019-08-26T10:50:58.294041", "description": "Вторая"},
+            {"date": "2019-08-26T10:50:58.294041", "description": "Третья"},
+            {"description": "Без даты"},
+            {"description": "Без даты 2"},
+        ]
+        table = TransactionTable.from_records(operations)
+        pages, table_pages = [], []
+        cursor = table_cursor = None
+        while True:
+            page, cursor = page_by_date(operations, 1, cursor, reverse)
+            table_page, table_cursor = page_by_date(table, 1, table_cursor, reverse)
+            assert cursor == table_cursor
+            pages.extend(page)
+            table_pages.extend(table_page.to_records())
+            if cursor is None:
+                break
+        assert len(pages) == len(operations)
+        assert table_pages == TransactionTable.from_records(pages).to_records()
+        # Строки с равными ключами идут в порядке файла при любом направлении
+        assert pages == sorted(operations, key=order_key, reverse=reverse)
+
+    def test_format_dates(self, operations, table):
+        """Даты для вывода форматируются из разобранной колонки"""
+        assert table.format_dates() == [get_date(op["date"]) for op in operations]
+        assert TransactionTable.from_records([{"id": 1}]).format_dates() == [None]
+
+    def test_format_dates_with_offset(self, capsys):
+        """Дата со смещением часового пояса выводится в исходном поясе, как get_date"""
+        amount = {"amount": "1.00", "currency": {"name": "руб.", "code": "RUB"}}
+        dates = ["2019-08-26T01:30:00+03:00", "2019-08-25T23:30:00-0500", "2019-08-26T10:50:58Z", "не дата"]
+        records = [
+            {"id": i, "date": value, "operationAmount": amount, "description": "Перевод"}
+            for i, value in enumerate(dates, 1)
+        ]
+        table = TransactionTable.from_records(records)
+        assert table.format_dates() == ["26.08.2019", "25.08.2019", "26.08.2019", "не дата"]
+        assert table.format_dates() == [get_date(record["date"]) for record in records]
+        display_transactions(table)
+        table_output = capsys.readouterr().out
+        display_transactions(records)
+        assert table_output == capsys.readouterr().out
+        assert "26.08.2019 Перевод" in table_output
+
+    def test_filter_by_currency_and_search(self, operations, table):
+        """filter_by_currency и process_bank_search принимают таблицу"""
+        usd = filter_by_currency(table, "USD")
+        assert [op["id"] for op in usd] == [op["id"] for op in filter_by_currency(operations, "USD")]
+        found = process_bank_search(table, "ВКЛАД")
+        assert [op["id"] for op in found] == [op["id"] for op in process_bank_search(operations, "ВКЛАД")]
+
+    @pytest.mark.parametrize("codes", ["RUB", {"USD", "EUR"}, ["RUB", "USD"], {"XXX"}, set()])
+    @pytest.mark.parametrize("exclude", [False, True])
+    def test_filter_by_currency_codes(self, operations, table, codes, exclude):
+        """Фильтрация таблицы по набору валют и исключение валют совпадают со списком"""
+        result = filter_by_currency(table, codes, exclude)
+        assert [op["id"] for op in result] == [op["id"] for op in filter_by_currency(operations, codes, exclude)]
+
+    def test_flat_csv_records(self):
+        """Транзакции в формате CSV приводятся к формату operations.json"""
+        table = TransactionTable.from_records(
+            [{"id": 7, "state": "executed", "amount": 16210.0, "currency_code": "PEN", "currency_name": "Sol"}]
+        )
+        record = table.to_records()[0]
+        assert record["state"] == "EXECUTED"
+        assert record["operationAmount"] == {"amount": "16210.00", "currency": {"name": "Sol", "code": "PEN"}}
+        assert record["date"] is None
+
+    def test_empty_table(self):
+        """Пустая таблица"""
+        table = TransactionTable.from_records([])
+        assert len(table) == 0
+        assert table.to_records() == []
+        assert list(table.sort_by_date()) == []
+
+    def test_display_transactions(self, table, operations, capsys):
+        """display_transactions выводит таблицу так же, как список"""
+        display_transactions(table)
+        table_output = capsys.readouterr().out
+        display_transactions(operations)
+        assert table_output == capsys.readouterr().out
+
+    def test_display_transactions_limit(self, table, operations, capsys):
+        """display_transactions с limit выводит только первые транзакции"""
+        display_transactions(table, limit=3)
+        table_output = capsys.readouterr().out
+        display_transactions(operations, limit=3)
+        list_output = capsys.readouterr().out
+        assert table_output == list_output
+        assert f"в выборке: {len(operations)}" in list_output
+        assert list_output.count("Сумма:") == 3
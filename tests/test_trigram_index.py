@@ -0,0 +1,113 @@
+import json
+import random
+
+import _sre
+import numpy as np
+import pytest
+from re._casefix import _EXTRA_CASES
+
+from src.processing import sort_by_date
+from src.transaction import to_transactions
+from src.transaction_table import TransactionTable
+from src.trigram_index import TrigramIndex, fold_case
+from src.utils import process_bank_search
+
+# Символы, для которых приведение регистра в re отличается от str.lower
+TRICKY = "iIİıſsSKkΣσςµμΜёЁßẞвВᲀ"
+
+
+class TestTrigramIndex:
+    """Тесты для модуля trigram_index.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            operations = [operation for operation in json.load(file) if operation]
+        return operations + [
+            {"id": 1, "description": "Перевод с карты на счёт"},
+            {"id": 2, "description": "ПЕРЕВОД ОРГАНИЗАЦИИ"},
+            {"id": 3, "description": "İstanbul ſhop ΟΔΟΣ"},
+            {"id": 4, "description": ""},
+        ]
+
+    def test_fold_case_matches_re(self):
+        """Символы, равные для re.IGNORECASE, приводятся к одному символу"""
+        for code in range(0x110000):
+            if 0xD800 <= code <= 0xDFFF:
+                continue
+            lower = _sre.unicode_tolower(code)
+            assert fold_case(chr(code)) == chr(min((lower,) + tuple(_EXTRA_CASES.get(lower, ()))))
+
+    @pytest.mark.parametrize(
+        "search", ["перевод", "ПЕРЕВОД", "Перевод орг", "счет", "счёт", "открытие вклада", "ис", "п", "istanbul",
+                   "SHOP", "ΟΔΟς", "οδος", "(", "нет такого"]
+    )
+    def test_matches_scan(self, operations, search):
+        """Результат с индексом совпадает с просмотром для списка и таблицы"""
+        index = TrigramIndex()
+        index.add(operations)
+        assert process_bank_search(operations, search, index=index) == process_bank_search(operations, search)
+
+        table = TransactionTable.from_records(operations)
+        table_index = TrigramIndex()
+        table_index.add(table)
+        found = process_bank_search(table, search, index=table_index)
+        assert found.to_records() == process_bank_search(table, search).to_records()
+
+    def test_random_strings(self):
+        """Случайные строки из символов с особым приведением регистра"""
+        random.seed(0)
+        operations = [
+            {"id": i, "description": "".join(random.choices(TRICKY, k=random.randint(0, 8)))} for i in range(2000)
+        ]
+        index = TrigramIndex()
+        index.add(operations)
+        for _ in range(300):
+            search = "".join(random.choices(TRICKY, k=random.randint(1, 4)))
+            assert process_bank_search(operations, search, index=index) == process_bank_search(operations, search)
+
+    def test_candidates(self, operations):
+        """Шаблон проверяется только для описаний со всеми триграммами"""
+        index = TrigramIndex()
+        index.add(operations)
+        assert index.texts < len(operations)
+        assert len(index.candidates("SHOP")) == 1
+        assert len(index.candidates("нет такого")) == 0
+        assert len(index.candidates("ис")) == index.texts
+
+    def test_incremental_add(self, operations):
+        """Добавление по частям и записи Transaction"""
+        index = TrigramIndex()
+        index.add(operations[:5])
+        assert index.positions("перевод").tolist() == [
+            i for i, op in enumerate(operations[:5]) if "перевод" in op["description"].lower()
+        ]
+        transactions = list(to_transactions(operations))
+        index.add(transactions)
+        found = process_bank_search(transactions, "перевод", index=index)
+        assert [transaction["id"] for transaction in found] == [
+            operation["id"] for operation in process_bank_search(operations, "перевод")
+        ]
+
+    def test_other_dataset_and_empty(self, operations):
+        """Индекс других данных не используется, пустой поиск не меняет поведение"""
+        index = TrigramIndex()
+        index.add(operations[:3])
+        with pytest.raises(ValueError):
+            process_bank_search(operations, "перевод", index=index)
+        assert process_bank_search(operations, "", index=index) == []
+
+        # Переупорядоченный список той же длины, копия и результат take - другие наборы данных
+        index.add(operations)
+        with pytest.raises(ValueError):
+            process_bank_search(sort_by_date(operations, False), "счет", index=index)
+        with pytest.raises(ValueError):
+            process_bank_search(list(operations), "счет", index=index)
+        with pytest.raises(ValueError):
+            index.add(operations[::-1])
+        table = TransactionTable.from_records(operations)
+        table_index = TrigramIndex()
+        table_index.add(table)
+        with pytest.raises(ValueError):
+            process_bank_search(table.take(np.arange(len(table))[::-1]), "счет", index=table_index)
+        assert process_bank_search([], "перевод", index=TrigramIndex()) == []
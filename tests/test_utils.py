@@ -1,8 +1,33 @@
 import json
 import os
+import random
 import tempfile
+from unittest.mock import patch
 
-from src.utils import read_json_file
+import pandas as pd
+import pytest
+
+from src.transaction_table import TransactionTable
+from src.utils import (
+    CategoryMatcher,
+    category_matcher,
+    load_csv_transactions,
+    load_excel_transactions,
+    process_bank_operations,
+    read_json_file,
+)
+
+
+def count_by_categories(data, categories):
+    """Подсчет вложенным циклом: первая по порядку категория, которая есть в описании"""
+    counts = {}
+    for transaction in data:
+        description = transaction.get("description", "").lower()
+        for category in categories:
+            if description and category.lower() in description:
+                counts[category.lower()] = counts.get(category.lower(), 0) + 1
+                break
+    return {category: counts.get(category.lower(), 0) for category in categories}
 
 
 class TestUtils:
@@ -65,3 +90,64 @@ class TestUtils:
             assert result == []
         finally:
             os.unlink(temp_path)
+
+    def test_load_csv_transactions_schema(self, tmp_path):
+        """load_csv_transactions читает категориальные колонки как category"""
+        path = tmp_path / "transactions.csv"
+        path.write_text("id,state,amount,currency_code\n1,EXECUTED,10.5,RUB\n2,CANCELED,20,RUB\n", encoding="utf-8")
+        with patch("src.file_reader.PYARROW_AVAILABLE", False), patch(
+            "src.file_reader.pd.read_csv", wraps=pd.read_csv
+        ) as mock_read_csv:
+            result = load_csv_transactions(str(path))
+        assert mock_read_csv.call_args.kwargs["dtype"] == {"state": "category", "currency_code": "category"}
+        assert result == [
+            {"id": 1, "state": "EXECUTED", "amount": 10.5, "currency_code": "RUB"},
+            {"id": 2, "state": "CANCELED", "amount": 20.0, "currency_code": "RUB"},
+        ]
+
+    def test_load_excel_transactions_schema(self, tmp_path):
+        """load_excel_transactions приводит колонки к типам схемы"""
+        path = tmp_path / "transactions.xlsx"
+        pd.DataFrame({"id": [1], "state": ["EXECUTED"], "amount": ["10.5"]}).to_excel(path, index=False)
+        assert load_excel_transactions(str(path)) == [{"id": 1, "state": "EXECUTED", "amount": 10.5}]
+
+    def test_process_bank_operations(self):
+        """Операция относится к первой подходящей категории, ключи - в исходном регистре"""
+        data = [
+            {"description": "Перевод организации"},
+            {"description": "Перевод с карты на карту"},
+            {"description": "Открытие вклада"},
+            {"description": "Оплата"},
+            {"description": ""},
+            {},
+        ]
+        categories = ["карту", "Перевод", "ВКЛАД", "перевод организации", "Оплата счета"]
+        result = process_bank_operations(data, categories)
+        assert result == {"карту": 1, "Перевод": 1, "ВКЛАД": 1, "перевод организации": 0, "Оплата счета": 0}
+        assert result == count_by_categories(data, categories)
+        assert process_bank_operations(TransactionTable.from_records(data), categories) == result
+        assert process_bank_operations(data, []) == {}
+
+    @pytest.mark.parametrize("scan_limit", [0, 100])
+    def test_process_bank_operations_random(self, scan_limit, monkeypatch):
+        """Результат автомата и проверки по очереди совпадает с вложенным циклом"""
+        monkeypatch.setattr("src.utils.CATEGORY_SCAN_LIMIT", scan_limit)
+        category_matcher.cache_clear()
+        random.seed(0)
+        alphabet = "абвАБ "
+        data = [{"description": "".join(random.choices(alphabet, k=random.randint(0, 12)))} for _ in range(500)]
+        for _ in range(50):
+            categories = ["".join(random.choices(alphabet, k=random.randint(0, 4))) for _ in range(8)]
+            assert process_bank_operations(data, categories) == count_by_categories(data, categories)
+        category_matcher.cache_clear()
+
+    @pytest.mark.parametrize("scan_limit", [0, 100])
+    def test_category_matcher(self, scan_limit, monkeypatch):
+        """Автомат строится один раз для списка категорий"""
+        assert category_matcher(("перевод", "вклад")) is category_matcher(("перевод", "вклад"))
+        monkeypatch.setattr("src.utils.CATEGORY_SCAN_LIMIT", scan_limit)
+        matcher = CategoryMatcher(["она", "он", "Нас"])
+        assert matcher.match("сон") == "он"
+        assert matcher.match("сонар") == "она"
+        assert matcher.match("у нас") == "нас"
+        assert matcher.match("нет") is None
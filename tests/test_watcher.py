@@ -0,0 +1,102 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.transaction_table import TransactionTable
+from src.watcher import INOTIFY_AVAILABLE, DirectoryWatcher, TransactionStore, is_statement_file
+
+MODES = [pytest.param(False, id="polling"), pytest.param(True, id="inotify")]
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class TestWatcher:
+    """Тесты для модуля watcher.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            return json.load(file)
+
+    @pytest.fixture(params=MODES)
+    def use_inotify(self, request):
+        if request.param and not INOTIFY_AVAILABLE:
+            pytest.skip("inotify недоступен")
+        return request.param
+
+    def write_json(self, path, operations):
+        # Файл появляется атомарно: пишется под временным именем и переименовывается
+        temp_path = str(path) + ".part"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(operations, file)
+        os.replace(temp_path, path)
+
+    def test_is_statement_file(self):
+        """Отбираются только выписки поддерживаемых форматов"""
+        assert is_statement_file("a.json")
+        assert is_statement_file("b.CSV.gz")
+        assert not is_statement_file("a.json.part")
+        assert not is_statement_file(".hidden.csv")
+        assert not is_statement_file("a.csv.cache.dat")
+
+    def test_store(self, operations):
+        """Хранилище заменяет данные повторно обработанного файла"""
+        store = TransactionStore()
+        store.add("b.json", TransactionTable.from_records(operations[:3]))
+        store.add("a.json", TransactionTable.from_records(operations[3:5]))
+        assert len(store) == 5
+        assert [op["id"] for op in store.table()] == [op["id"] for op in operations[3:5] + operations[:3]]
+
+        store.add("b.json", TransactionTable.from_records(operations[:1]))
+        assert len(store.table()) == 3
+        store.add_error("c.json", "ошибка")
+        assert store.files == ["a.json", "b.json"]
+        assert store.errors == {"c.json": "ошибка"}
+
+    def test_new_files_are_ingested(self, tmp_path, operations, use_inotify):
+        """Новые файлы попадают в хранилище"""
+        self.write_json(tmp_path / "existing.json", operations[:2])
+        with DirectoryWatcher(str(tmp_path), use_inotify=use_inotify, poll_interval=0.05) as watcher:
+            assert wait_for(lambda: len(watcher.store) == 2)
+
+            self.write_json(tmp_path / "new.json", operations[2:5])
+            (tmp_path / "broken.json").write_text("[{broken", encoding="utf-8")
+            (tmp_path / "notes.txt").write_text("не выписка", encoding="utf-8")
+            assert wait_for(lambda: len(watcher.store) == 5 and watcher.store.errors)
+
+        assert [os.path.basename(path) for path in watcher.store.files] == ["existing.json", "new.json"]
+        assert list(watcher.store.errors) == [str(tmp_path / "broken.json")]
+        assert watcher.store.table().filter_by_state("EXECUTED").frame["state"].eq("EXECUTED").all()
+
+    def test_backpressure(self, tmp_path, operations):
+        """При заполненной очереди файлы не теряются"""
+        for i in range(8):
+            self.write_json(tmp_path / f"{i}.json", operations[i: i + 1])
+
+        from src import watcher as watcher_module
+
+        original = watcher_module.read_statement
+
+        def slow_read(file_path, as_table):
+            time.sleep(0.02)
+            return original(file_path, as_table)
+
+        with patch("src.watcher.read_statement", side_effect=slow_read):
+            with DirectoryWatcher(str(tmp_path), workers=1, queue_size=1, poll_interval=0.05) as watcher:
+                assert wait_for(lambda: len(watcher.store) == 8)
+                assert watcher.wait_idle(timeout=5)
+
+    def test_missing_directory(self, tmp_path):
+        """Несуществующая папка"""
+        with pytest.raises(FileNotFoundError):
+            DirectoryWatcher(str(tmp_path / "missing")).start()
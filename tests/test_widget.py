@@ -1,6 +1,6 @@
 import pytest
 
-from src.widget import get_date, mask_account_card
+from src.widget import display_transactions, get_date, mask_account_card
 
 
 class TestWidget:
@@ -66,3 +66,11 @@ class TestWidget:
         """Тестирование некорректных дат - возвращает как есть"""
         result = get_date(invalid_date_string)
         assert result == expected
+
+    def test_display_transactions_page_total(self, capsys):
+        """Для страницы выводится количество операций во всей выборке, а не размер страницы"""
+        page = [{"id": 1, "date": "2019-08-26T10:50:58.294041", "description": "Перевод"}]
+        display_transactions(page, total=25)
+        assert "Всего банковских операций в выборке: 25" in capsys.readouterr().out
+        display_transactions(page)
+        assert "Всего банковских операций в выборке: 1" in capsys.readouterr().out
@@ -0,0 +1,164 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.processing import sort_by_date
+from src.transaction import to_transactions
+from src.transaction_table import TransactionTable
+from src.word_index import WordIndex, index_path_for, open_word_index, tokenize
+
+
+def scan(operations, query, fields=("description",)):
+    """Поиск простым просмотром: все слова запроса, последнее - как начало слова"""
+    words = tokenize(query)
+    result = []
+    for operation in operations:
+        row = tokenize(" ".join(operation.get(field) or "" for field in fields))
+        if all(word in row for word in words[:-1]) and any(item.startswith(words[-1]) for item in row):
+            result.append(operation)
+    return result
+
+
+class TestWordIndex:
+    """Тесты для модуля word_index.py"""
+
+    @pytest.fixture
+    def operations(self):
+        with open("data/operations.json", encoding="utf-8") as file:
+            operations = [operation for operation in json.load(file) if operation]
+        return operations + [
+            {"id": 1, "description": "Перевод с карты на счёт", "from": "Visa 1234", "to": "Счет 5678"},
+            {"id": 2, "description": "ПЕРЕВОД ОРГАНИЗАЦИИ", "to": "Счет 0000"},
+            {"id": 3, "description": None},
+        ]
+
+    def test_tokenize(self):
+        """Слова без учета регистра, ё не отличается от е"""
+        words = ["перевод", "со", "счета", "на", "счет", "visa", "1234"]
+        assert tokenize("Перевод со СЧЁТА на счет, Visa-1234") == words
+
+    @pytest.mark.parametrize(
+        "query", ["перевод", "Перев", "перевод орг", "счет", "СЧЁТ", "открытие вклада", "перевод с", "visa", "нет"]
+    )
+    def test_matches_scan(self, operations, query):
+        """Результат совпадает с поиском просмотром"""
+        index = WordIndex()
+        index.add(operations)
+        assert index.filter(operations, query) == scan(operations, query)
+
+    def test_exact_words(self, operations):
+        """prefix=False ищет последнее слово целиком"""
+        index = WordIndex()
+        index.add(operations)
+        assert [op["id"] for op in index.filter(operations, "перевод орг", prefix=False)] == []
+        assert [op["id"] for op in index.filter(operations, "перевод организации", prefix=False)][-1] == 2
+        assert len(index.positions("")) == 0
+
+    def test_fields(self, operations):
+        """Индексируются заданные поля"""
+        fields = ("description", "from", "to")
+        index = WordIndex(fields)
+        index.add(operations)
+        assert index.filter(operations, "счет 5678") == scan(operations, "счет 5678", fields)
+        assert [op["id"] for op in index.filter(operations, "счет 5678")] == [1]
+
+    def test_table_and_transactions(self, operations):
+        """Индекс строится по TransactionTable и записям Transaction"""
+        table = TransactionTable.from_records(operations)
+        table_index = WordIndex(("description", "from"))
+        table_index.add(table)
+        list_index = WordIndex(("description", "from"))
+        list_index.add(list(to_transactions(operations)))
+        assert table_index.positions("перевод").tolist() == list_index.positions("перевод").tolist()
+        assert [op["id"] for op in table_index.filter(table, "visa")] == [
+            op["id"] for op in scan(operations, "visa", ("description", "from"))
+        ]
+
+    def test_incremental_add(self, operations):
+        """Добавление по частям дает тот же индекс"""
+        whole = WordIndex()
+        whole.add(operations)
+        parts = WordIndex()
+        parts.add(operations[:5])
+        parts.add(operations)
+        assert whole.words == parts.words
+        for word in whole.words:
+            assert whole.positions(word, prefix=False).tolist() == parts.positions(word, prefix=False).tolist()
+
+    def test_other_dataset(self, operations):
+        """Индекс другого набора данных не используется"""
+        index = WordIndex()
+        index.add(operations[:3])
+        with pytest.raises(ValueError):
+            index.filter(operations, "перевод")
+
+        index.add(operations)
+        # Переупорядоченный список той же длины и копия - другие наборы данных
+        with pytest.raises(ValueError):
+            index.filter(sort_by_date(operations, False), "счет")
+        with pytest.raises(ValueError):
+            index.filter(list(operations), "счет")
+        with pytest.raises(ValueError):
+            index.add(operations[::-1])
+
+        table = TransactionTable.from_records(operations)
+        table_index = WordIndex()
+        table_index.add(table)
+        with pytest.raises(ValueError):
+            table_index.filter(table.take(np.arange(len(table))[::-1]), "счет")
+
+    def test_persisted_and_appended(self, operations, tmp_path):
+        """Индекс сохраняется рядом с файлом и дополняется при дописывании данных"""
+        file_path = str(tmp_path / "operations.json")
+        head = operations[:6]
+        index = open_word_index(file_path, head)
+        size = os.path.getsize(index_path_for(file_path))
+
+        reopened = open_word_index(file_path, operations)
+        # В файл дописана только часть с новыми операциями
+        assert os.path.getsize(index_path_for(file_path)) > size
+        assert len(reopened) == len(operations)
+        assert reopened.filter(operations, "перевод") == scan(operations, "перевод")
+
+        loaded = WordIndex.load(index_path_for(file_path))
+        assert len(loaded) == len(operations)
+        assert loaded.words == reopened.words
+        assert index.filter(head, "перевод") == scan(head, "перевод")
+
+    def test_rebuilt_when_changed(self, operations, tmp_path):
+        """Если данные изменены не дописыванием, индекс строится заново"""
+        file_path = str(tmp_path / "operations.json")
+        open_word_index(file_path, operations)
+        changed = operations[:4] + [{"id": 9, "description": "Новое описание"}]
+        index = open_word_index(file_path, changed)
+        assert [op["id"] for op in index.filter(changed, "новое")] == [9]
+        assert index.filter(changed, "перевод") == scan(changed, "перевод")
+
+    def test_rebuilt_when_earlier_row_changed(self, operations, tmp_path):
+        """Изменение не последней строки (при той же длине) тоже перестраивает индекс"""
+        file_path = str(tmp_path / "operations.json")
+        open_word_index(file_path, operations)
+        changed = [dict(operations[0], description="Оплата услуг связи")] + operations[1:]
+        index = open_word_index(file_path, changed)
+        assert index.filter(changed, "связи") == [changed[0]]
+        assert index.filter(changed, "перевод") == scan(changed, "перевод")
+
+        # Продолжение измененного набора данных дописывается к перестроенному индексу
+        appended = changed + [{"id": 10, "description": "Перевод связи"}]
+        reopened = open_word_index(file_path, appended)
+        assert reopened.filter(appended, "связи") == scan(appended, "связи")
+
+    def test_corrupted_or_other_fields(self, operations, tmp_path):
+        """Поврежденный индекс или индекс других полей не загружается"""
+        path = str(tmp_path / "index.words.dat")
+        index = WordIndex()
+        index.add(operations)
+        index.save(path)
+        assert WordIndex.load(path, ("description", "to")) is None
+
+        with open(path, "wb") as file:
+            file.write(b"broken")
+        assert WordIndex.load(path) is None
+        assert WordIndex.load(str(tmp_path / "missing.dat")) is None